@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Attendance
+from .models import Attendance, DailyAttendanceRollup
 
 
 @admin.register(Attendance)
@@ -39,3 +39,16 @@ class AttendanceAdmin(admin.ModelAdmin):
     def student_name(self, obj):
         return obj.student.user.get_full_name()
     student_name.short_description = "Full Name"
+
+
+@admin.register(DailyAttendanceRollup)
+class DailyAttendanceRollupAdmin(admin.ModelAdmin):
+    list_display = ("date", "school", "flight", "enrolled", "present", "late", "absent", "excused", "dismissed")
+    list_filter = ("school", "date")
+    ordering = ("-date", "school")
+
+    # Maintained by the scan write path / rebuild_attendance_rollup
+    readonly_fields = (
+        "school", "school_year", "semester", "class_obj", "flight", "date",
+        "enrolled", "present", "absent", "late", "excused", "dismissed",
+    )
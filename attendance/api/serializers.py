@@ -16,3 +16,20 @@ class AttendanceSerializer(serializers.ModelSerializer):
             "status",
         ]
         read_only_fields = ["date", "time_in"]
+
+
+class ScanSerializer(serializers.Serializer):
+    """One queued kiosk scan, replayed by the bulk submit endpoint."""
+    qr = serializers.CharField(required=False, max_length=4096)
+    user_id = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=Attendance.STATUS_CHOICES)
+    scanned_at = serializers.DateTimeField()
+
+    def validate(self, attrs):
+        if not attrs.get("qr") and not attrs.get("user_id"):
+            raise serializers.ValidationError("qr or user_id is required.")
+        return attrs
+
+
+class BulkScanSerializer(serializers.Serializer):
+    scans = ScanSerializer(many=True, allow_empty=False, max_length=2000)
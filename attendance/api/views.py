@@ -2,82 +2,307 @@ from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 
+from schools.models import SchoolYear, Semester
 from student.models import Student
-from django.contrib.auth.models import User
-from attendance.models import Attendance
-from attendance.api.serializers import AttendanceSerializer
+from school.utils.export import StreamingExport
+from attendance.api.serializers import AttendanceSerializer, BulkScanSerializer
+from attendance.utils.analytics import AttendanceAnalytics
+from attendance.utils.bulk_sync import BulkScanSync
+from attendance.utils.calendars import AttendanceCalendar
+from attendance.utils.listing import AttendanceListing
+from attendance.utils.qr_decode import QRDecoder, QRDecodeError
+from attendance.utils.rollup import AttendanceRollup
+from attendance.utils.roster import RosterIndex
+from attendance.utils.writer import AttendanceWriter
 
 
 class AttendanceViewSet(viewsets.ViewSet):
 
-    @action(detail=False, methods=["post"], url_path="submit")
-    def submit(self, request):
+    @staticmethod
+    def _date_range(params):
         """
-        Expected payload:
-        {
-            "user_id": 15,
-            "status": "PRESENT" | "TIME_OUT" | ...
-        }
+        Resolve ?semester= / ?school_year= / ?date_from=&date_to= / ?date=
+        to a (date_from, date_to) pair capped at today. Defaults to today.
         """
+        today = timezone.localdate()
 
-        user_id = request.data.get("user_id")
-        status_value = request.data.get("status")
+        if params.get("semester"):
+            period = Semester.objects.filter(pk=params["semester"]).only("start_date", "end_date").first()
+        elif params.get("school_year"):
+            period = SchoolYear.objects.filter(pk=params["school_year"]).only("start_date", "end_date").first()
+        else:
+            period = None
 
-        if not user_id or not status_value:
-            return Response({"error": "user_id and status are required."}, status=400)
+        if period is not None:
+            return period.start_date, min(period.end_date, today)
+        if params.get("date_from"):
+            return parse_date(params["date_from"]), parse_date(params.get("date_to") or "") or today
 
-        # -------------------------
-        # FETCH USER
-        # -------------------------
-        try:
-            user = User.objects.get(id=user_id)
-        except User.DoesNotExist:
-            return Response({"error": "User does not exist"}, status=404)
+        date = parse_date(params.get("date") or "") or today
+        return date, date
 
-        try:
-            student = user.student_profile
-        except:
+    @staticmethod
+    def _record_scan(entry, status_value):
+        """Record a scan for a resolved roster entry and build the kiosk response."""
+        if entry is None:
             return Response({"error": "Student profile not found for this user"}, status=404)
 
-        today = timezone.now().date()
-
-        # -------------------------
-        # CHECK IF RECORD EXISTS
-        # -------------------------
-        attendance = Attendance.objects.filter(student=student, date=today).first()
+        if not entry.is_active:
+            return Response({"error": "Student is inactive"}, status=400)
 
         # ------------------------------------------------
-        # CASE 1: FIRST SCAN OF THE DAY → TIME IN
+        # TIME IN / TIME OUT / COMPLETED — one upsert statement
         # ------------------------------------------------
-        if attendance is None:
-            attendance = Attendance.objects.create(
-                student=student,
-                date=today,
-                status=status_value,
-                time_in=timezone.now().time()
-            )
+        transition, attendance = AttendanceWriter.record_scan(
+            school_id=entry.school_id,
+            student_id=entry.student_pk,
+            flight_id=entry.flight_id,
+            status=status_value,
+        )
+
+        if transition == AttendanceWriter.TIME_IN:
             return Response({
                 "message": "Time-in recorded.",
+                "transition": transition,
                 "attendance": AttendanceSerializer(attendance).data
             }, status=200)
 
-        # ------------------------------------------------
-        # CASE 2: SECOND SCAN → TIME OUT
-        # ------------------------------------------------
-        if attendance.time_out is None:
-            attendance.time_out = timezone.now().time()
-            attendance.status = status_value
-            attendance.save(update_fields=["time_out", "status"])
+        if transition == AttendanceWriter.TIME_OUT:
             return Response({
                 "message": "Time-out recorded.",
+                "transition": transition,
                 "attendance": AttendanceSerializer(attendance).data
             }, status=200)
 
-        # ------------------------------------------------
-        # CASE 3: Already Time-Out
-        # ------------------------------------------------
         return Response({
             "error": "Attendance already completed for today.",
+            "transition": transition,
             "attendance": AttendanceSerializer(attendance).data
         }, status=400)
+
+    @action(detail=False, methods=["post"], url_path="submit")
+    def submit(self, request):
+        """
+        Expected payload:
+        {
+            "qr": "SCHOOL-3-STUDENT-STD-1A2B3C4D",   # raw scanned payload, or
+            "user_id": 15,
+            "status": "PRESENT" | "TIME_OUT" | ...
+        }
+        """
+
+        qr = request.data.get("qr")
+        user_id = request.data.get("user_id")
+        status_value = request.data.get("status")
+
+        if not (qr or user_id) or not status_value:
+            return Response({"error": "qr or user_id, and status are required."}, status=400)
+
+        # -------------------------
+        # RESOLVE STUDENT (cached roster, no queries when warm)
+        # -------------------------
+        if qr:
+            entry = RosterIndex.resolve(qr)
+        else:
+            try:
+                entry = RosterIndex.resolve_user(int(user_id))
+            except (TypeError, ValueError):
+                return Response({"error": "Invalid user_id"}, status=400)
+
+        return self._record_scan(entry, status_value)
+
+    @action(detail=False, methods=["post"], url_path="decode")
+    def decode(self, request):
+        """
+        Multipart upload from kiosks that can't decode QR codes in the browser:
+            image   camera frame (PNG / JPEG)
+            status  optional — when given, the decoded student is scanned in / out
+                    exactly like /submit/
+
+        Without status, returns the decoded payload(s) and the matching student.
+        """
+        upload = request.FILES.get("image")
+        if upload is None:
+            return Response({"error": "image is required."}, status=400)
+        if upload.size > QRDecoder.MAX_UPLOAD_BYTES:
+            return Response({"error": "Image is too large."}, status=413)
+
+        try:
+            payloads = QRDecoder.decode_image(upload.read())
+        except QRDecodeError as e:
+            return Response({"error": str(e)}, status=400)
+        except ImportError:
+            return Response({"error": "QR decoding is not available on this server."}, status=503)
+
+        if not payloads:
+            return Response({"error": "No QR code found in the image.", "payloads": []}, status=422)
+
+        entry = next(filter(None, map(RosterIndex.resolve, payloads)), None)
+
+        status_value = request.data.get("status")
+        if status_value:
+            if entry is None:
+                return Response({"error": "QR code does not match a student.", "payloads": payloads}, status=404)
+            return self._record_scan(entry, status_value)
+
+        return Response({
+            "payloads": payloads,
+            "student": {
+                "id": entry.student_pk,
+                "student_id": entry.student_id,
+                "school": entry.school_id,
+                "name": entry.name,
+                "is_active": entry.is_active,
+            } if entry else None,
+        }, status=200)
+
+    @action(detail=False, methods=["post"], url_path="submit-bulk")
+    def submit_bulk(self, request):
+        """
+        Replay a kiosk's offline queue in one request.
+
+        Expected payload:
+        {
+            "scans": [
+                {"user_id": 15, "status": "PRESENT", "scanned_at": "2025-12-18T07:12:03+08:00"},
+                {"qr": "SCHOOL-3-STUDENT-STD-1A2B3C4D", "status": "PRESENT", "scanned_at": "2025-12-18T17:01:44+08:00"}
+            ]
+        }
+
+        Returns one result per scan, in payload order:
+        time_in | time_out | completed | error
+        """
+
+        serializer = BulkScanSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+
+        results = BulkScanSync(serializer.validated_data["scans"]).apply()
+
+        summary = {}
+        for result in results:
+            summary[result["result"]] = summary.get(result["result"], 0) + 1
+
+        return Response({
+            "message": f"{len(results)} scan(s) processed.",
+            "summary": summary,
+            "results": results,
+        }, status=200)
+
+    @action(detail=False, methods=["get"], url_path="rollup")
+    def rollup(self, request):
+        """
+        GET /api/attendance/rollup/?school=3&date=2025-12-18
+        GET /api/attendance/rollup/?school=3&school_year=7
+        GET /api/attendance/rollup/?school=3&semester=12
+        GET /api/attendance/rollup/?school=3&date_from=2025-08-01&date_to=2025-12-18
+
+        Strength / present / absent totals plus a per-flight breakdown,
+        read from DailyAttendanceRollup. Defaults to today.
+        """
+        school_id = request.query_params.get("school")
+
+        date_from, date_to = self._date_range(request.query_params)
+        if date_from is None or date_to is None:
+            return Response({"error": "Invalid date."}, status=400)
+
+        summary = AttendanceRollup.summary(date_from, date_to, school_id=school_id)
+        summary.update({"date_from": date_from, "date_to": date_to})
+        return Response(summary, status=200)
+
+    @action(detail=False, methods=["get"], url_path="records")
+    def records(self, request):
+        """
+        DataTables server-side endpoint for the attendance list.
+
+        GET /api/attendance/records/?draw=1&start=0&length=25&school=3&semester=12
+            &class=4&flight=9&status=ABSENT,LATE&date_from=2025-08-01&date_to=2025-12-18
+            &search[value]=dela cruz
+
+        Pages are keyset-paginated on (date, id): pass back the
+        ``next_cursor`` of the previous page as ``cursor`` (together with
+        ``records_total`` / ``records_filtered``) to fetch the next one
+        without OFFSET or a re-count.
+        """
+        return Response(AttendanceListing(request.query_params).draw(), status=200)
+
+    @action(detail=False, methods=["get"], url_path="analytics")
+    def analytics(self, request):
+        """
+        GET /api/attendance/analytics/?school=3&semester=12
+        GET /api/attendance/analytics/?school=3&school_year=7&flight=9
+        GET /api/attendance/analytics/?school=3&date_from=2025-08-01&date_to=2025-12-18
+
+        Cohort report: attendance / tardiness rates, per-flight comparison,
+        time-in distribution and absence streaks. Cached until the next
+        attendance write for the school (rollup watermark).
+        """
+        school_id = request.query_params.get("school")
+        if not school_id:
+            return Response({"error": "school is required."}, status=400)
+
+        date_from, date_to = self._date_range(request.query_params)
+        if date_from is None or date_to is None:
+            return Response({"error": "Invalid date."}, status=400)
+
+        report = AttendanceAnalytics(
+            school_id=school_id,
+            date_from=date_from,
+            date_to=date_to,
+            flight_id=request.query_params.get("flight") or None,
+        ).report()
+        return Response(report, status=200)
+
+    @action(detail=False, methods=["get"], url_path="calendar")
+    def calendar(self, request):
+        """
+        GET /api/attendance/calendar/?student=42
+        GET /api/attendance/calendar/?student=42&semester=12
+
+        One student's semester at a glance: per-status day counts, current
+        and longest absence / attendance streaks, and a per-day code string
+        for heatmaps. Read from the student's attendance calendar (one small
+        row), not from Attendance. The semester defaults to the one covering
+        today.
+        """
+        student_pk = request.query_params.get("student")
+        if not student_pk:
+            return Response({"error": "student is required."}, status=400)
+
+        student = Student.objects.filter(pk=student_pk).only("id", "school_id").first()
+        if student is None:
+            return Response({"error": "Student not found."}, status=404)
+
+        today = timezone.localdate()
+        semester_id = request.query_params.get("semester")
+        if not semester_id:
+            current = AttendanceCalendar.semester_for(student.school_id, today)
+            if current is None:
+                return Response({"error": "No semester covers today; pass ?semester=."}, status=400)
+            semester_id = current[0]
+
+        semester = Semester.objects.filter(
+            pk=semester_id, school_year__school_id=student.school_id
+        ).first()
+        if semester is None:
+            return Response({"error": "Semester not found for this student's school."}, status=404)
+
+        return Response(AttendanceCalendar.summary(student.pk, semester, until=today), status=200)
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """
+        GET /api/attendance/export/?format=csv|xlsx&school=3&semester=12&status=ABSENT ...
+
+        Streams every row matching the list filters (see records) as CSV
+        or XLSX; rows are fetched in chunks, never all at once.
+        """
+        file_format = request.query_params.get("format", "csv").lower()
+        if file_format not in StreamingExport.FORMATS:
+            return Response({"error": "format must be csv or xlsx."}, status=400)
+
+        header, rows = AttendanceListing(request.query_params).export(chunk_size=StreamingExport.CHUNK_SIZE)
+        filename = f"attendance-{timezone.localdate():%Y%m%d}"
+        return StreamingExport.response(file_format, filename, header, rows, sheet_title="Attendance")
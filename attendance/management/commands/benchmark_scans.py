@@ -0,0 +1,76 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.utils.benchmark import ScanBenchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the kiosk scan path: seed a throwaway school, replay concurrent kiosk scans "
+        "through /api/attendance/submit/, report latency percentiles, queries per scan and rows/sec."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=500, help="Students to seed (default: 500).")
+        parser.add_argument("--kiosks", type=int, default=4, help="Concurrent simulated kiosks (default: 4).")
+        parser.add_argument("--scans-per-student", type=int, default=2, help="Scans per student (default: 2 = in + out).")
+        parser.add_argument("--cold", action="store_true", help="Don't pre-load the roster cache before timing.")
+        parser.add_argument("--seed", type=int, help="Random seed for the scan order.")
+        parser.add_argument("--keep", action="store_true", help="Keep the seeded school and its rows afterwards.")
+        parser.add_argument("--output", type=str, help="Write the results as JSON to this path.")
+        parser.add_argument("--baseline", type=str, help="Earlier JSON result to compare against.")
+
+    def handle(self, *args, **options):
+        if options["students"] < 1 or options["kiosks"] < 1 or options["scans_per_student"] < 1:
+            raise CommandError("--students, --kiosks and --scans-per-student must be at least 1.")
+
+        baseline = None
+        if options["baseline"]:
+            try:
+                with open(options["baseline"]) as f:
+                    baseline = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                raise CommandError(f"Cannot read baseline: {e}")
+
+        benchmark = ScanBenchmark(
+            students=options["students"],
+            kiosks=options["kiosks"],
+            scans_per_student=options["scans_per_student"],
+            warm=not options["cold"],
+            keep=options["keep"],
+            seed=options["seed"],
+        )
+
+        self.stdout.write(self.style.NOTICE(
+            f"Benchmarking scans — {options['students']} student(s), {options['kiosks']} kiosk(s), "
+            f"{options['scans_per_student']} scan(s) each"
+        ))
+
+        result = benchmark.run()
+
+        latency = result["latency_ms"]
+        self.stdout.write(
+            f"  scans: {result['scans']} in {result['wall_seconds']}s "
+            f"({result['scans_per_second']}/s), status codes {result['status_codes']}"
+        )
+        self.stdout.write(
+            f"  latency ms: p50={latency['p50']} p95={latency['p95']} p99={latency['p99']} max={latency['max']}"
+        )
+        self.stdout.write(
+            f"  queries/scan: mean={result['queries_per_scan']['mean']} max={result['queries_per_scan']['max']}"
+        )
+        self.stdout.write(f"  rows: {result['rows_written']} ({result['rows_per_second']}/s)")
+
+        if baseline:
+            self.stdout.write(self.style.NOTICE(f"Compared with {baseline.get('commit') or options['baseline']}:"))
+            for name, before, after, change in ScanBenchmark.compare(result, baseline):
+                line = f"  {name}: {before} → {after}" + (f" ({change:+.1f}%)" if change is not None else "")
+                worse = change is not None and (change < 0 if name == "rows_per_second" else change > 0)
+                self.stdout.write(self.style.WARNING(line) if worse and abs(change) >= 10 else line)
+
+        if options["output"]:
+            ScanBenchmark.to_json(result, options["output"])
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Done."))
@@ -5,6 +5,7 @@ from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth.models import User
 from PIL import Image
 from pyzbar.pyzbar import decode as qr_decode
+from school.utils.qr_render import QRStore
 from users.models import UserProfile
 
 
@@ -29,14 +30,17 @@ class Command(BaseCommand):
         except UserProfile.DoesNotExist:
             raise CommandError(f"User '{username}' has no UserProfile.")
 
-        if not profile.qr_code:
+        if not profile.qr_hash and not profile.qr_code:
             raise CommandError(f"User '{username}' has no stored QR code.")
 
         self.stdout.write(self.style.SUCCESS(f"Decoding QR for user: {username}"))
 
         try:
-            # Decode Base64 → PNG
-            qr_bytes = base64.b64decode(profile.qr_code)
+            # Stored PNG (or the legacy Base64 column, before migrate_qr_codes)
+            if profile.qr_hash:
+                qr_bytes = QRStore.read(profile.qr_hash)
+            else:
+                qr_bytes = base64.b64decode(profile.qr_code)
             image = Image.open(io.BytesIO(qr_bytes))
 
             # Decode QR content
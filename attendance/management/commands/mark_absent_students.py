@@ -0,0 +1,37 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from attendance.utils.auto_absent import AutoAbsent
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert ABSENT attendance rows for enrolled, active students with no record for the day. "
+        "Safe to re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", type=str, help="Day to close (YYYY-MM-DD, default: today).")
+        parser.add_argument("--school", type=int, action="append",
+                            help="SchoolOrg ID (repeatable). Default: every school with a semester covering the day.")
+
+    def handle(self, *args, **options):
+        try:
+            day = date.fromisoformat(options["date"]) if options["date"] else timezone.localdate()
+        except ValueError as e:
+            raise CommandError(f"Invalid date: {e}")
+
+        school_ids = options["school"] or AutoAbsent.schools_in_session(day)
+        if not school_ids:
+            self.stdout.write(self.style.WARNING(f"No school in session on {day}."))
+            return
+
+        self.stdout.write(self.style.NOTICE(f"Marking absences for {day} — {len(school_ids)} school(s)…"))
+
+        results = AutoAbsent.run(day, school_ids=school_ids)
+        for school_id, inserted in results.items():
+            self.stdout.write(f"  school {school_id}: {inserted} absent")
+
+        self.stdout.write(self.style.SUCCESS(f"✔ {sum(results.values())} ABSENT row(s) inserted."))
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+
+from attendance.utils.calendars import AttendanceCalendar
+from attendance.utils.dedupe import DuplicateKioskRows
+from attendance.utils.rollup import AttendanceRollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Merge duplicate kiosk attendance rows (same student and date, no class) so the "
+        "unique_attendance_student_date_no_class constraint can be created, then rebuild "
+        "the affected rollups and calendars. Also runs automatically before `migrate`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only count the rows that would be removed.")
+
+    def handle(self, *args, **options):
+        try:
+            if options["dry_run"]:
+                count = DuplicateKioskRows.count()
+                self.stdout.write(self.style.NOTICE(f"{count} duplicate kiosk row(s) would be removed."))
+                return
+            removed = DuplicateKioskRows.merge()
+        except DatabaseError as e:
+            raise CommandError(f"Merge failed: {e}")
+
+        if not removed:
+            self.stdout.write(self.style.SUCCESS("No duplicate kiosk rows."))
+            return
+
+        # Rebuild only the affected school / date ranges
+        dates = {}
+        for school_id, day in removed:
+            dates.setdefault(school_id, []).append(day)
+
+        written = 0
+        for school_id, days in dates.items():
+            with transaction.atomic():
+                AttendanceRollup.rebuild(school_id=school_id, date_from=min(days), date_to=max(days))
+            written += AttendanceCalendar.rebuild(school_id=school_id)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {len(removed)} duplicate row(s) across {len(dates)} school(s); "
+            f"rollups rebuilt, {written} calendar(s) rebuilt."
+        ))
@@ -0,0 +1,97 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.utils.partitioning import AttendancePartitioner
+
+
+class Command(BaseCommand):
+    help = (
+        "Range-partition the attendance table by date (PostgreSQL) and maintain its partitions.\n"
+        "  convert  --scheme month|school_year   one-time switch to a partitioned table\n"
+        "  create   --ahead N                    pre-create the current + next N periods\n"
+        "  detach   --before YYYY-MM-DD          detach partitions ending on/before a date\n"
+        "  attach   <table>                      re-attach a detached partition\n"
+        "  list                                  show attached and detached partitions"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=["convert", "create", "detach", "attach", "list"])
+        parser.add_argument("table", nargs="?", help="Partition table name (attach only).")
+        parser.add_argument("--scheme", choices=AttendancePartitioner.SCHEMES, default="month",
+                            help="Partition by calendar month or by school year (convert only).")
+        parser.add_argument("--year-start-month", type=int, default=6,
+                            help="First month of the school year for the school_year scheme (default: 6, June).")
+        parser.add_argument("--ahead", type=int, default=3, help="Future periods to pre-create (default: 3).")
+        parser.add_argument("--before", type=str, help="Detach partitions ending on or before this date (YYYY-MM-DD).")
+        parser.add_argument("--keep-legacy", action="store_true",
+                            help="Keep the old table as <table>_legacy after convert.")
+
+    def handle(self, *args, **options):
+        if not AttendancePartitioner.supported():
+            raise CommandError("Attendance partitioning requires PostgreSQL.")
+
+        action = options["action"]
+
+        if action == "convert":
+            partitioner = AttendancePartitioner(
+                scheme=options["scheme"],
+                year_start_month=options["year_start_month"],
+            )
+            self.stdout.write(self.style.NOTICE(
+                f"Converting {partitioner.table} to a partitioned table by {options['scheme']}…"
+            ))
+            try:
+                partitions = partitioner.convert(keep_legacy=options["keep_legacy"], ahead=options["ahead"])
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f"Done — {len(partitions)} partition(s)."))
+            self.print_partitions(partitioner)
+            return
+
+        partitioner = AttendancePartitioner()
+        if not partitioner.is_partitioned():
+            raise CommandError(
+                f"{partitioner.table} is not partitioned. Run `partition_attendance convert` first."
+            )
+
+        if action == "create":
+            created = partitioner.create_ahead(options["ahead"])
+            for name in created:
+                self.stdout.write(self.style.SUCCESS(f"✔ Created {name}"))
+            if not created:
+                self.stdout.write(self.style.NOTICE("All partitions already exist."))
+
+        elif action == "detach":
+            if not options["before"]:
+                raise CommandError("--before is required for detach.")
+            try:
+                before = date.fromisoformat(options["before"])
+            except ValueError as e:
+                raise CommandError(f"Invalid date: {e}")
+            detached = partitioner.detach_before(before)
+            for name in detached:
+                self.stdout.write(self.style.WARNING(f"⏏ Detached {name}"))
+            if not detached:
+                self.stdout.write(self.style.NOTICE("Nothing to detach."))
+
+        elif action == "attach":
+            if not options["table"]:
+                raise CommandError("Give the partition table to attach.")
+            try:
+                start, end = partitioner.attach(options["table"])
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f"✔ Attached {options['table']} ({start} → {end})"))
+
+        else:
+            self.print_partitions(partitioner)
+
+    def print_partitions(self, partitioner):
+        for partition in partitioner.partitions():
+            if partition["is_default"]:
+                self.stdout.write(f"  {partition['name']}  DEFAULT")
+            else:
+                self.stdout.write(f"  {partition['name']}  {partition['date_from']} → {partition['date_to']}")
+        for name in partitioner.detached():
+            self.stdout.write(self.style.WARNING(f"  {name}  (detached)"))
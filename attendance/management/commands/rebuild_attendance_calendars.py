@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from attendance.utils.calendars import AttendanceCalendar
+
+
+class Command(BaseCommand):
+    help = "Rebuild StudentAttendanceCalendar byte strings from Attendance (all or per semester / school / student)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--semester", type=int, help="Semester ID to rebuild (default: all semesters).")
+        parser.add_argument("--school", type=int, help="Only semesters of this SchoolOrg ID.")
+        parser.add_argument("--student", type=int, help="Only this Student ID.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE(
+            f"Rebuilding attendance calendars — semester={options['semester'] or 'ALL'}, "
+            f"school={options['school'] or 'ALL'}, student={options['student'] or 'ALL'}"
+        ))
+
+        written = AttendanceCalendar.rebuild(
+            semester_id=options["semester"],
+            school_id=options["school"],
+            student_id=options["student"],
+        )
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} calendar(s)."))
@@ -0,0 +1,36 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from attendance.utils.rollup import AttendanceRollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild DailyAttendanceRollup from Attendance (all or per school / date range)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--school", type=int, help="SchoolOrg ID to rebuild (default: all schools).")
+        parser.add_argument("--from", dest="date_from", type=str, help="First date to rebuild (YYYY-MM-DD).")
+        parser.add_argument("--to", dest="date_to", type=str, help="Last date to rebuild (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        try:
+            date_from = date.fromisoformat(options["date_from"]) if options["date_from"] else None
+            date_to = date.fromisoformat(options["date_to"]) if options["date_to"] else None
+        except ValueError as e:
+            raise CommandError(f"Invalid date: {e}")
+
+        self.stdout.write(self.style.NOTICE(
+            f"Rebuilding rollups — school={options['school'] or 'ALL'}, "
+            f"from={date_from or '…'}, to={date_to or '…'}"
+        ))
+
+        with transaction.atomic():
+            written = AttendanceRollup.rebuild(
+                school_id=options["school"],
+                date_from=date_from,
+                date_to=date_to,
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} rollup row(s)."))
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.utils.qr_decode import QRDecoder, DecodeStats
+
+
+class Command(BaseCommand):
+    help = "Decode every stored Student / UserProfile QR code over a process pool and report failures."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source",
+            action="append",
+            choices=QRDecoder.SOURCES,
+            help="Which QR codes to check (repeatable; default: all).",
+        )
+        parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count).")
+        parser.add_argument("--chunksize", type=int, default=32, help="Images handed to a worker at a time.")
+        parser.add_argument("--show", type=int, default=20, help="How many failures to list.")
+
+    def handle(self, *args, **options):
+        sources = options["source"] or QRDecoder.SOURCES
+        if options["workers"] is not None and options["workers"] < 1:
+            raise CommandError("--workers must be at least 1.")
+
+        try:
+            from pyzbar import pyzbar  # noqa: F401
+        except ImportError as e:
+            raise CommandError(f"pyzbar is not usable here: {e}")
+
+        self.stdout.write(self.style.NOTICE(
+            f"Decoding stored QR codes — sources={', '.join(sources)}, workers={options['workers'] or 'auto'}"
+        ))
+
+        stats = DecodeStats()
+        for source, pk, error in QRDecoder.decode_stored(
+            sources=sources,
+            workers=options["workers"],
+            chunksize=options["chunksize"],
+        ):
+            stats.add(source, pk, error)
+            if stats.total % 1000 == 0:
+                self.stdout.write(f"  {stats.total} decoded ({stats.rate:.0f}/s)…")
+
+        for source, pk, error in stats.failures[:options["show"]]:
+            self.stdout.write(self.style.WARNING(f"  {source} #{pk}: {error}"))
+        if len(stats.failures) > options["show"]:
+            self.stdout.write(self.style.WARNING(f"  … and {len(stats.failures) - options['show']} more"))
+
+        summary = (
+            f"{stats.total} QR code(s) in {stats.elapsed:.1f}s "
+            f"({stats.rate:.0f}/s), {len(stats.failures)} failure(s)."
+        )
+        if stats.failures:
+            self.stdout.write(self.style.WARNING(summary))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 from student.models import Student
 from schools.models import SchoolOrg, SchoolYear, Semester, Class, Flight
@@ -85,6 +86,19 @@ class Attendance(models.Model):
 
     class Meta:
         unique_together = ("student", "date", "class_obj")
+        constraints = [
+            # NULLs are distinct in unique_together, so kiosk scans (no class)
+            # need their own key for the ON CONFLICT upsert in AttendanceWriter
+            models.UniqueConstraint(
+                fields=["student", "date"],
+                condition=Q(class_obj__isnull=True),
+                name="unique_attendance_student_date_no_class",
+            ),
+        ]
+        indexes = [
+            # Keyset pagination of the attendance list (AttendanceListing)
+            models.Index(fields=["school", "date", "id"], name="attendance_school_date_id_idx"),
+        ]
         ordering = ["-date", "student__user__last_name"]
 
     # =========================
@@ -110,3 +124,117 @@ class Attendance(models.Model):
             f"{self.student} | {self.date} | {self.status}"
         )
 
+
+
+class DailyAttendanceRollup(models.Model):
+    """
+    Per-group, per-day attendance counts.
+
+    Maintained incrementally by the scan write path (see
+    attendance.utils.rollup.AttendanceRollup) so dashboards read
+    O(groups) rows instead of counting Attendance. Rebuild with
+    `manage.py rebuild_attendance_rollup`.
+    """
+
+    # =========================
+    # GROUP KEY (mirrors Attendance context)
+    # =========================
+
+    school = models.ForeignKey(
+        SchoolOrg,
+        on_delete=models.CASCADE,
+        related_name="attendance_rollups"
+    )
+    school_year = models.ForeignKey(
+        SchoolYear,
+        on_delete=models.CASCADE,
+        related_name="attendance_rollups",
+        null=True,
+        blank=True
+    )
+    semester = models.ForeignKey(
+        Semester,
+        on_delete=models.CASCADE,
+        related_name="attendance_rollups",
+        null=True,
+        blank=True
+    )
+    class_obj = models.ForeignKey(
+        Class,
+        on_delete=models.CASCADE,
+        related_name="attendance_rollups",
+        null=True,
+        blank=True
+    )
+    flight = models.ForeignKey(
+        Flight,
+        on_delete=models.CASCADE,
+        related_name="attendance_rollups",
+        null=True,
+        blank=True
+    )
+    date = models.DateField()
+
+    # =========================
+    # COUNTS
+    # =========================
+
+    enrolled = models.IntegerField(default=0, help_text="Enrolled headcount of the group when the day was seeded.")
+    present = models.IntegerField(default=0)
+    absent = models.IntegerField(default=0)
+    late = models.IntegerField(default=0)
+    excused = models.IntegerField(default=0)
+    dismissed = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["school", "school_year", "semester", "class_obj", "flight", "date"],
+                name="unique_attendance_rollup_group_day",
+                nulls_distinct=False,
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["school", "date"]),
+        ]
+        ordering = ["-date"]
+
+    def __str__(self):
+        return f"{self.school} | {self.flight or 'No flight'} | {self.date}"
+
+
+class StudentAttendanceCalendar(models.Model):
+    """
+    One student's kiosk attendance for one semester as a byte string.
+
+    Byte ``i`` is the status code of ``start_date + i days`` (0 = no record,
+    see attendance.utils.calendars.AttendanceCalendar.CODES), so a semester
+    is a few hundred bytes and streaks, heatmaps and per-status counts are
+    slice operations instead of Attendance row scans. Kept in sync by the
+    scan write paths; rebuild with `manage.py rebuild_attendance_calendars`.
+    """
+
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        related_name="attendance_calendars"
+    )
+    semester = models.ForeignKey(
+        Semester,
+        on_delete=models.CASCADE,
+        related_name="attendance_calendars"
+    )
+
+    # Day 0 of ``codes`` — the semester start when the calendar was built
+    start_date = models.DateField()
+    codes = models.BinaryField(default=bytes)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("student", "semester")
+
+    def __str__(self):
+        return f"{self.student} | {self.semester}"
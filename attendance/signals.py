@@ -0,0 +1,65 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_migrate
+from django.dispatch import receiver
+
+from schools.models import SchoolYear, Semester
+from student.models import Student, FlightMembership
+from attendance.models import StudentAttendanceCalendar
+from attendance.utils.calendars import AttendanceCalendar
+from attendance.utils.dedupe import DuplicateKioskRows
+from attendance.utils.roster import RosterIndex
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_roster_on_student_change(sender, instance, **kwargs):
+    """
+    Drop the cached roster(s) holding this student so the next scan reloads
+    them — after commit, or a concurrent scan could cache the old rows again.
+    """
+    student_pk, user_id, school_id = instance.pk, instance.user_id, instance.school_id
+    transaction.on_commit(
+        lambda: RosterIndex.invalidate_student(student_pk, user_id=user_id, school_id=school_id)
+    )
+
+
+@receiver(post_save, sender=FlightMembership)
+@receiver(post_delete, sender=FlightMembership)
+def invalidate_roster_on_flight_change(sender, instance, **kwargs):
+    """A flight move changes the student's current flight in the roster."""
+    student_pk = instance.student_id
+    transaction.on_commit(lambda: RosterIndex.invalidate_student(student_pk))
+
+
+@receiver(post_save, sender=Semester)
+@receiver(post_delete, sender=Semester)
+@receiver(post_save, sender=SchoolYear)
+@receiver(post_delete, sender=SchoolYear)
+def invalidate_semesters_on_change(sender, instance, **kwargs):
+    """Drop the school's cached semesters (reads only — calendar writes look them up in SQL)."""
+    if sender is SchoolYear:
+        school_id = instance.school_id
+    else:
+        school_id = (
+            SchoolYear.objects.filter(pk=instance.school_year_id).values_list("school_id", flat=True).first()
+        )
+    transaction.on_commit(lambda: AttendanceCalendar.invalidate(school_id))
+
+
+@receiver(post_save, sender=Semester)
+def rebuild_calendars_on_semester_move(sender, instance, created, **kwargs):
+    """Calendars are indexed from the semester start; moving it shifts every byte."""
+    if created:
+        return
+    moved = (
+        StudentAttendanceCalendar.objects
+        .filter(semester=instance)
+        .exclude(start_date=instance.start_date)
+        .exists()
+    )
+    if moved:
+        transaction.on_commit(lambda: AttendanceCalendar.rebuild(semester_id=instance.pk))
+
+
+# Duplicate kiosk rows would make the partial unique constraint's migration fail
+pre_migrate.connect(DuplicateKioskRows.merge_before_migrate, dispatch_uid="attendance-merge-duplicates")
@@ -0,0 +1,124 @@
+// ------------------------------------------------------------
+// 🔹 Attendance list (server-side, keyset-paginated)
+// ------------------------------------------------------------
+// /api/attendance/records/ pages on (date, id). For "next page" clicks we
+// send back the cursor of the previous page so the server never OFFSETs or
+// re-counts; any other jump (or a filter/search/order change) starts over.
+
+const ATTENDANCE_STATUS_CLASSES = {
+    PRESENT: "text-green-600",
+    LATE: "text-amber-600",
+    ABSENT: "text-red-600",
+    EXCUSED: "text-blue-600",
+    DISMISSED: "text-gray-600",
+};
+
+function attendanceFilters(extra) {
+    return Object.assign({
+        school: $("#attendanceSchoolFilter").val() || "",
+        status: $("#attendanceStatusFilter").val() || "",
+        date_from: $("#attendanceDateFrom").val() || "",
+        date_to: $("#attendanceDateTo").val() || "",
+    }, extra || {});
+}
+
+function initializeAttendanceTable(selector, fixedFilters) {
+    let cursors = {};      // start offset → cursor of the page before it
+    let counts = null;
+    let signature = null;
+
+    const table = $(selector).DataTable({
+        responsive: true,
+        serverSide: true,
+        processing: true,
+        searchDelay: 400,
+        ajax: {
+            url: "/api/attendance/records/",
+            type: "GET",
+            xhrFields: { withCredentials: true },
+            data: function (d) {
+                const filters = attendanceFilters(fixedFilters);
+                const params = {
+                    draw: d.draw,
+                    start: d.start,
+                    length: d.length,
+                    "search[value]": d.search.value,
+                    "order[0][column]": d.order.length ? d.order[0].column : 0,
+                    "order[0][dir]": d.order.length ? d.order[0].dir : "desc",
+                };
+
+                const current = JSON.stringify([filters, params["search[value]"], params["order[0][dir]"], d.length]);
+                if (current !== signature) {
+                    signature = current;
+                    cursors = {};
+                    counts = null;
+                }
+
+                if (cursors[d.start] && counts) {
+                    params.cursor = cursors[d.start];
+                    params.records_total = counts.total;
+                    params.records_filtered = counts.filtered;
+                }
+                return Object.assign(params, filters);
+            },
+            dataSrc: function (json) {
+                const settings = table.settings()[0];
+                const start = settings._iDisplayStart;
+                const length = settings._iDisplayLength;
+
+                counts = { total: json.recordsTotal, filtered: json.recordsFiltered };
+                if (json.next_cursor) {
+                    cursors[start + length] = json.next_cursor;
+                }
+                return json.data;
+            },
+        },
+        columns: [
+            { data: "date", title: "Date" },
+            { data: "student_name", title: "Cadet", orderable: false },
+            { data: "student_code", title: "Student ID", orderable: false },
+            { data: "flight_name", title: "Flight", orderable: false, defaultContent: "—" },
+            { data: "time_in", title: "Time In", orderable: false, defaultContent: "—" },
+            { data: "time_out", title: "Time Out", orderable: false, defaultContent: "—" },
+            {
+                data: "status",
+                title: "Status",
+                orderable: false,
+                render: function (data) {
+                    const css = ATTENDANCE_STATUS_CLASSES[data] || "";
+                    return `<span class="${css} font-semibold">${data}</span>`;
+                }
+            },
+        ],
+        order: [[0, "desc"]],
+    });
+
+    return table;
+}
+
+$(function () {
+    const today = new Date().toISOString().slice(0, 10);
+
+    const tables = [
+        initializeAttendanceTable("#todayAttendanceTable", { date_from: today, date_to: today }),
+        initializeAttendanceTable("#allAttendanceTable"),
+    ];
+
+    $("#attendanceStatusFilter, #attendanceDateFrom, #attendanceDateTo").on("change", function () {
+        tables.forEach(table => table.ajax.reload());
+    });
+
+    // Export streams every filtered row (not just the current page)
+    $(".btn-export-attendance").on("click", function () {
+        const params = new URLSearchParams(attendanceFilters({ format: $(this).data("format") }));
+        if ($("#todayAttendance").hasClass("active")) {
+            params.set("date_from", today);
+            params.set("date_to", today);
+        }
+        window.location.href = `/api/attendance/export/?${params.toString()}`;
+    });
+
+    $('a[data-bs-toggle="tab"]').on("shown.bs.tab", function () {
+        tables.forEach(table => table.columns.adjust());
+    });
+});
@@ -61,12 +61,19 @@ function handleDecodedQR(decodedText) {
     try {
         data = JSON.parse(decodedText);
     } catch (e) {
-        document.getElementById("result").innerText = "❌ Invalid QR Format!";
-        return;
+        // Student QR codes are plain text: SCHOOL-{school_id}-STUDENT-{student_id}
+        const match = /^SCHOOL-(\d+)-STUDENT-(.+)$/.exec(decodedText.trim());
+        if (!match) {
+            document.getElementById("result").innerText = "❌ Invalid QR Format!";
+            return;
+        }
+        data = { name: match[2] };
     }
 
+    // 🔥 Raw payload is resolved server-side
+    window.scannedPayload = decodedText;
     window.scannedUserData = data;
-    window.scannedUserId = data.user_id;
+    window.scannedUserId = data.user_id || null;
 
     // Update UI
     document.getElementById("result").innerText = `✅ Scanned: ${data.name}`;
@@ -1,14 +1,15 @@
 function confirmAttendance() {
     const userId = window.scannedUserId;
+    const qr = window.scannedPayload;
     const status = $("#attendanceStatus").val();
 
-    if (!userId) {
-        error_message("❌ No scanned User ID found.");
+    if (!qr && !userId) {
+        error_message("❌ No scanned QR found.");
         return;
     }
 
     const payload = {
-        user_id: userId,
+        qr: qr,
         status: status
     };
 
@@ -23,7 +24,7 @@ function confirmAttendance() {
         success: function (response) {
             console.log("✅ Attendance saved:", response);
 
-            success_message(`Attendance Confirmed<br>User ID: ${userId}<br>Status: ${status}`);
+            success_message(`Attendance Confirmed<br>${response.message}<br>Status: ${status}`);
 
             // Optionally hide card
             $("#studentCard").fadeOut();
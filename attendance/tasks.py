@@ -0,0 +1,22 @@
+from celery import shared_task
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from attendance.utils.auto_absent import AutoAbsent
+
+
+@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=30, retry_kwargs={"max_retries": 3})
+def mark_absent_students(self, day=None):
+    """
+    Close the day: ABSENT rows for every enrolled, active student with no record.
+    Runs on weekdays via Celery Beat (see CELERY_BEAT_SCHEDULE); idempotent, so
+    retries and manual re-runs are safe.
+    """
+    day = parse_date(day) if day else timezone.localdate()
+    results = AutoAbsent.run(day)
+
+    return {
+        "date": day.isoformat(),
+        "schools": len(results),
+        "absent_rows": sum(results.values()),
+    }
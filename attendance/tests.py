@@ -1,3 +1,90 @@
+from datetime import datetime, time
+
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.utils import timezone
+
+from attendance.models import Attendance
+from attendance.utils.dedupe import DuplicateKioskRows
+from attendance.utils.writer import AttendanceWriter
+from schools.models import SchoolOrg
+from student.models import Student
+
+
+class AttendanceWriterTests(TestCase):
+    """Kiosk scans through the single-statement upsert (PostgreSQL)."""
+
+    def setUp(self):
+        self.school = SchoolOrg.objects.create(name="WCC")
+        self.student = Student.objects.create(
+            user=User.objects.create(username="cadet"), school=self.school, student_id="S-1"
+        )
+
+    def at(self, hour):
+        return timezone.make_aware(datetime(2025, 12, 18, hour, 0))
+
+    def scan(self, hour, status="PRESENT"):
+        return AttendanceWriter.record_scan(
+            school_id=self.school.pk,
+            student_id=self.student.pk,
+            status=status,
+            scanned_at=self.at(hour),
+        )
+
+    def test_time_in_time_out_then_completed(self):
+        transition, row = self.scan(8)
+        self.assertEqual(transition, AttendanceWriter.TIME_IN)
+        self.assertEqual((row.time_in, row.time_out), (time(8), None))
+
+        transition, row = self.scan(17, status="LATE")
+        self.assertEqual(transition, AttendanceWriter.TIME_OUT)
+        self.assertEqual((row.time_in, row.time_out, row.status), (time(8), time(17), "LATE"))
+
+        transition, row = self.scan(18)
+        self.assertEqual(transition, AttendanceWriter.COMPLETED)
+        self.assertEqual((row.time_in, row.time_out, row.status), (time(8), time(17), "LATE"))
+
+        self.assertEqual(Attendance.objects.filter(student=self.student).count(), 1)
+
+    def test_time_in_over_absent_placeholder(self):
+        Attendance.objects.create(
+            school=self.school, student=self.student, date=self.at(8).date(), status="ABSENT"
+        )
+
+        transition, row = self.scan(9)
+        self.assertEqual(transition, AttendanceWriter.TIME_IN)
+        self.assertEqual((row.time_in, row.time_out, row.status), (time(9), None, "PRESENT"))
+
+        transition, row = self.scan(17)
+        self.assertEqual(transition, AttendanceWriter.TIME_OUT)
+        self.assertEqual(Attendance.objects.filter(student=self.student).count(), 1)
+
+
+class DuplicateKioskRowsTests(TestCase):
+    def test_merge_keeps_one_row_per_student_day(self):
+        school = SchoolOrg.objects.create(name="WCC")
+        student = Student.objects.create(user=User.objects.create(username="cadet"), school=school, student_id="S-1")
+        day = timezone.localdate()
+
+        constraint = next(c for c in Attendance._meta.constraints if c.name == DuplicateKioskRows.CONSTRAINT)
+        with connection.schema_editor() as editor:
+            editor.remove_constraint(Attendance, constraint)
+
+        Attendance.objects.create(school=school, student=student, date=day, status="ABSENT")
+        Attendance.objects.create(school=school, student=student, date=day, status="PRESENT", time_in=time(8))
+        Attendance.objects.create(school=school, student=student, date=day, status="PRESENT", time_in=time(9), time_out=time(17))
+
+        self.assertTrue(DuplicateKioskRows.needs_merge())
+        self.assertEqual(DuplicateKioskRows.count(), 2)
+        self.assertEqual(len(DuplicateKioskRows.merge()), 2)
+
+        row = Attendance.objects.get(student=student, date=day)
+        self.assertEqual((row.status, row.time_in, row.time_out), ("PRESENT", time(8), time(17)))
 
-# Create your tests here.
+        with connection.cursor() as cursor:
+            # Flush the deferred FK checks of the inserts above before the DDL
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        with connection.schema_editor() as editor:
+            editor.add_constraint(Attendance, constraint)
+        self.assertFalse(DuplicateKioskRows.needs_merge())
@@ -1,9 +1,10 @@
 from django.urls import path, include
-from attendance.views import AttendanceView
+from attendance.views import AttendanceView, AttendanceLiveFeedView
 app_name = "attendance"
 
 urlpatterns = [
     path('api/', include("attendance.api.urls")),
     path("attendance/", AttendanceView.as_view(), name="attendance"),
+    path("attendance/live/", AttendanceLiveFeedView.as_view(), name="attendance_live_feed"),
 
 ]
\ No newline at end of file
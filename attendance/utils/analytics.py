@@ -0,0 +1,287 @@
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from attendance.models import Attendance, DailyAttendanceRollup
+
+
+class AttendanceAnalytics:
+    """
+    Cohort analytics for one school over a date range (usually a semester).
+
+    The rows are pulled with a single ``values_list`` query into a pandas
+    frame and every metric is a vectorized group-by over it, so a whole
+    school's semester is processed in one pass instead of per-student
+    Python loops.
+
+    Results are cached under a key that includes the rollup watermark
+    (latest DailyAttendanceRollup.updated_at and row count for the scope).
+    Every attendance write bumps the rollup, so a new scan, a bulk sync or
+    a rebuild invalidates the cached report without explicit busting.
+    """
+
+    COLUMNS = [
+        "student_id",
+        "student__student_id",
+        "student__user__first_name",
+        "student__user__last_name",
+        "flight_id",
+        "flight__name",
+        "date",
+        "time_in",
+        "status",
+    ]
+
+    ATTENDED_STATUSES = ("PRESENT", "LATE")
+
+    # Time-in histogram bucket width, in minutes
+    TIME_IN_BIN_MINUTES = 15
+
+    CACHE_TIMEOUT = 60 * 60
+    CACHE_PREFIX = "attendance-analytics"
+
+    TOP_STREAKS = 20
+
+    def __init__(self, school_id, date_from, date_to, flight_id=None):
+        self.school_id = school_id
+        self.date_from = date_from
+        self.date_to = date_to
+        self.flight_id = flight_id
+
+    # ------------------------------------------------------------
+    # 🔹 Cache
+    # ------------------------------------------------------------
+    def watermark(self):
+        rollups = DailyAttendanceRollup.objects.filter(
+            school_id=self.school_id,
+            date__gte=self.date_from,
+            date__lte=self.date_to,
+        ).aggregate(updated=Max("updated_at"), rows=Count("id"))
+
+        updated = rollups["updated"].timestamp() if rollups["updated"] else 0
+        return f"{updated:.6f}:{rollups['rows']}"
+
+    def cache_key(self):
+        return ":".join(str(part) for part in (
+            self.CACHE_PREFIX,
+            self.school_id,
+            self.date_from,
+            self.date_to,
+            self.flight_id or "all",
+            self.watermark(),
+        ))
+
+    def report(self):
+        key = self.cache_key()
+        data = cache.get(key)
+        if data is None:
+            data = self.compute()
+            cache.set(key, data, self.CACHE_TIMEOUT)
+        return data
+
+    # ------------------------------------------------------------
+    # 🔹 Loading
+    # ------------------------------------------------------------
+    def load(self):
+        records = Attendance.objects.filter(
+            school_id=self.school_id,
+            date__gte=self.date_from,
+            date__lte=self.date_to,
+        )
+        if self.flight_id:
+            records = records.filter(flight_id=self.flight_id)
+
+        frame = pd.DataFrame.from_records(
+            list(records.order_by().values_list(*self.COLUMNS)),
+            columns=self.COLUMNS,
+        )
+
+        frame["flight_id"] = frame["flight_id"].fillna(0).astype("int64")
+        frame["flight__name"] = frame["flight__name"].fillna("No Flight")
+        frame["date"] = pd.to_datetime(frame["date"])
+
+        # time_in → minutes after midnight (NaN when missing)
+        frame["time_in_minutes"] = np.array(
+            [t.hour * 60 + t.minute if pd.notna(t) else np.nan for t in frame["time_in"]],
+            dtype="float64",
+        )
+
+        frame["attended"] = frame["status"].isin(self.ATTENDED_STATUSES)
+        frame["late"] = frame["status"].eq("LATE")
+        frame["absent"] = frame["status"].eq("ABSENT")
+        return frame
+
+    # ------------------------------------------------------------
+    # 🔹 Metrics
+    # ------------------------------------------------------------
+    @staticmethod
+    def _rate(numerator, denominator):
+        numerator = np.asarray(numerator, dtype="float64")
+        denominator = np.asarray(denominator, dtype="float64")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rate = np.where(denominator > 0, numerator / denominator, 0.0)
+        return np.round(rate * 100, 2)
+
+    @staticmethod
+    def _clock(minutes):
+        if minutes is None or np.isnan(minutes):
+            return None
+        minutes = int(round(minutes))
+        return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+    def cohort_totals(self, frame):
+        records = len(frame)
+        attended = int(frame["attended"].sum())
+        late = int(frame["late"].sum())
+        absent = int(frame["absent"].sum())
+        return {
+            "students": int(frame["student_id"].nunique()),
+            "days": int(frame["date"].nunique()),
+            "records": records,
+            "attended": attended,
+            "late": late,
+            "absent": absent,
+            "attendance_rate": float(self._rate(attended, records)),
+            "tardiness_rate": float(self._rate(late, attended)),
+            "median_time_in": self._clock(frame["time_in_minutes"].median()),
+        }
+
+    def per_flight(self, frame):
+        groups = frame.groupby(["flight_id", "flight__name"], sort=False)
+        grouped = groups.agg(
+            students=("student_id", "nunique"),
+            records=("status", "size"),
+            attended=("attended", "sum"),
+            late=("late", "sum"),
+            absent=("absent", "sum"),
+            median_time_in=("time_in_minutes", "median"),
+        )
+        grouped["p90_time_in"] = groups["time_in_minutes"].quantile(0.9)
+        grouped = grouped.reset_index()
+
+        grouped["attendance_rate"] = self._rate(grouped["attended"], grouped["records"])
+        grouped["tardiness_rate"] = self._rate(grouped["late"], grouped["attended"])
+        grouped = grouped.sort_values("flight__name")
+
+        return [
+            {
+                "flight_id": int(row.flight_id) or None,
+                "name": row.flight__name,
+                "students": int(row.students),
+                "records": int(row.records),
+                "attended": int(row.attended),
+                "late": int(row.late),
+                "absent": int(row.absent),
+                "attendance_rate": float(row.attendance_rate),
+                "tardiness_rate": float(row.tardiness_rate),
+                "median_time_in": self._clock(row.median_time_in),
+                "p90_time_in": self._clock(row.p90_time_in),
+            }
+            for row in grouped.itertuples(index=False)
+        ]
+
+    def time_in_distribution(self, frame):
+        minutes = frame["time_in_minutes"].dropna().to_numpy()
+        if not minutes.size:
+            return {"bin_minutes": self.TIME_IN_BIN_MINUTES, "bins": []}
+
+        width = self.TIME_IN_BIN_MINUTES
+        low = np.floor(minutes.min() / width) * width
+        high = np.floor(minutes.max() / width) * width + width
+        counts, edges = np.histogram(minutes, bins=np.arange(low, high + width, width))
+
+        percentiles = np.percentile(minutes, [10, 50, 90])
+        return {
+            "bin_minutes": width,
+            "bins": [
+                {"start": self._clock(edge), "count": int(count)}
+                for edge, count in zip(edges[:-1], counts)
+                if count
+            ],
+            "p10": self._clock(percentiles[0]),
+            "p50": self._clock(percentiles[1]),
+            "p90": self._clock(percentiles[2]),
+        }
+
+    def absence_streaks(self, frame):
+        """
+        Longest and current run of consecutive ABSENT records per student.
+
+        Runs are counted over the student's recorded school days (sorted by
+        date), so weekends and holidays without records don't break a streak.
+        """
+        frame = frame.sort_values(["student_id", "date"], kind="stable")
+
+        student = frame["student_id"].to_numpy()
+        absent = frame["absent"].to_numpy()
+
+        # A new run starts at every non-absent record and at every student change
+        new_student = np.r_[True, student[1:] != student[:-1]]
+        run_id = np.cumsum(new_student | ~absent)
+
+        run_length = pd.Series(absent.astype("int64")).groupby(run_id).transform("sum").to_numpy()
+
+        per_student = pd.DataFrame({
+            "student_id": student,
+            "run_length": np.where(absent, run_length, 0),
+            "is_last": np.r_[student[1:] != student[:-1], True],
+            "absent": absent,
+        })
+
+        longest = per_student.groupby("student_id")["run_length"].max()
+        current = per_student[per_student["is_last"]].set_index("student_id")
+        current = current["run_length"].where(current["absent"], 0)
+
+        names = frame.drop_duplicates("student_id").set_index("student_id")
+        streaks = pd.DataFrame({"longest": longest, "current": current}).join(
+            names[["student__student_id", "student__user__first_name", "student__user__last_name", "flight__name"]]
+        )
+        streaks = streaks[streaks["longest"] > 0].sort_values(
+            ["current", "longest"], ascending=False
+        ).head(self.TOP_STREAKS)
+
+        return {
+            "students_with_absences": int((longest > 0).sum()),
+            "longest": int(longest.max()) if len(longest) else 0,
+            "top": [
+                {
+                    "student_id": int(student_id),
+                    "student_code": row.student__student_id,
+                    "name": f"{row.student__user__first_name or ''} {row.student__user__last_name or ''}".strip(),
+                    "flight": row.flight__name,
+                    "longest_streak": int(row.longest),
+                    "current_streak": int(row.current),
+                }
+                for student_id, row in zip(streaks.index, streaks.itertuples(index=False))
+            ],
+        }
+
+    # ------------------------------------------------------------
+    # 🔹 Main entry point
+    # ------------------------------------------------------------
+    def compute(self):
+        frame = self.load()
+
+        data = {
+            "school": self.school_id,
+            "date_from": self.date_from.isoformat(),
+            "date_to": self.date_to.isoformat(),
+        }
+
+        if frame.empty:
+            data.update({
+                "totals": self.cohort_totals(frame),
+                "flights": [],
+                "time_in": self.time_in_distribution(frame),
+                "absence_streaks": {"students_with_absences": 0, "longest": 0, "top": []},
+            })
+            return data
+
+        data.update({
+            "totals": self.cohort_totals(frame),
+            "flights": self.per_flight(frame),
+            "time_in": self.time_in_distribution(frame),
+            "absence_streaks": self.absence_streaks(frame),
+        })
+        return data
@@ -0,0 +1,111 @@
+from django.db import connection, transaction
+
+from attendance.models import Attendance
+from attendance.utils.calendars import AttendanceCalendar
+from attendance.utils.rollup import AttendanceRollup
+from schools.models import SchoolOrg
+from student.models import Student, FlightMembership
+
+
+class AutoAbsent:
+    """
+    End-of-day ABSENT rows for students who never scanned.
+
+    Each school is one set-based statement: an anti-join ``INSERT ...
+    SELECT`` over its enrolled, active students that have no kiosk row for
+    the day, with the current flight looked up in the same statement. The
+    inserted rows are counted per flight in SQL and applied to the daily
+    rollup as one counter UPDATE per flight.
+
+    Re-running is safe: students who already have a row for the day are
+    skipped by the anti-join, and ``ON CONFLICT DO NOTHING`` on the
+    (student, date) kiosk key covers a scan racing the job. A student who
+    scans after being marked absent gets a normal time-in (see
+    AttendanceWriter).
+    """
+
+    STATUS = "ABSENT"
+
+    @classmethod
+    def schools_in_session(cls, day):
+        """Schools with a semester covering ``day`` — no absences during breaks."""
+        return list(
+            SchoolOrg.objects
+            .filter(
+                school_years__semesters__start_date__lte=day,
+                school_years__semesters__end_date__gte=day,
+            )
+            .values_list("id", flat=True)
+            .distinct()
+            .order_by("id")
+        )
+
+    @classmethod
+    def _insert_sql(cls):
+        q = connection.ops.quote_name
+        attendance = Attendance._meta.db_table
+        student = Student._meta.db_table
+        membership = FlightMembership._meta.db_table
+
+        off_roster = ", ".join(["%s"] * len(AttendanceRollup.OFF_ROSTER_STATUSES))
+
+        return f"""
+            WITH inserted AS (
+                INSERT INTO {q(attendance)}
+                    ({q('school_id')}, {q('student_id')}, {q('flight_id')}, {q('date')}, {q('status')})
+                SELECT
+                    s.{q('school_id')},
+                    s.{q('id')},
+                    (
+                        SELECT fm.{q('flight_id')} FROM {q(membership)} fm
+                        WHERE fm.{q('student_id')} = s.{q('id')}
+                        ORDER BY fm.{q('joined_at')} DESC
+                        LIMIT 1
+                    ),
+                    %s,
+                    %s
+                FROM {q(student)} s
+                WHERE s.{q('school_id')} = %s
+                  AND s.{q('is_active')}
+                  AND s.{q('enrollment_status')} NOT IN ({off_roster})
+                  AND NOT EXISTS (
+                      SELECT 1 FROM {q(attendance)} a
+                      WHERE a.{q('student_id')} = s.{q('id')}
+                        AND a.{q('date')} = %s
+                        AND a.{q('class_obj_id')} IS NULL
+                  )
+                ON CONFLICT ({q('student_id')}, {q('date')}) WHERE {q('class_obj_id')} IS NULL
+                DO NOTHING
+                RETURNING {q('flight_id')}
+            )
+            SELECT {q('flight_id')}, COUNT(*) FROM inserted GROUP BY {q('flight_id')}
+        """
+
+    @classmethod
+    def mark_school(cls, school_id, day):
+        """Insert the day's ABSENT rows for one school. Returns the number of rows inserted."""
+        params = [day, cls.STATUS, school_id, *AttendanceRollup.OFF_ROSTER_STATUSES, day]
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(cls._insert_sql(), params)
+                per_flight = cursor.fetchall()
+
+            AttendanceRollup.apply({
+                (school_id, None, None, None, flight_id, day): {AttendanceRollup.STATUS_COLUMNS[cls.STATUS]: count}
+                for flight_id, count in per_flight
+            })
+            if per_flight:
+                AttendanceCalendar.sync(school_id, day)
+
+        return sum(count for _, count in per_flight)
+
+    @classmethod
+    def run(cls, day, school_ids=None):
+        """
+        Mark absences for ``day`` in the given schools (default: every school
+        in session that day). Returns {school_id: rows inserted}.
+        """
+        if school_ids is None:
+            school_ids = cls.schools_in_session(day)
+        return {school_id: cls.mark_school(school_id, day) for school_id in school_ids}
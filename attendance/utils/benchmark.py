@@ -0,0 +1,250 @@
+import json
+import platform
+import random
+import statistics
+import subprocess
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from attendance.models import Attendance
+from attendance.utils.roster import RosterIndex
+from schools.models import SchoolOrg, SchoolYear, Semester, Class, Flight
+from student.models import Student, FlightMembership
+
+
+class ScanBenchmark:
+    """
+    Scan-to-record latency benchmark for ``POST /api/attendance/submit/``.
+
+    Seeds a throwaway school (students, flights, a semester covering
+    today), then replays a kiosk morning: every student scans in and out
+    once, in random order, split across ``kiosks`` threads that post
+    through the Django test client — the full middleware / DRF / writer
+    path, each thread on its own database connection. Everything seeded
+    is deleted afterwards unless ``keep`` is set.
+
+    Reports latency percentiles, queries per scan and committed rows per
+    second; ``to_json`` output is meant to be saved per commit and
+    compared with ``compare``.
+    """
+
+    SUBMIT_URL = "/api/attendance/submit/"
+    FLIGHT_SIZE = 40
+    SEED_BATCH = 1000
+
+    def __init__(self, students=500, kiosks=4, scans_per_student=2, warm=True, keep=False, seed=None):
+        self.students = students
+        self.kiosks = kiosks
+        self.scans_per_student = scans_per_student
+        self.warm = warm
+        self.keep = keep
+        self.random = random.Random(seed)
+
+        self.tag = f"bench-{uuid.uuid4().hex[:8]}"
+        self.school = None
+        self.admin = None
+        self.payloads = []
+
+    # ------------------------------------------------------------
+    # 🔹 Seed / cleanup
+    # ------------------------------------------------------------
+    def seed(self):
+        today = timezone.localdate()
+        self.school = SchoolOrg.objects.create(name=f"Benchmark {self.tag}")
+        school_year = SchoolYear.objects.create(
+            school=self.school, name=self.tag,
+            start_date=today - timedelta(days=60), end_date=today + timedelta(days=300),
+        )
+        semester = Semester.objects.create(
+            school_year=school_year, name=self.tag,
+            start_date=today - timedelta(days=60), end_date=today + timedelta(days=120),
+        )
+        class_obj = Class.objects.create(semester=semester, name=self.tag, code=self.tag)
+
+        # bulk_create: the benchmark measures scans, not enrollment (no QR rendering here)
+        users = User.objects.bulk_create([
+            User(username=f"{self.tag}-{i}", first_name=f"Cadet{i}", last_name=self.tag)
+            for i in range(self.students)
+        ], batch_size=self.SEED_BATCH)
+        students = Student.objects.bulk_create([
+            Student(
+                user=user,
+                school=self.school,
+                student_id=f"{self.tag}-{i}",
+                first_name=user.first_name,
+                last_name=user.last_name,
+                enrollment_status="enrolled",
+            )
+            for i, user in enumerate(users)
+        ], batch_size=self.SEED_BATCH)
+
+        flights = Flight.objects.bulk_create([
+            Flight(class_obj=class_obj, name=f"Flight {n + 1}")
+            for n in range((self.students + self.FLIGHT_SIZE - 1) // self.FLIGHT_SIZE)
+        ])
+        FlightMembership.objects.bulk_create([
+            FlightMembership(flight=flights[i // self.FLIGHT_SIZE], student=student)
+            for i, student in enumerate(students)
+        ], batch_size=self.SEED_BATCH)
+
+        self.admin = User.objects.create_superuser(f"{self.tag}-kiosk", password=None)
+        self.payloads = [f"SCHOOL-{self.school.pk}-STUDENT-{s.student_id}" for s in students]
+
+    def cleanup(self):
+        if self.school is None:
+            return
+        # Attendance / rollups / calendars / students cascade from the school
+        self.school.delete()
+        User.objects.filter(username__startswith=f"{self.tag}-").delete()
+
+    # ------------------------------------------------------------
+    # 🔹 Run
+    # ------------------------------------------------------------
+    def plan(self):
+        """Scans in arrival order, dealt round-robin to the kiosks."""
+        scans = [payload for payload in self.payloads for _ in range(self.scans_per_student)]
+        self.random.shuffle(scans)
+        return [scans[k::self.kiosks] for k in range(self.kiosks)]
+
+    def kiosk(self, scans, barrier, samples):
+        client = Client()
+        client.force_login(self.admin)
+        barrier.wait()
+
+        try:
+            for payload in scans:
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    response = client.post(
+                        self.SUBMIT_URL,
+                        {"qr": payload, "status": "PRESENT"},
+                        content_type="application/json",
+                    )
+                    elapsed = time.perf_counter() - started
+                samples.append((elapsed, len(queries), response.status_code))
+        finally:
+            connections.close_all()
+
+    def run(self):
+        self.seed()
+        try:
+            if self.warm:
+                # Steady state: the kiosk roster is already cached when the morning starts
+                RosterIndex.get(self.school.pk)
+            plans = self.plan()
+            samples = []
+            barrier = threading.Barrier(self.kiosks + 1)
+            threads = [
+                threading.Thread(target=self.kiosk, args=(scans, barrier, samples), daemon=True)
+                for scans in plans
+            ]
+
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+                for thread in threads:
+                    thread.start()
+                barrier.wait()
+                started = time.perf_counter()
+                for thread in threads:
+                    thread.join()
+                wall = time.perf_counter() - started
+
+            rows = Attendance.objects.filter(school=self.school).count()
+            return self.report(samples, wall, rows)
+        finally:
+            if not self.keep:
+                self.cleanup()
+
+    # ------------------------------------------------------------
+    # 🔹 Results
+    # ------------------------------------------------------------
+    @staticmethod
+    def percentile(sorted_values, pct):
+        if not sorted_values:
+            return None
+        index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+        return sorted_values[index]
+
+    def report(self, samples, wall, rows):
+        latencies = sorted(s[0] * 1000 for s in samples)
+        queries = [s[1] for s in samples]
+        statuses = {}
+        for _, _, code in samples:
+            statuses[str(code)] = statuses.get(str(code), 0) + 1
+
+        return {
+            "benchmark": "scan_submit",
+            "timestamp": timezone.now().isoformat(),
+            "commit": self.git_commit(),
+            "environment": {
+                "python": platform.python_version(),
+                "database": connection.vendor,
+                "debug": settings.DEBUG,
+            },
+            "params": {
+                "students": self.students,
+                "kiosks": self.kiosks,
+                "scans_per_student": self.scans_per_student,
+                "warm": self.warm,
+            },
+            "scans": len(samples),
+            "status_codes": statuses,
+            "wall_seconds": round(wall, 3),
+            "scans_per_second": round(len(samples) / wall, 1) if wall else None,
+            "rows_written": rows,
+            "rows_per_second": round(rows / wall, 1) if wall else None,
+            "latency_ms": {
+                "mean": round(statistics.fmean(latencies), 2) if latencies else None,
+                "p50": round(self.percentile(latencies, 50), 2) if latencies else None,
+                "p95": round(self.percentile(latencies, 95), 2) if latencies else None,
+                "p99": round(self.percentile(latencies, 99), 2) if latencies else None,
+                "max": round(latencies[-1], 2) if latencies else None,
+            },
+            "queries_per_scan": {
+                "mean": round(statistics.fmean(queries), 2) if queries else None,
+                "max": max(queries) if queries else None,
+            },
+        }
+
+    @staticmethod
+    def git_commit():
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5,
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    @staticmethod
+    def to_json(result, path):
+        with open(path, "w") as f:
+            json.dump(result, f, indent=2)
+
+    @staticmethod
+    def compare(result, baseline):
+        """Yield (metric, baseline, current, change %) for the headline numbers."""
+        metrics = [
+            ("latency_ms.p50", lambda r: r["latency_ms"]["p50"]),
+            ("latency_ms.p95", lambda r: r["latency_ms"]["p95"]),
+            ("latency_ms.p99", lambda r: r["latency_ms"]["p99"]),
+            ("queries_per_scan.mean", lambda r: r["queries_per_scan"]["mean"]),
+            ("rows_per_second", lambda r: r["rows_per_second"]),
+        ]
+        for name, get in metrics:
+            try:
+                before, after = get(baseline), get(result)
+            except (KeyError, TypeError):
+                continue
+            if before is None or after is None:
+                continue
+            change = (after - before) / before * 100 if before else None
+            yield name, before, after, change
@@ -0,0 +1,237 @@
+from django.db import transaction, OperationalError
+from django.utils import timezone
+
+from attendance.models import Attendance
+from attendance.utils.calendars import AttendanceCalendar
+from attendance.utils.live_feed import AttendanceFeed
+from attendance.utils.rollup import AttendanceRollup
+from attendance.utils.roster import RosterIndex
+from attendance.utils.writer import AttendanceWriter
+
+
+class BulkScanSync:
+    """
+    Apply a backlog of kiosk scans with a fixed number of statements.
+
+    Scans are grouped per (student, date) and written with AttendanceWriter's
+    ``INSERT ... ON CONFLICT`` state machine, one multi-row statement per
+    round: the first scan of every pair, then the second. A pair can't
+    move past time-out, so later scans are "completed" without a write,
+    and the transitions come out exactly as if the scans had been
+    submitted one at a time. The daily rollup gets one counter UPDATE per
+    touched group.
+
+    Nothing is locked up front: a live kiosk scan of the same pair just
+    waits on (or is waited on by) the conflicting row, and rows are always
+    written in (student, date) order so overlapping batches can't
+    deadlock. Should one still be reported, the batch is rolled back and
+    replayed scan by scan.
+
+    Each scan is a dict with a raw "qr" payload or a "user_id":
+        {"qr": "SCHOOL-3-STUDENT-STD-1A2B3C4D", "status": "PRESENT", "scanned_at": <aware datetime>}
+    """
+
+    TIME_IN = AttendanceWriter.TIME_IN
+    TIME_OUT = AttendanceWriter.TIME_OUT
+    COMPLETED = AttendanceWriter.COMPLETED
+    ERROR = "error"
+
+    def __init__(self, scans):
+        self.scans = list(scans)
+
+    # ------------------------------------------------------------
+    # 🔹 Resolution
+    # ------------------------------------------------------------
+    def resolve_students(self):
+        """
+        Resolve every scan to a RosterEntry (or None) through the cached rosters.
+        Cold schools are loaded once; warm ones cost no queries.
+        """
+        RosterIndex.warm_for_users({
+            scan["user_id"] for scan in self.scans
+            if not scan.get("qr") and scan.get("user_id")
+        })
+
+        return [
+            RosterIndex.resolve(scan["qr"]) if scan.get("qr")
+            else RosterIndex.resolve_user(scan["user_id"])
+            for scan in self.scans
+        ]
+
+    @staticmethod
+    def load_rows(keys):
+        """Fetch the kiosk rows of the given (student, date) pairs in one query."""
+        if not keys:
+            return {}
+
+        rows = Attendance.objects.filter(
+            student_id__in={student_id for student_id, _ in keys},
+            date__in={date for _, date in keys},
+            class_obj__isnull=True,
+        )
+        return {
+            (row.student_id, row.date): row
+            for row in rows
+            if (row.student_id, row.date) in keys
+        }
+
+    def prepare(self):
+        """
+        Resolve students and order the scans.
+
+        Returns (results, keyed): results is pre-filled with errors for
+        unresolvable scans, keyed is [(index, entry, date, time)] in scan order.
+        """
+        students = self.resolve_students()
+
+        # Replay in scan order; ties keep submission order
+        order = sorted(
+            range(len(self.scans)),
+            key=lambda i: self.scans[i]["scanned_at"],
+        )
+
+        results = [None] * len(self.scans)
+        keyed = []
+
+        for i in order:
+            scan = self.scans[i]
+            student = students[i]
+            if student is None or not student.is_active:
+                results[i] = {
+                    "index": i,
+                    "user_id": student.user_id if student else scan.get("user_id"),
+                    "result": self.ERROR,
+                    "error": (
+                        "Student is inactive" if student
+                        else "Student profile not found for this user"
+                    ),
+                }
+                continue
+
+            local = timezone.localtime(scan["scanned_at"])
+            keyed.append((i, student, local.date(), local.time()))
+
+        return results, keyed
+
+    @staticmethod
+    def describe(result, row):
+        result.update({
+            "attendance_id": row.pk,
+            "date": row.date,
+            "time_in": row.time_in,
+            "time_out": row.time_out,
+            "status": row.status,
+        })
+        return result
+
+    # ------------------------------------------------------------
+    # 🔹 Main entry point
+    # ------------------------------------------------------------
+    def apply(self):
+        """
+        Returns a list of per-scan result dicts, in the same order the scans were given.
+        """
+        results, keyed = self.prepare()
+
+        try:
+            with transaction.atomic():
+                return self.apply_batched(results, keyed)
+        except OperationalError:
+            # Deadlock / serialization failure reported by PostgreSQL
+            return self.apply_one_by_one(results, keyed)
+
+    def apply_one_by_one(self, results, keyed):
+        """Fallback: one race-free upsert per scan."""
+        for i, student, date, time in keyed:
+            transition, row = AttendanceWriter.record_scan(
+                school_id=student.school_id,
+                student_id=student.student_pk,
+                flight_id=student.flight_id,
+                status=self.scans[i]["status"],
+                scanned_at=self.scans[i]["scanned_at"],
+            )
+            results[i] = self.describe(
+                {"index": i, "user_id": student.user_id, "result": transition}, row
+            )
+        return results
+
+    def apply_batched(self, results, keyed):
+        results = list(results)
+
+        # Scans per (student, date), in scan order
+        per_key = {}
+        for i, student, date, time in keyed:
+            per_key.setdefault((student.student_pk, date), []).append((i, student, time))
+
+        written = {}          # key → Attendance, final state
+        original_status = {}  # key → status before the batch (None: new row)
+        deltas = {}
+
+        # Round 0: time-in (or time-out of a row opened earlier); round 1: time-out
+        for round_ in (0, 1):
+            batch = {key: scans[round_] for key, scans in per_key.items() if len(scans) > round_}
+            if not batch:
+                break
+
+            returned = AttendanceWriter.upsert_many([
+                (student.school_id, student.student_pk, student.flight_id, date, time, self.scans[i]["status"])
+                for (_, date), (i, student, time) in batch.items()
+            ])
+
+            for key, (i, student, _) in batch.items():
+                result = {"index": i, "user_id": student.user_id, "result": self.COMPLETED, "key": key}
+                results[i] = result
+
+                row = returned.get(key)
+                if row is None:
+                    continue
+                pk, school_id, flight_id, time_in, time_out, status, timed_in, previous_status = row
+                attendance = Attendance(
+                    id=pk,
+                    school_id=school_id,
+                    student_id=key[0],
+                    flight_id=flight_id,
+                    date=key[1],
+                    time_in=time_in,
+                    time_out=time_out,
+                    status=status,
+                )
+                if not timed_in and previous_status is None:
+                    # Row inserted by a live scan after our snapshot (see AttendanceWriter)
+                    previous_status = status
+
+                original_status.setdefault(key, previous_status)
+                written[key] = attendance
+                result["result"] = self.TIME_IN if timed_in else self.TIME_OUT
+
+                group = deltas.setdefault(AttendanceRollup.group_key(attendance), {})
+                for column, n in AttendanceRollup.transition_delta(status, previous_status).items():
+                    group[column] = group.get(column, 0) + n
+
+        # Third and later scans of a pair: the day is closed by now
+        for key, scans in per_key.items():
+            for i, student, _ in scans[2:]:
+                results[i] = {"index": i, "user_id": student.user_id, "result": self.COMPLETED, "key": key}
+
+        AttendanceRollup.apply(deltas)
+
+        # One calendar statement per school-day touched by the batch
+        touched = {}
+        for row in written.values():
+            touched.setdefault((row.school_id, row.date), []).append(row.student_id)
+        for (school_id, date), student_ids in touched.items():
+            AttendanceCalendar.sync(school_id, date, student_ids)
+
+        # One event per written row, with its final state (sent on commit)
+        for key, row in written.items():
+            transition = self.TIME_OUT if row.time_out else self.TIME_IN
+            AttendanceFeed.publish_scan(transition, row, original_status.get(key))
+
+        rows = {**self.load_rows(set(per_key) - set(written)), **written}
+        for result in results:
+            key = result.pop("key", None) if result else None
+            if key is None:
+                continue
+            self.describe(result, rows[key])
+
+        return results
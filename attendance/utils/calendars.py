@@ -0,0 +1,280 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from attendance.models import Attendance, StudentAttendanceCalendar
+from schools.models import SchoolYear, Semester
+
+
+class AttendanceCalendar:
+    """
+    Maintenance and reads of StudentAttendanceCalendar byte strings.
+
+    Writes are set-based: ``sync`` copies the kiosk rows of one school-day
+    (optionally only some students) into their calendars with a single
+    ``INSERT ... SELECT ... ON CONFLICT DO UPDATE`` that sets one byte per
+    student with ``set_byte``. Re-running it is harmless. The semester and
+    the byte offset are resolved in that same statement (the offset from
+    the stored row's own ``start_date``), never from a cache.
+
+    Reads load one small row and work on its bytes: per-status counts are
+    ``bytes.count``, a date range is a slice, and streaks are a pass over
+    at most a semester's worth of bytes.
+    """
+
+    CODES = {
+        "PRESENT": 1,
+        "LATE": 2,
+        "ABSENT": 3,
+        "EXCUSED": 4,
+        "DISMISSED": 5,
+    }
+    STATUSES = {code: status for status, code in CODES.items()}
+    NO_RECORD = 0
+
+    ATTENDED_CODES = (CODES["PRESENT"], CODES["LATE"])
+
+    # school_id → [(start_date, end_date, semester_id)] in the Django cache,
+    # for reads only; dropped by attendance.signals, else expires
+    CACHE_PREFIX = "attendance-semesters"
+    CACHE_TIMEOUT = 5 * 60
+
+    # ------------------------------------------------------------
+    # 🔹 Semester lookup (cached per school, reads only)
+    # ------------------------------------------------------------
+    @classmethod
+    def key(cls, school_id):
+        return f"{cls.CACHE_PREFIX}:{school_id}"
+
+    @classmethod
+    def semesters(cls, school_id):
+        key = cls.key(school_id)
+        periods = cache.get(key)
+        if periods is None:
+            periods = list(
+                Semester.objects
+                .filter(school_year__school_id=school_id)
+                .order_by("start_date")
+                .values_list("start_date", "end_date", "id")
+            )
+            cache.set(key, periods, cls.CACHE_TIMEOUT)
+        return periods
+
+    @classmethod
+    def semester_for(cls, school_id, day):
+        """(semester_id, start_date, length_in_days) of the semester covering ``day``, or None."""
+        for start, end, semester_id in cls.semesters(school_id):
+            if start <= day <= end:
+                return semester_id, start, (end - start).days + 1
+        return None
+
+    @classmethod
+    def invalidate(cls, *school_ids):
+        keys = [cls.key(school_id) for school_id in set(school_ids) if school_id is not None]
+        if keys:
+            cache.delete_many(keys)
+
+    # ------------------------------------------------------------
+    # 🔹 Write path
+    # ------------------------------------------------------------
+    @classmethod
+    def _status_code_sql(cls, column):
+        cases = " ".join(f"WHEN '{status}' THEN {code}" for status, code in cls.CODES.items())
+        return f"CASE {column} {cases} ELSE {cls.NO_RECORD} END"
+
+    @classmethod
+    def _sync_sql(cls, with_students):
+        q = connection.ops.quote_name
+        calendar = StudentAttendanceCalendar._meta.db_table
+        attendance = Attendance._meta.db_table
+        semester = Semester._meta.db_table
+        school_year = SchoolYear._meta.db_table
+
+        # Byte of the day in the stored row — its start_date, not the semester's
+        # current one (a moved semester is realigned by ``rebuild``)
+        offset = f"(%(day)s::date - cal.{q('start_date')})"
+        # Grow the stored bytes when the semester was extended
+        padded = (
+            f"CASE WHEN length(cal.{q('codes')}) > {offset} THEN cal.{q('codes')} "
+            f"ELSE cal.{q('codes')} || decode(repeat('00', {offset} + 1 - length(cal.{q('codes')})), 'hex') END"
+        )
+        students = f"AND a.{q('student_id')} = ANY(%(students)s)" if with_students else ""
+
+        return f"""
+            WITH sem AS (
+                SELECT s.{q('id')} AS id,
+                       s.{q('start_date')} AS start_date,
+                       s.{q('end_date')} - s.{q('start_date')} + 1 AS length
+                FROM {q(semester)} s
+                JOIN {q(school_year)} y ON y.{q('id')} = s.{q('school_year_id')}
+                WHERE y.{q('school_id')} = %(school)s
+                  AND %(day)s::date BETWEEN s.{q('start_date')} AND s.{q('end_date')}
+                ORDER BY s.{q('start_date')}
+                LIMIT 1
+            )
+            INSERT INTO {q(calendar)} AS cal
+                ({q('student_id')}, {q('semester_id')}, {q('start_date')}, {q('codes')}, {q('updated_at')})
+            SELECT
+                a.{q('student_id')},
+                sem.id,
+                sem.start_date,
+                set_byte(
+                    decode(repeat('00', sem.length), 'hex'),
+                    %(day)s::date - sem.start_date,
+                    {cls._status_code_sql(f"a.{q('status')}")}
+                ),
+                now()
+            FROM {q(attendance)} a
+            CROSS JOIN sem
+            WHERE a.{q('school_id')} = %(school)s
+              AND a.{q('date')} = %(day)s
+              AND a.{q('class_obj_id')} IS NULL
+              {students}
+            ON CONFLICT ({q('student_id')}, {q('semester_id')}) DO UPDATE SET
+                {q('codes')} = set_byte(
+                    {padded}, {offset},
+                    get_byte(EXCLUDED.{q('codes')}, %(day)s::date - EXCLUDED.{q('start_date')})
+                ),
+                {q('updated_at')} = now()
+            WHERE {offset} >= 0
+        """
+
+    @classmethod
+    def sync(cls, school_id, day, student_ids=None):
+        """
+        Copy the kiosk statuses of ``day`` into the students' semester
+        calendars (all of the school's students, or only ``student_ids``).
+        Days outside every semester are not tracked.
+        """
+        params = {
+            "school": school_id,
+            "day": day,
+            "students": list(student_ids or []),
+        }
+        with connection.cursor() as cursor:
+            cursor.execute(cls._sync_sql(with_students=student_ids is not None), params)
+
+    # ------------------------------------------------------------
+    # 🔹 Backfill
+    # ------------------------------------------------------------
+    @classmethod
+    def build(cls, records, start, length):
+        """Encode an iterable of (date, status) into a calendar byte string."""
+        codes = bytearray(length)
+        for day, status in records:
+            offset = (day - start).days
+            if 0 <= offset < length:
+                codes[offset] = cls.CODES.get(status, cls.NO_RECORD)
+        return bytes(codes)
+
+    @classmethod
+    def rebuild(cls, semester_id=None, school_id=None, student_id=None):
+        """Recompute calendars from Attendance for the given scope. Returns calendars written."""
+        semesters = Semester.objects.select_related("school_year")
+        if semester_id:
+            semesters = semesters.filter(pk=semester_id)
+        if school_id:
+            semesters = semesters.filter(school_year__school_id=school_id)
+
+        written = 0
+        for semester in semesters:
+            length = (semester.end_date - semester.start_date).days + 1
+            if length <= 0:
+                continue
+
+            records = Attendance.objects.filter(
+                school_id=semester.school_year.school_id,
+                date__gte=semester.start_date,
+                date__lte=semester.end_date,
+                class_obj__isnull=True,
+            )
+            calendars = StudentAttendanceCalendar.objects.filter(semester=semester)
+            if student_id:
+                records = records.filter(student_id=student_id)
+                calendars = calendars.filter(student_id=student_id)
+
+            per_student = {}
+            for student, day, status in records.order_by().values_list("student_id", "date", "status").iterator(chunk_size=5000):
+                per_student.setdefault(student, []).append((day, status))
+
+            with transaction.atomic():
+                calendars.delete()
+                StudentAttendanceCalendar.objects.bulk_create([
+                    StudentAttendanceCalendar(
+                        student_id=student,
+                        semester=semester,
+                        start_date=semester.start_date,
+                        codes=cls.build(days, semester.start_date, length),
+                    )
+                    for student, days in per_student.items()
+                ], batch_size=1000)
+            written += len(per_student)
+
+        return written
+
+    # ------------------------------------------------------------
+    # 🔹 Reads
+    # ------------------------------------------------------------
+    @classmethod
+    def load(cls, student_id, semester):
+        """(start_date, codes) for a student's semester; empty when nothing was recorded."""
+        row = (
+            StudentAttendanceCalendar.objects
+            .filter(student_id=student_id, semester=semester)
+            .values_list("start_date", "codes")
+            .first()
+        )
+        if row is None:
+            return semester.start_date, b""
+        start, codes = row
+        return start, bytes(codes)
+
+    @classmethod
+    def streaks(cls, codes, wanted):
+        """(current, longest) run of ``wanted`` codes, skipping days with no record."""
+        current = longest = 0
+        for code in codes:
+            if code == cls.NO_RECORD:
+                continue
+            if code in wanted:
+                current += 1
+                longest = max(longest, current)
+            else:
+                current = 0
+        return current, longest
+
+    @classmethod
+    def summary(cls, student_id, semester, until=None):
+        """
+        Counts, streaks and the per-day codes of one student's semester.
+        ``until`` (e.g. today) cuts the calendar so future days aren't counted.
+        """
+        start, codes = cls.load(student_id, semester)
+
+        length = (semester.end_date - start).days + 1
+        if until is not None:
+            length = min(length, max((until - start).days + 1, 0))
+        codes = codes[:length].ljust(length, b"\x00")
+
+        absent_streak, longest_absent_streak = cls.streaks(codes, (cls.CODES["ABSENT"],))
+        attended_streak, longest_attended_streak = cls.streaks(codes, cls.ATTENDED_CODES)
+
+        counts = {status.lower(): codes.count(code) for status, code in cls.CODES.items()}
+        recorded = sum(counts.values())
+
+        return {
+            "student": student_id,
+            "semester": semester.pk,
+            "start_date": start,
+            "end_date": start + timedelta(days=len(codes) - 1) if codes else start,
+            # One digit per day from start_date: 0 none, 1 present, 2 late, 3 absent, 4 excused, 5 dismissed
+            "codes": "".join(str(code) for code in codes),
+            "days_recorded": recorded,
+            "days_present": counts["present"] + counts["late"],
+            "counts": counts,
+            "current_absent_streak": absent_streak,
+            "longest_absent_streak": longest_absent_streak,
+            "current_attended_streak": attended_streak,
+            "longest_attended_streak": longest_attended_streak,
+        }
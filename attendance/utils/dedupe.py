@@ -0,0 +1,116 @@
+import logging
+
+from django.db import DatabaseError, connections, transaction
+
+from attendance.models import Attendance
+
+logger = logging.getLogger(__name__)
+
+
+class DuplicateKioskRows:
+    """
+    Merge duplicate kiosk rows — several (student, date) rows with no
+    class — so the partial unique constraint AttendanceWriter upserts
+    against (``unique_attendance_student_date_no_class``) can be built.
+
+    ``unique_together`` treats NULL class_obj values as distinct, so older
+    deployments may hold such duplicates. Per (student, date) one row is
+    kept — the first one with a time-in (a real scan over an auto-absent
+    placeholder), else the oldest — with the earliest time-in and latest
+    time-out of the group; the others are deleted. One statement.
+
+    Runs automatically before ``migrate`` (``merge_before_migrate``, while
+    the constraint doesn't exist yet) and via ``manage.py
+    merge_duplicate_attendance``, which also rebuilds the affected rollups
+    and calendars.
+    """
+
+    CONSTRAINT = "unique_attendance_student_date_no_class"
+    COLUMNS = {"id", "school_id", "student_id", "class_obj_id", "date", "time_in", "time_out"}
+
+    @classmethod
+    def _groups_sql(cls):
+        q = connections["default"].ops.quote_name
+        table = q(Attendance._meta.db_table)
+        return f"""
+            SELECT {q('id')} AS id,
+                   first_value({q('id')}) OVER same_day AS keeper_id,
+                   min({q('time_in')}) OVER same_day AS first_in,
+                   max({q('time_out')}) OVER same_day AS last_out,
+                   count(*) OVER same_day AS group_size
+            FROM {table}
+            WHERE {q('class_obj_id')} IS NULL
+            WINDOW same_day AS (
+                PARTITION BY {q('student_id')}, {q('date')}
+                ORDER BY ({q('time_in')} IS NULL), {q('id')}
+                ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+            )
+        """
+
+    @classmethod
+    def _merge_sql(cls):
+        q = connections["default"].ops.quote_name
+        table = q(Attendance._meta.db_table)
+        return f"""
+            WITH grouped AS ({cls._groups_sql()}),
+            kept AS (
+                UPDATE {table} a
+                SET {q('time_in')} = g.first_in, {q('time_out')} = g.last_out
+                FROM grouped g
+                WHERE a.{q('id')} = g.id AND g.id = g.keeper_id AND g.group_size > 1
+            )
+            DELETE FROM {table} a
+            USING grouped g
+            WHERE a.{q('id')} = g.id AND g.group_size > 1 AND g.id <> g.keeper_id
+            RETURNING a.{q('school_id')}, a.{q('date')}
+        """
+
+    @classmethod
+    def count(cls, using="default"):
+        """Rows that would be deleted."""
+        with connections[using].cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM ({cls._groups_sql()}) g WHERE g.group_size > 1 AND g.id <> g.keeper_id")
+            return cursor.fetchone()[0]
+
+    @classmethod
+    def merge(cls, using="default"):
+        """Merge every duplicate group. Returns [(school_id, date)], one per deleted row."""
+        with transaction.atomic(using=using), connections[using].cursor() as cursor:
+            cursor.execute(cls._merge_sql())
+            return [tuple(row) for row in cursor.fetchall()]
+
+    @classmethod
+    def needs_merge(cls, using="default"):
+        """Whether the table exists with the kiosk columns but without the constraint yet."""
+        connection = connections[using]
+        if connection.vendor != "postgresql":
+            return False
+
+        table = Attendance._meta.db_table
+        with connection.cursor() as cursor:
+            if table not in connection.introspection.table_names(cursor):
+                return False
+            columns = {col.name for col in connection.introspection.get_table_description(cursor, table)}
+            if not cls.COLUMNS <= columns:
+                return False
+            cursor.execute("SELECT 1 FROM pg_class WHERE relname = %s", [cls.CONSTRAINT])
+            return cursor.fetchone() is None
+
+    @classmethod
+    def merge_before_migrate(cls, sender, using="default", **kwargs):
+        """pre_migrate receiver: merge before the constraint's migration runs."""
+        if sender.name != "attendance":
+            return
+        try:
+            if not cls.needs_merge(using):
+                return
+            removed = cls.merge(using)
+        except DatabaseError as e:
+            logger.warning("Duplicate kiosk attendance not merged (%s); run `manage.py merge_duplicate_attendance`.", e)
+            return
+        if removed:
+            logger.warning(
+                "Merged %d duplicate kiosk attendance row(s); run `manage.py rebuild_attendance_rollup` "
+                "and `manage.py rebuild_attendance_calendars`.",
+                len(removed),
+            )
@@ -0,0 +1,240 @@
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+
+from attendance.models import Attendance
+from schools.models import SchoolYear, Semester
+
+
+class AttendanceListing:
+    """
+    Filtered, keyset-paginated attendance listing for DataTables.
+
+    Rows are always ordered by (date, id) — descending by default — and a
+    page is fetched with ``WHERE (date, id) < cursor ... LIMIT length``
+    against the (school, date, id) index, so page 200 costs the same as
+    page 1. The cursor of the last row on a page is returned with it and
+    sent back by the table for the next page.
+
+    Counts are only taken when the listing is (re)started from page one;
+    follow-up pages echo the counts the client already holds.
+    """
+
+    FILTER_PARAMS = ("semester", "school_year", "class", "flight", "status", "date_from", "date_to", "search[value]", "search")
+
+    VALUE_FIELDS = [
+        "id",
+        "date",
+        "time_in",
+        "time_out",
+        "status",
+        "student_id",
+        "student__student_id",
+        "student__user__first_name",
+        "student__user__last_name",
+        "flight_id",
+        "flight__name",
+        "class_obj_id",
+        "class_obj__name",
+    ]
+
+    EXPORT_COLUMNS = [
+        ("Date", "date"),
+        ("Student ID", "student__student_id"),
+        ("Last Name", "student__last_name"),
+        ("First Name", "student__first_name"),
+        ("Flight", "flight__name"),
+        ("Class", "class_obj__name"),
+        ("Time In", "time_in"),
+        ("Time Out", "time_out"),
+        ("Status", "status"),
+    ]
+
+    DEFAULT_LENGTH = 25
+    MAX_LENGTH = 500
+
+    def __init__(self, params):
+        self.params = params
+
+    # ------------------------------------------------------------
+    # 🔹 Filtering
+    # ------------------------------------------------------------
+    @staticmethod
+    def _period_filter(field, period):
+        """
+        Rows tagged with the period, plus untagged kiosk rows that fall in
+        its date range (kiosk scans carry no school year / semester).
+        """
+        return Q(**{f"{field}_id": period.pk}) | Q(
+            **{f"{field}__isnull": True},
+            date__gte=period.start_date,
+            date__lte=period.end_date,
+        )
+
+    def base_queryset(self):
+        """Scope the listing is counted against (recordsTotal)."""
+        records = Attendance.objects.all()
+        if self.params.get("school"):
+            records = records.filter(school_id=self.params["school"])
+        return records
+
+    def filter(self, records):
+        params = self.params
+
+        if params.get("semester"):
+            semester = Semester.objects.filter(pk=params["semester"]).only("start_date", "end_date").first()
+            if semester is None:
+                return records.none()
+            records = records.filter(self._period_filter("semester", semester))
+        elif params.get("school_year"):
+            school_year = SchoolYear.objects.filter(pk=params["school_year"]).only("start_date", "end_date").first()
+            if school_year is None:
+                return records.none()
+            records = records.filter(self._period_filter("school_year", school_year))
+
+        if params.get("class"):
+            records = records.filter(class_obj_id=params["class"])
+        if params.get("flight"):
+            records = records.filter(flight_id=params["flight"])
+        if params.get("status"):
+            records = records.filter(status__in=params["status"].upper().split(","))
+
+        date_from = parse_date(params.get("date_from") or "")
+        date_to = parse_date(params.get("date_to") or "")
+        if date_from:
+            records = records.filter(date__gte=date_from)
+        if date_to:
+            records = records.filter(date__lte=date_to)
+
+        search = (params.get("search[value]") or params.get("search") or "").strip()
+        for term in search.split():
+            records = records.filter(
+                Q(student__user__first_name__icontains=term)
+                | Q(student__user__last_name__icontains=term)
+                | Q(student__student_id__icontains=term)
+            )
+
+        return records
+
+    # ------------------------------------------------------------
+    # 🔹 Keyset pagination
+    # ------------------------------------------------------------
+    @staticmethod
+    def encode_cursor(row):
+        return f"{row['date'].isoformat()}_{row['id']}"
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            date, pk = cursor.split("_", 1)
+            date = parse_date(date)
+            pk = int(pk)
+        except (AttributeError, TypeError, ValueError):
+            return None
+        return (date, pk) if date else None
+
+    def descending(self):
+        # Only the date column is sortable; everything else pages on (date, id)
+        column = self.params.get("order[0][column]", "0")
+        direction = self.params.get("order[0][dir]", "desc")
+        return not (str(column) == "0" and direction == "asc")
+
+    def length(self):
+        try:
+            length = int(self.params.get("length", self.DEFAULT_LENGTH))
+        except (TypeError, ValueError):
+            return self.DEFAULT_LENGTH
+        if length <= 0:
+            return self.MAX_LENGTH
+        return min(length, self.MAX_LENGTH)
+
+    def page(self, records):
+        """
+        Returns (rows, next_cursor). With a cursor the page starts right
+        after it; without one, at ``start`` (0 for the first page; any other
+        value is a direct page jump and falls back to OFFSET).
+        """
+        descending = self.descending()
+        length = self.length()
+
+        records = records.order_by(*(["-date", "-id"] if descending else ["date", "id"]))
+
+        cursor = self.decode_cursor(self.params.get("cursor"))
+        if cursor:
+            date, pk = cursor
+            if descending:
+                records = records.filter(Q(date__lt=date) | Q(date=date, id__lt=pk))
+            else:
+                records = records.filter(Q(date__gt=date) | Q(date=date, id__gt=pk))
+            offset = 0
+        else:
+            try:
+                offset = max(int(self.params.get("start", 0)), 0)
+            except (TypeError, ValueError):
+                offset = 0
+
+        rows = list(records.values(*self.VALUE_FIELDS)[offset:offset + length + 1])
+
+        next_cursor = self.encode_cursor(rows[length - 1]) if len(rows) > length else None
+        return rows[:length], next_cursor
+
+    # ------------------------------------------------------------
+    # 🔹 Export
+    # ------------------------------------------------------------
+    def export(self, chunk_size=2000):
+        """
+        (header, rows) for every row matching the filters, in list order.
+        Rows are a lazy values_list iterator fetched ``chunk_size`` at a time.
+        """
+        records = self.filter(self.base_queryset()).order_by(
+            *(["-date", "-id"] if self.descending() else ["date", "id"])
+        )
+        header = [title for title, _ in self.EXPORT_COLUMNS]
+        rows = records.values_list(*[field for _, field in self.EXPORT_COLUMNS]).iterator(chunk_size=chunk_size)
+        return header, rows
+
+    # ------------------------------------------------------------
+    # 🔹 Main entry point
+    # ------------------------------------------------------------
+    @staticmethod
+    def present(row):
+        first = row.pop("student__user__first_name") or ""
+        last = row.pop("student__user__last_name") or ""
+        row["student_name"] = f"{first} {last}".strip()
+        row["student_code"] = row.pop("student__student_id")
+        row["flight_name"] = row.pop("flight__name")
+        row["class_name"] = row.pop("class_obj__name")
+        return row
+
+    def _echoed_count(self, name):
+        value = self.params.get(name)
+        return int(value) if value is not None and str(value).isdigit() else None
+
+    def draw(self):
+        """Build the DataTables response for the request params."""
+        base = self.base_queryset()
+        records = self.filter(base)
+
+        rows, next_cursor = self.page(records)
+
+        total = filtered = None
+        if self.params.get("cursor"):
+            total = self._echoed_count("records_total")
+            filtered = self._echoed_count("records_filtered")
+        if filtered is None:
+            filtered = records.count()
+        if total is None:
+            narrowed = any((self.params.get(name) or "").strip() for name in self.FILTER_PARAMS)
+            total = base.count() if narrowed else filtered
+
+        try:
+            draw = int(self.params.get("draw", 1))
+        except (TypeError, ValueError):
+            draw = 1
+
+        return {
+            "draw": draw,
+            "recordsTotal": total,
+            "recordsFiltered": filtered,
+            "next_cursor": next_cursor,
+            "data": [self.present(row) for row in rows],
+        }
@@ -0,0 +1,269 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connections, transaction
+
+from attendance.utils.rollup import AttendanceRollup
+from attendance.utils.roster import RosterIndex
+
+logger = logging.getLogger(__name__)
+
+
+class FeedSubscription:
+    """One connected dashboard: an asyncio queue bound to the loop that reads it."""
+    __slots__ = ("school_id", "loop", "queue")
+
+    def __init__(self, school_id, loop, size):
+        self.school_id = school_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=size)
+
+    def push(self, event):
+        """Runs on the subscriber's loop. A viewer that falls behind is told to resync."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+
+
+class FeedListener:
+    """
+    The process's ``LISTEN`` on the feed channel: one daemon thread with
+    its own PostgreSQL connection (autocommit), started by the first
+    subscriber, handing every notification to ``AttendanceFeed.deliver``.
+    When the connection drops it reconnects and tells every local viewer
+    to ``resync`` (events sent meanwhile are lost).
+    """
+
+    RECONNECT_SECONDS = 2
+    POLL_SECONDS = 5
+
+    def __init__(self, channel, using="default"):
+        self.channel = channel
+        self.using = using
+        self.stopped = threading.Event()
+        self.thread = None
+        self.connection = None
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self.run, name="attendance-feed", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(self.POLL_SECONDS + 1)
+            self.thread = None
+
+    def run(self):
+        connected_before = False
+        while not self.stopped.is_set():
+            try:
+                self.connection = connections.create_connection(self.using)
+                self.connection.ensure_connection()
+                with self.connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.connection.ops.quote_name(self.channel)}")
+                if connected_before:
+                    AttendanceFeed.deliver_all({"type": "resync"})
+                connected_before = True
+                for payload in self.notifications(self.connection.connection):
+                    AttendanceFeed.deliver_payload(payload)
+            except Exception:
+                logger.exception("Attendance feed: LISTEN %s failed, reconnecting.", self.channel)
+                self.stopped.wait(self.RECONNECT_SECONDS)
+            finally:
+                if self.connection is not None:
+                    self.connection.close()
+                    self.connection = None
+
+    def notifications(self, raw):
+        """Yield notification payloads until stopped (psycopg 3 or psycopg2)."""
+        while not self.stopped.is_set():
+            if hasattr(raw, "notifies") and callable(raw.notifies):
+                # psycopg 3: a generator that ends after ``timeout``
+                for notify in raw.notifies(timeout=self.POLL_SECONDS):
+                    yield notify.payload
+                continue
+            if select.select([raw], [], [], self.POLL_SECONDS)[0]:
+                raw.poll()
+                while raw.notifies:
+                    yield raw.notifies.pop(0).payload
+
+
+class AttendanceFeed:
+    """
+    Pub/sub for live attendance events.
+
+    Scan writers (sync code, running in worker threads) publish; SSE
+    streams (async, on the ASGI event loop) subscribe per school. Events
+    are handed across with ``loop.call_soon_threadsafe`` so a publisher
+    never blocks on a slow viewer.
+
+    Scans are often written by another process than the one streaming to
+    a viewer (a WSGI worker, another ASGI worker), so with PostgreSQL
+    (``ATTENDANCE_FEED_BROKER = "postgres"``, the default) events travel
+    through ``NOTIFY`` on ``CHANNEL``: every process with viewers runs a
+    ``FeedListener`` that delivers them to its own subscribers, whichever
+    worker handled the scan. Each committed scan then costs one
+    ``pg_notify``. With ``"local"`` (or another database) the broker is
+    in-process only — scans and the feed must then be served by the same
+    single ASGI process, and nothing is built while a school has no
+    viewers.
+
+    Either way events are published only after the scan's transaction
+    commits.
+    """
+
+    QUEUE_SIZE = 256
+    CHANNEL = "attendance_feed"
+    # NOTIFY payloads must stay under 8000 bytes
+    MAX_PAYLOAD = 7900
+
+    # school_id → {FeedSubscription}; None holds "all schools" viewers
+    _subscribers = defaultdict(set)
+    _lock = threading.Lock()
+    _listener = None
+
+    # ------------------------------------------------------------
+    # 🔹 Subscriptions (event loop side)
+    # ------------------------------------------------------------
+    @classmethod
+    def shared(cls, using="default"):
+        """Whether events go through PostgreSQL NOTIFY (every process sees every scan)."""
+        broker = getattr(settings, "ATTENDANCE_FEED_BROKER", "postgres")
+        return broker == "postgres" and connections[using].vendor == "postgresql"
+
+    @classmethod
+    def listen(cls):
+        """Start this process's FeedListener (once)."""
+        with cls._lock:
+            if cls._listener is None:
+                cls._listener = FeedListener(cls.CHANNEL)
+            cls._listener.start()
+
+    @classmethod
+    def stop_listening(cls):
+        with cls._lock:
+            listener, cls._listener = cls._listener, None
+        if listener is not None:
+            listener.stop()
+
+    @classmethod
+    def subscribe(cls, school_id=None):
+        subscription = FeedSubscription(school_id, asyncio.get_running_loop(), cls.QUEUE_SIZE)
+        if cls.shared():
+            cls.listen()
+        with cls._lock:
+            cls._subscribers[school_id].add(subscription)
+        return subscription
+
+    @classmethod
+    def unsubscribe(cls, subscription):
+        with cls._lock:
+            subscribers = cls._subscribers.get(subscription.school_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del cls._subscribers[subscription.school_id]
+
+    @classmethod
+    def has_subscribers(cls, school_id):
+        return bool(cls._subscribers.get(school_id) or cls._subscribers.get(None))
+
+    # ------------------------------------------------------------
+    # 🔹 Publishing (scan side)
+    # ------------------------------------------------------------
+    @classmethod
+    def deliver(cls, school_id, event):
+        """Hand ``event`` to this process's viewers of ``school_id`` (and of all schools)."""
+        with cls._lock:
+            targets = list(cls._subscribers.get(school_id, ())) + list(cls._subscribers.get(None, ()))
+        cls._push(targets, event)
+
+    @classmethod
+    def deliver_all(cls, event):
+        with cls._lock:
+            targets = [subscription for subscribers in cls._subscribers.values() for subscription in subscribers]
+        cls._push(targets, event)
+
+    @classmethod
+    def deliver_payload(cls, payload):
+        """A NOTIFY payload → local viewers."""
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("Attendance feed: unreadable notification dropped.")
+            return
+        cls.deliver(event.get("school"), event)
+
+    @classmethod
+    def _push(cls, targets, event):
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.push, event)
+            except RuntimeError:
+                # Loop already closed (worker shutting down)
+                cls.unsubscribe(subscription)
+
+    @classmethod
+    def publish(cls, school_id, event):
+        """Send ``event`` to every viewer of ``school_id`` — in all processes when shared."""
+        if not cls.shared():
+            cls.deliver(school_id, event)
+            return
+
+        payload = json.dumps(event, cls=DjangoJSONEncoder)
+        if len(payload.encode()) > cls.MAX_PAYLOAD:
+            payload = json.dumps({"type": "resync", "school": school_id})
+        try:
+            with connections["default"].cursor() as cursor:
+                cursor.execute("SELECT pg_notify(%s, %s)", [cls.CHANNEL, payload])
+        except DatabaseError as e:
+            # The scan is already committed; its viewers just miss this event
+            logger.warning("Attendance feed: NOTIFY failed (%s).", e)
+
+    @classmethod
+    def scan_event(cls, transition, attendance, previous_status=None):
+        """Describe one written attendance row, with the rollup delta it caused."""
+        entry = RosterIndex.get(attendance.school_id).by_pk.get(attendance.student_id)
+        return {
+            "type": transition,
+            "school": attendance.school_id,
+            "attendance_id": attendance.pk,
+            "student": attendance.student_id,
+            "student_id": entry.student_id if entry else None,
+            "name": entry.name if entry else "",
+            "flight_id": attendance.flight_id,
+            "date": attendance.date,
+            "time_in": attendance.time_in,
+            "time_out": attendance.time_out,
+            "status": attendance.status,
+            "delta": dict(AttendanceRollup.transition_delta(attendance.status, previous_status)),
+        }
+
+    @classmethod
+    def publish_scan(cls, transition, attendance, previous_status=None):
+        """Queue a scan event for delivery once the current transaction commits."""
+        school_id = attendance.school_id
+        if not cls.shared() and not cls.has_subscribers(school_id):
+            return
+
+        event = cls.scan_event(transition, attendance, previous_status)
+        transaction.on_commit(lambda: cls.publish(school_id, event))
+
+    # ------------------------------------------------------------
+    # 🔹 Wire format
+    # ------------------------------------------------------------
+    @staticmethod
+    def encode(event_type, data):
+        return f"event: {event_type}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
@@ -0,0 +1,329 @@
+import re
+from datetime import date
+
+from django.db import connection, transaction
+
+from attendance.models import Attendance
+
+
+class AttendancePartitioner:
+    """
+    Opt-in range partitioning of the attendance table on ``date`` (PostgreSQL).
+
+    ``convert()`` swaps the plain table for a partitioned one with the same
+    name and columns, so the ORM model, its unique constraints and every
+    existing query keep working; date-bounded queries are pruned to the
+    partitions they touch and vacuum / retention work per partition.
+
+    Differences from the plain table, required by PostgreSQL:
+
+    - the primary key is (id, date) — ids still come from one identity
+      sequence, so ``id`` stays unique in practice and the ORM keeps using it;
+    - a DEFAULT partition catches rows outside every range so a kiosk scan
+      never fails on a missing partition. ``create_partition`` moves such
+      rows into the new range partition.
+
+    Partitions are named ``<table>_pYYYY_MM`` (month scheme) or
+    ``<table>_syYYYY`` (school_year scheme, starting on ``year_start_month``).
+    """
+
+    SCHEMES = ("month", "school_year")
+
+    def __init__(self, scheme=None, year_start_month=6):
+        self.table = Attendance._meta.db_table
+        self.default_partition = f"{self.table}_default"
+        self.scheme = scheme
+        self.year_start_month = year_start_month
+
+        if scheme is None and self.is_partitioned():
+            self.detect_scheme()
+
+    # ------------------------------------------------------------
+    # 🔹 Introspection
+    # ------------------------------------------------------------
+    @staticmethod
+    def supported():
+        return connection.vendor == "postgresql"
+
+    def is_partitioned(self):
+        if not self.supported():
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+                [self.table],
+            )
+            return cursor.fetchone() is not None
+
+    def partitions(self):
+        """Attached partitions: [{"name", "date_from", "date_to", "is_default"}] by range."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+                FROM pg_inherits
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE pg_inherits.inhparent = to_regclass(%s)
+                """,
+                [self.table],
+            )
+            rows = cursor.fetchall()
+
+        partitions = []
+        for name, bound in rows:
+            dates = re.findall(r"'(\d{4}-\d{2}-\d{2})'", bound or "")
+            partitions.append({
+                "name": name,
+                "date_from": date.fromisoformat(dates[0]) if len(dates) == 2 else None,
+                "date_to": date.fromisoformat(dates[1]) if len(dates) == 2 else None,
+                "is_default": bound == "DEFAULT",
+            })
+        return sorted(partitions, key=lambda p: (p["is_default"], p["date_from"] or date.min))
+
+    def detached(self):
+        """Partition tables that exist but are currently detached."""
+        attached = {p["name"] for p in self.partitions()}
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT relname FROM pg_class
+                WHERE relkind = 'r' AND relnamespace = current_schema()::regnamespace
+                  AND (relname ~ %s OR relname ~ %s)
+                ORDER BY relname
+                """,
+                [rf"^{self.table}_p\d{{4}}_\d{{2}}$", rf"^{self.table}_sy\d{{4}}$"],
+            )
+            return [name for (name,) in cursor.fetchall() if name not in attached]
+
+    def detect_scheme(self):
+        for partition in self.partitions():
+            if partition["is_default"] or partition["date_from"] is None:
+                continue
+            if partition["name"].startswith(f"{self.table}_sy"):
+                self.scheme = "school_year"
+                self.year_start_month = partition["date_from"].month
+            else:
+                self.scheme = "month"
+            return self.scheme
+        self.scheme = self.scheme or "month"
+        return self.scheme
+
+    # ------------------------------------------------------------
+    # 🔹 Periods
+    # ------------------------------------------------------------
+    def period_start(self, day):
+        if self.scheme == "month":
+            return date(day.year, day.month, 1)
+
+        year = day.year if day.month >= self.year_start_month else day.year - 1
+        return date(year, self.year_start_month, 1)
+
+    def next_period(self, start):
+        if self.scheme == "month":
+            return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+        return date(start.year + 1, start.month, 1)
+
+    def partition_name(self, start):
+        if self.scheme == "month":
+            return f"{self.table}_p{start:%Y_%m}"
+        return f"{self.table}_sy{start.year}"
+
+    def bounds_from_name(self, name):
+        match = re.match(rf"^{re.escape(self.table)}_(?:p(\d{{4}})_(\d{{2}})|sy(\d{{4}}))$", name)
+        if not match:
+            raise ValueError(f"'{name}' is not an attendance partition name.")
+
+        if match.group(3):
+            start = date(int(match.group(3)), self.year_start_month, 1)
+            return start, date(start.year + 1, start.month, 1)
+
+        start = date(int(match.group(1)), int(match.group(2)), 1)
+        return start, date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+    def periods(self, date_from, date_to):
+        start = self.period_start(date_from)
+        while start <= date_to:
+            yield start
+            start = self.next_period(start)
+
+    # ------------------------------------------------------------
+    # 🔹 Partition maintenance
+    # ------------------------------------------------------------
+    def _execute(self, sql, params=None):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    def create_partition(self, start):
+        """
+        Create the partition for the period starting at ``start``. Returns
+        its name, or None when it already exists. Rows already sitting in
+        the DEFAULT partition for that range are moved into it.
+        """
+        q = connection.ops.quote_name
+        name = self.partition_name(start)
+        end = self.next_period(start)
+
+        if any(p["name"] == name for p in self.partitions()):
+            return None
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [self.default_partition])
+                has_default = cursor.fetchone()[0]
+
+                strays = False
+                if has_default:
+                    cursor.execute(
+                        f"SELECT EXISTS (SELECT 1 FROM {q(self.default_partition)} "
+                        f"WHERE {q('date')} >= %s AND {q('date')} < %s)",
+                        [start, end],
+                    )
+                    strays = cursor.fetchone()[0]
+
+                if strays:
+                    cursor.execute(f"ALTER TABLE {q(self.table)} DETACH PARTITION {q(self.default_partition)}")
+
+                cursor.execute(
+                    f"CREATE TABLE {q(name)} PARTITION OF {q(self.table)} FOR VALUES FROM (%s) TO (%s)",
+                    [start, end],
+                )
+
+                if strays:
+                    cursor.execute(
+                        f"WITH moved AS ("
+                        f"  DELETE FROM {q(self.default_partition)} "
+                        f"  WHERE {q('date')} >= %s AND {q('date')} < %s RETURNING *"
+                        f") INSERT INTO {q(name)} SELECT * FROM moved",
+                        [start, end],
+                    )
+                    cursor.execute(
+                        f"ALTER TABLE {q(self.table)} ATTACH PARTITION {q(self.default_partition)} DEFAULT"
+                    )
+        return name
+
+    def ensure_partitions(self, date_from, date_to):
+        """Create every missing partition covering [date_from, date_to]. Returns created names."""
+        created = []
+        for start in self.periods(date_from, date_to):
+            name = self.create_partition(start)
+            if name:
+                created.append(name)
+        return created
+
+    def create_ahead(self, ahead=3, today=None):
+        """Pre-create the current period and the next ``ahead`` periods."""
+        start = self.period_start(today or date.today())
+        last = start
+        for _ in range(ahead):
+            last = self.next_period(last)
+        return self.ensure_partitions(start, last)
+
+    def detach_before(self, before):
+        """
+        Detach every range partition that ends on or before ``before``. The
+        tables are kept (and can be archived, dumped or re-attached).
+        """
+        q = connection.ops.quote_name
+        detached = []
+        for partition in self.partitions():
+            if partition["is_default"] or partition["date_to"] is None:
+                continue
+            if partition["date_to"] <= before:
+                self._execute(f"ALTER TABLE {q(self.table)} DETACH PARTITION {q(partition['name'])}")
+                detached.append(partition["name"])
+        return detached
+
+    def attach(self, name):
+        q = connection.ops.quote_name
+        start, end = self.bounds_from_name(name)
+        self._execute(
+            f"ALTER TABLE {q(self.table)} ATTACH PARTITION {q(name)} FOR VALUES FROM (%s) TO (%s)",
+            [start, end],
+        )
+        return start, end
+
+    # ------------------------------------------------------------
+    # 🔹 Conversion
+    # ------------------------------------------------------------
+    def _rename_legacy_indexes(self, legacy):
+        """Index names are schema-wide; move the old table's out of the way."""
+        q = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexname FROM pg_indexes WHERE tablename = %s AND schemaname = current_schema()",
+                [legacy],
+            )
+            names = [name for (name,) in cursor.fetchall()]
+        for name in names:
+            self._execute(f"ALTER INDEX {q(name)} RENAME TO {q(name[:55] + '_legacy')}")
+
+    def _create_model_constraints(self):
+        """Recreate indexes, unique keys and FKs under the names Django expects."""
+        model = Attendance
+        with connection.schema_editor(atomic=False) as editor:
+            for fields in model._meta.unique_together:
+                editor.execute(editor._create_unique_sql(
+                    model, [model._meta.get_field(field) for field in fields]
+                ))
+            for constraint in model._meta.constraints:
+                editor.add_constraint(model, constraint)
+            for sql in editor._model_indexes_sql(model):
+                editor.execute(sql)
+            for field in model._meta.local_concrete_fields:
+                if field.remote_field and field.db_constraint:
+                    editor.execute(editor._create_fk_sql(model, field, "_fk_%(to_table)s_%(to_column)s"))
+
+    def convert(self, keep_legacy=False, ahead=3):
+        """
+        Turn the plain attendance table into a partitioned one, in one
+        transaction. Existing rows are copied into range partitions covering
+        their dates; ``ahead`` future periods are pre-created.
+        """
+        if not self.supported():
+            raise ValueError("Attendance partitioning requires PostgreSQL.")
+        if self.scheme not in self.SCHEMES:
+            raise ValueError(f"Unknown scheme '{self.scheme}' (use one of: {', '.join(self.SCHEMES)}).")
+        if self.is_partitioned():
+            raise ValueError(f"{self.table} is already partitioned.")
+
+        q = connection.ops.quote_name
+        legacy = f"{self.table}_legacy"
+
+        with transaction.atomic():
+            self._execute(f"LOCK TABLE {q(self.table)} IN ACCESS EXCLUSIVE MODE")
+            self._execute(f"ALTER TABLE {q(self.table)} RENAME TO {q(legacy)}")
+            self._rename_legacy_indexes(legacy)
+
+            self._execute(
+                f"CREATE TABLE {q(self.table)} "
+                f"(LIKE {q(legacy)} INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING STORAGE) "
+                f"PARTITION BY RANGE ({q('date')})"
+            )
+            self._execute(
+                f"ALTER TABLE {q(self.table)} ADD CONSTRAINT {q(self.table + '_pkey')} "
+                f"PRIMARY KEY ({q('id')}, {q('date')})"
+            )
+            self._create_model_constraints()
+
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT MIN({q('date')}), MAX({q('date')}) FROM {q(legacy)}")
+                first, last = cursor.fetchone()
+
+            today = date.today()
+            self.ensure_partitions(first or today, max(last or today, today))
+            self.create_ahead(ahead, today=today)
+            self._execute(f"CREATE TABLE {q(self.default_partition)} PARTITION OF {q(self.table)} DEFAULT")
+
+            self._execute(f"INSERT INTO {q(self.table)} SELECT * FROM {q(legacy)}")
+            self._execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX({q('id')}), 1), MAX({q('id')}) IS NOT NULL) "
+                f"FROM {q(self.table)}",
+                [self.table],
+            )
+
+            if not keep_legacy:
+                # Flush deferred FK checks queued against the old table first
+                self._execute("SET CONSTRAINTS ALL IMMEDIATE")
+                self._execute(f"DROP TABLE {q(legacy)}")
+
+        return self.partitions()
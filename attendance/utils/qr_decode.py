@@ -0,0 +1,211 @@
+import base64
+import binascii
+import io
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db.models import Q
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+class QRDecodeError(Exception):
+    """The upload is not an image we can decode (bad format, too large, ...)."""
+
+
+class QRDecoder:
+    """
+    Server-side QR decoding with PIL + pyzbar.
+
+    ``decode_image`` handles one uploaded frame (kiosks that can't run
+    html5-qrcode decode on the server). Frames are converted to grayscale
+    and downscaled first — zbar's cost grows with pixel count, and a QR
+    held up to a camera is still readable at kiosk resolution. A second
+    pass with auto-contrast catches washed-out phone cameras.
+
+    ``decode_stored`` re-reads every stored Student / UserProfile QR PNG
+    (e.g. after a logo or payload change). zbar is CPU-bound and holds the
+    GIL, so the images are fanned out over a process pool; rows are read
+    from the database in chunks in the parent, which reads the PNGs from
+    QRStore (or the legacy base64 column) and only sends bytes to the
+    workers. Workers are spawned, not forked, so they never
+    inherit the parent's database connection.
+
+    pyzbar is imported lazily so a host without libzbar can still serve
+    the rest of the attendance API.
+    """
+
+    MAX_UPLOAD_BYTES = 5 * 1024 * 1024
+    MAX_PIXELS = 40_000_000
+    MAX_SIDE = 1280
+
+    CHUNK_SIZE = 500
+
+    SOURCES = ("student", "profile")
+
+    # ------------------------------------------------------------
+    # 🔹 Single image
+    # ------------------------------------------------------------
+    @staticmethod
+    def _zbar(image):
+        from pyzbar.pyzbar import decode, ZBarSymbol
+        return [symbol.data.decode("utf-8", errors="replace") for symbol in decode(image, symbols=[ZBarSymbol.QRCODE])]
+
+    @classmethod
+    def open_image(cls, data):
+        if len(data) > cls.MAX_UPLOAD_BYTES:
+            raise QRDecodeError(f"Image larger than {cls.MAX_UPLOAD_BYTES // (1024 * 1024)} MB.")
+        try:
+            image = Image.open(io.BytesIO(data))
+            if image.width * image.height > cls.MAX_PIXELS:
+                raise QRDecodeError("Image dimensions are too large.")
+            image.load()
+        except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+            raise QRDecodeError("Unreadable image.") from e
+        return image
+
+    @classmethod
+    def decode_image(cls, data):
+        """Return the QR payloads found in image bytes (possibly empty)."""
+        image = cls.open_image(data).convert("L")
+        if max(image.size) > cls.MAX_SIDE:
+            image.thumbnail((cls.MAX_SIDE, cls.MAX_SIDE))
+
+        payloads = cls._zbar(image)
+        if not payloads:
+            payloads = cls._zbar(ImageOps.autocontrast(image))
+        return payloads
+
+    @classmethod
+    def decode_base64(cls, text):
+        try:
+            data = base64.b64decode(text, validate=True)
+        except (binascii.Error, ValueError) as e:
+            raise QRDecodeError(f"Invalid base64: {e}")
+        return cls.decode_image(data)
+
+    # ------------------------------------------------------------
+    # 🔹 Stored QR codes (batch)
+    # ------------------------------------------------------------
+    @staticmethod
+    def expected_student_payload(school_id, student_id):
+        return f"SCHOOL-{school_id}-STUDENT-{student_id}"
+
+    @classmethod
+    def stored_rows(cls, source):
+        """
+        Lazily yield (source, pk, qr, expected) for one source. ``qr`` is
+        the PNG bytes from QRStore, or the legacy base64 string for rows
+        not yet moved by ``migrate_qr_codes``. ``expected`` is the exact
+        payload for students and the user id for profiles (whose JSON
+        payload also carries display fields).
+        """
+        from school.utils.qr_render import QRStore
+
+        if source == "student":
+            from student.models import Student
+            model, extra = Student, ("school_id", "student_id")
+        elif source == "profile":
+            from users.models import UserProfile
+            model, extra = UserProfile, ("user_id",)
+        else:
+            raise ValueError(f"Unknown QR source '{source}'.")
+
+        rows = (
+            model.objects
+            .filter(Q(qr_hash__gt="") | Q(qr_code__gt=""))
+            .order_by("pk")
+            .values_list("pk", "qr_hash", "qr_code", *extra)
+            .iterator(chunk_size=cls.CHUNK_SIZE)
+        )
+        for pk, digest, legacy, *rest in rows:
+            if digest:
+                try:
+                    qr = QRStore.read(digest)
+                except OSError:
+                    qr = b""  # reported by check_stored as unreadable
+            else:
+                qr = legacy
+            expected = cls.expected_student_payload(*rest) if source == "student" else rest[0]
+            yield source, pk, qr, expected
+
+    @classmethod
+    def check_stored(cls, row):
+        """
+        Decode one stored row. Runs in a pool worker, so it only touches
+        its arguments. Returns (source, pk, error) — error is None when the
+        QR decodes to the expected payload.
+        """
+        source, pk, qr, expected = row
+        try:
+            payloads = cls.decode_image(qr) if isinstance(qr, bytes) else cls.decode_base64(qr)
+        except QRDecodeError as e:
+            return source, pk, str(e)
+        except Exception as e:  # zbar / PIL internals
+            return source, pk, f"{type(e).__name__}: {e}"
+
+        if not payloads:
+            return source, pk, "No QR data found in the image."
+
+        payload = payloads[0]
+        if source == "student":
+            if payload != expected:
+                return source, pk, f"Payload mismatch: {payload!r}"
+        else:
+            try:
+                user_id = json.loads(payload).get("user_id")
+            except (json.JSONDecodeError, AttributeError):
+                return source, pk, "Payload is not a JSON object."
+            if user_id != expected:
+                return source, pk, f"user_id mismatch: {user_id!r}"
+
+        return source, pk, None
+
+    @classmethod
+    def decode_stored(cls, sources=SOURCES, workers=None, chunksize=32):
+        """
+        Check every stored QR of ``sources`` over a process pool.
+        Yields (source, pk, error) as results arrive, in row order.
+        """
+        rows = (row for source in sources for row in cls.stored_rows(source))
+        workers = workers or os.cpu_count() or 1
+
+        if workers == 1:
+            yield from map(cls.check_stored, rows)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            # map() would submit every row up front; keep a bounded window instead
+            window = workers * chunksize * 4
+            pending = []
+            for row in rows:
+                pending.append(row)
+                if len(pending) >= window:
+                    yield from pool.map(cls.check_stored, pending, chunksize=chunksize)
+                    pending = []
+            if pending:
+                yield from pool.map(cls.check_stored, pending, chunksize=chunksize)
+
+
+class DecodeStats:
+    """Running totals for a batch decode."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0
+        self.failures = []
+
+    def add(self, source, pk, error):
+        self.total += 1
+        if error:
+            self.failures.append((source, pk, error))
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self):
+        return self.total / self.elapsed if self.elapsed else 0.0
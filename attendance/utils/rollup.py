@@ -0,0 +1,250 @@
+from collections import defaultdict
+
+from django.db.models import Count, F, Q, Sum
+
+from student.models import Student, FlightMembership
+from attendance.models import Attendance, DailyAttendanceRollup
+
+
+class AttendanceRollup:
+    """
+    Incremental maintenance and reads of DailyAttendanceRollup.
+
+    Kiosk scans carry no class context, so their rows are grouped by
+    (school, flight, date). The first write of a school's day seeds one
+    row per current flight (plus one for students without a flight) with
+    the enrolled headcount, so every later scan is a single UPDATE of
+    counters and the dashboard can sum strength without double counting.
+    """
+
+    KEY_FIELDS = ("school_id", "school_year_id", "semester_id", "class_obj_id", "flight_id", "date")
+
+    STATUS_COLUMNS = {
+        "PRESENT": "present",
+        "ABSENT": "absent",
+        "LATE": "late",
+        "EXCUSED": "excused",
+        "DISMISSED": "dismissed",
+    }
+
+    # Students in these states no longer count toward strength
+    OFF_ROSTER_STATUSES = ("graduated", "transferred", "dropped")
+
+    # ------------------------------------------------------------
+    # 🔹 Headcounts
+    # ------------------------------------------------------------
+    @classmethod
+    def enrolled_students(cls):
+        return Student.objects.filter(is_active=True).exclude(
+            enrollment_status__in=cls.OFF_ROSTER_STATUSES
+        )
+
+    @classmethod
+    def headcounts(cls, school_id):
+        """Map current flight_id (None = no flight) → enrolled headcount for one school."""
+        student_ids = set(
+            cls.enrolled_students().filter(school_id=school_id).values_list("id", flat=True)
+        )
+
+        # Latest membership wins → current flight (same rule as the scan roster)
+        current_flight = dict(
+            FlightMembership.objects
+            .filter(student_id__in=student_ids)
+            .order_by("student_id", "joined_at")
+            .values_list("student_id", "flight_id")
+        )
+
+        counts = defaultdict(int)
+        for student_id in student_ids:
+            counts[current_flight.get(student_id)] += 1
+        return counts
+
+    @classmethod
+    def class_headcount(cls, class_obj_id, flight_id=None):
+        members = FlightMembership.objects.filter(
+            student__in=cls.enrolled_students()
+        )
+        if flight_id:
+            members = members.filter(flight_id=flight_id)
+        else:
+            members = members.filter(flight__class_obj_id=class_obj_id)
+        return members.values("student_id").distinct().count()
+
+    # ------------------------------------------------------------
+    # 🔹 Write path
+    # ------------------------------------------------------------
+    @classmethod
+    def group_key(cls, attendance):
+        return tuple(getattr(attendance, field) for field in cls.KEY_FIELDS)
+
+    @classmethod
+    def seed_day(cls, school_id, date):
+        """Create the kiosk-scope rows of a school's day with their headcounts."""
+        rows = [
+            DailyAttendanceRollup(school_id=school_id, flight_id=flight_id, date=date, enrolled=enrolled)
+            for flight_id, enrolled in cls.headcounts(school_id).items()
+        ]
+        DailyAttendanceRollup.objects.bulk_create(rows, ignore_conflicts=True)
+
+    @classmethod
+    def ensure_row(cls, key):
+        school_id, school_year_id, semester_id, class_obj_id, flight_id, date = key
+
+        if class_obj_id is None and school_year_id is None and semester_id is None:
+            cls.seed_day(school_id, date)
+            enrolled = 0  # flight had no current members when seeded
+        else:
+            enrolled = cls.class_headcount(class_obj_id, flight_id) if class_obj_id else 0
+
+        DailyAttendanceRollup.objects.bulk_create(
+            [DailyAttendanceRollup(**dict(zip(cls.KEY_FIELDS, key)), enrolled=enrolled)],
+            ignore_conflicts=True,
+        )
+
+    @classmethod
+    def apply(cls, deltas):
+        """
+        Apply counter deltas: {group_key: {"present": +1, "late": -1, ...}}.
+        One UPDATE per group; a group's day is seeded on its first write.
+        """
+        for key, columns in deltas.items():
+            columns = {col: n for col, n in columns.items() if n}
+            if not columns:
+                continue
+
+            updates = {col: F(col) + n for col, n in columns.items()}
+            rows = DailyAttendanceRollup.objects.filter(**dict(zip(cls.KEY_FIELDS, key)))
+
+            if not rows.update(**updates):
+                cls.ensure_row(key)
+                rows.update(**updates)
+
+    @classmethod
+    def transition_delta(cls, new_status, previous_status=None):
+        delta = defaultdict(int)
+        if previous_status == new_status:
+            return delta
+        if previous_status in cls.STATUS_COLUMNS:
+            delta[cls.STATUS_COLUMNS[previous_status]] -= 1
+        if new_status in cls.STATUS_COLUMNS:
+            delta[cls.STATUS_COLUMNS[new_status]] += 1
+        return delta
+
+    @classmethod
+    def record(cls, attendance, previous_status=None):
+        """Count one written row: a new row (no previous status) or a status change."""
+        cls.apply({cls.group_key(attendance): cls.transition_delta(attendance.status, previous_status)})
+
+    # ------------------------------------------------------------
+    # 🔹 Backfill
+    # ------------------------------------------------------------
+    @classmethod
+    def rebuild(cls, school_id=None, date_from=None, date_to=None):
+        """Recompute rollups from Attendance for the given scope. Returns rows written."""
+        attendance = Attendance.objects.all()
+        rollups = DailyAttendanceRollup.objects.all()
+
+        if school_id:
+            attendance = attendance.filter(school_id=school_id)
+            rollups = rollups.filter(school_id=school_id)
+        if date_from:
+            attendance = attendance.filter(date__gte=date_from)
+            rollups = rollups.filter(date__gte=date_from)
+        if date_to:
+            attendance = attendance.filter(date__lte=date_to)
+            rollups = rollups.filter(date__lte=date_to)
+
+        groups = (
+            attendance
+            .values(*cls.KEY_FIELDS)
+            .annotate(**{
+                column: Count("id", filter=Q(status=status))
+                for status, column in cls.STATUS_COLUMNS.items()
+            })
+            .order_by()
+        )
+
+        rows = {}
+        school_headcounts = {}
+        for group in groups:
+            key = tuple(group[field] for field in cls.KEY_FIELDS)
+            school, class_obj, flight = key[0], key[3], key[4]
+
+            if not any(key[1:4]):
+                if school not in school_headcounts:
+                    school_headcounts[school] = cls.headcounts(school)
+                # Seed the whole kiosk-scope day once
+                for seed_flight, enrolled in school_headcounts[school].items():
+                    seed_key = (school, None, None, None, seed_flight, key[5])
+                    rows.setdefault(seed_key, DailyAttendanceRollup(
+                        **dict(zip(cls.KEY_FIELDS, seed_key)), enrolled=enrolled
+                    ))
+                enrolled = 0
+            else:
+                enrolled = cls.class_headcount(class_obj, flight) if class_obj else 0
+
+            row = rows.setdefault(key, DailyAttendanceRollup(
+                **dict(zip(cls.KEY_FIELDS, key)), enrolled=enrolled
+            ))
+            for column in cls.STATUS_COLUMNS.values():
+                setattr(row, column, group[column])
+
+        rollups.delete()
+        DailyAttendanceRollup.objects.bulk_create(rows.values(), batch_size=1000)
+        return len(rows)
+
+    # ------------------------------------------------------------
+    # 🔹 Reads
+    # ------------------------------------------------------------
+    @classmethod
+    def summary(cls, date_from, date_to=None, school_id=None):
+        """
+        Kiosk-scope totals and per-flight breakdown for a date range.
+        Strength is the average daily enrolled headcount over the days that have rollups.
+        """
+        rows = DailyAttendanceRollup.objects.filter(
+            date__gte=date_from,
+            date__lte=date_to or date_from,
+            class_obj__isnull=True,
+            school_year__isnull=True,
+            semester__isnull=True,
+        )
+        if school_id:
+            rows = rows.filter(school_id=school_id)
+
+        counters = {column: Sum(column) for column in ["enrolled", *cls.STATUS_COLUMNS.values()]}
+
+        flights = []
+        for group in (
+            rows.values("flight_id", "flight__name")
+            .annotate(days=Count("date", distinct=True), **counters)
+            .order_by("flight__name")
+        ):
+            flights.append(cls._present_group(group, name=group["flight__name"] or "No Flight"))
+
+        totals = rows.aggregate(days=Count("date", distinct=True), **counters)
+        summary = cls._present_group(totals)
+        summary["flights"] = flights
+        return summary
+
+    @classmethod
+    def _present_group(cls, group, name=None):
+        days = group.get("days") or 1
+        counts = {column: group.get(column) or 0 for column in cls.STATUS_COLUMNS.values()}
+
+        strength = round((group.get("enrolled") or 0) / days)
+        present = round((counts["present"] + counts["late"]) / days)
+
+        data = {
+            "total_strength": strength,
+            "present": present,
+            "absent": max(strength - present, 0),
+            "late": round(counts["late"] / days),
+            "excused": round(counts["excused"] / days),
+            "dismissed": round(counts["dismissed"] / days),
+            "days": group.get("days") or 0,
+        }
+        if name is not None:
+            data["flight_id"] = group.get("flight_id")
+            data["name"] = name
+        return data
@@ -0,0 +1,220 @@
+import json
+import re
+import threading
+import time
+
+from student.models import Student, FlightMembership
+
+
+STUDENT_QR_PATTERN = re.compile(r"^SCHOOL-(?P<school_id>\d+)-STUDENT-(?P<student_id>.+)$")
+
+
+class RosterEntry:
+    """Just enough of a Student to record a scan without touching the DB."""
+    __slots__ = ("student_pk", "school_id", "user_id", "student_id", "is_active", "flight_id", "name")
+
+    def __init__(self, student_pk, school_id, user_id, student_id, is_active, flight_id=None, name=""):
+        self.student_pk = student_pk
+        self.school_id = school_id
+        self.user_id = user_id
+        self.student_id = student_id
+        self.is_active = is_active
+        self.flight_id = flight_id
+        self.name = name
+
+
+class SchoolRoster:
+    """All students of one school, indexed by student_id, user_id and pk."""
+    __slots__ = ("school_id", "by_student_id", "by_user_id", "by_pk", "loaded_at")
+
+    def __init__(self, school_id):
+        self.school_id = school_id
+        self.by_student_id = {}
+        self.by_user_id = {}
+        self.by_pk = {}
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def load(cls, school_id):
+        roster = cls(school_id)
+
+        # Latest membership wins → current flight
+        current_flight = dict(
+            FlightMembership.objects
+            .filter(student__school_id=school_id)
+            .order_by("student_id", "joined_at")
+            .values_list("student_id", "flight_id")
+        )
+
+        rows = Student.objects.filter(school_id=school_id).values_list(
+            "id", "user_id", "student_id", "is_active", "user__first_name", "user__last_name"
+        )
+        for pk, user_id, student_id, is_active, first_name, last_name in rows:
+            name = f"{first_name or ''} {last_name or ''}".strip()
+            entry = RosterEntry(pk, school_id, user_id, student_id, is_active, current_flight.get(pk), name)
+            roster.by_student_id[student_id] = entry
+            roster.by_user_id[user_id] = entry
+            roster.by_pk[pk] = entry
+
+        return roster
+
+
+class RosterIndex:
+    """
+    In-process cache of school rosters for the scan hot path.
+
+    A roster is loaded once per school (two queries) and dropped by the
+    Student / FlightMembership signals in attendance.signals, so a warm
+    scan resolves its QR payload with zero queries.
+
+    The signals only reach the process that saved the row. Other workers
+    catch up in two ways: a roster older than MAX_AGE is reloaded, and a
+    scan that misses a cached roster reloads it once (at most every
+    RELOAD_INTERVAL per school, so bad payloads can't force a query per
+    scan) before giving up — a student enrolled or moved elsewhere is
+    found on the first scan.
+    """
+
+    MAX_AGE = 5 * 60
+    RELOAD_INTERVAL = 5
+
+    _rosters = {}
+    _user_school = {}     # user_id → school_id, for JSON (user_id) payloads
+    _student_school = {}  # student pk → school_id, for invalidation
+    _lock = threading.Lock()
+
+    # ------------------------------------------------------------
+    # 🔹 Loading / invalidation
+    # ------------------------------------------------------------
+    @classmethod
+    def get(cls, school_id):
+        roster = cls._rosters.get(school_id)
+        if roster is not None:
+            if time.monotonic() - roster.loaded_at < cls.MAX_AGE:
+                return roster
+            cls.invalidate(school_id)
+
+        with cls._lock:
+            roster = cls._rosters.get(school_id)
+            if roster is None:
+                roster = SchoolRoster.load(school_id)
+                if not roster.by_user_id:
+                    # Don't let unknown school ids from bad payloads pile up
+                    return roster
+                for user_id, entry in roster.by_user_id.items():
+                    cls._user_school[user_id] = school_id
+                    cls._student_school[entry.student_pk] = school_id
+                cls._rosters[school_id] = roster
+        return roster
+
+    @classmethod
+    def invalidate(cls, school_id=None):
+        with cls._lock:
+            if school_id is None:
+                cls._rosters.clear()
+                cls._user_school.clear()
+                cls._student_school.clear()
+                return
+
+            roster = cls._rosters.pop(school_id, None)
+            if roster is not None:
+                for user_id, entry in roster.by_user_id.items():
+                    cls._user_school.pop(user_id, None)
+                    cls._student_school.pop(entry.student_pk, None)
+
+    @classmethod
+    def reload_on_miss(cls, school_id):
+        """
+        Reload a cached roster that just missed a lookup, unless it was
+        loaded less than RELOAD_INTERVAL ago. Returns the (possibly same)
+        roster.
+        """
+        roster = cls._rosters.get(school_id)
+        if roster is None:
+            return cls.get(school_id)
+        if time.monotonic() - roster.loaded_at < cls.RELOAD_INTERVAL:
+            return roster
+        cls.invalidate(school_id)
+        return cls.get(school_id)
+
+    @classmethod
+    def invalidate_student(cls, student_pk, user_id=None, school_id=None):
+        """Drop every roster that may hold this student (old and new school)."""
+        for sid in {school_id, cls._student_school.get(student_pk), cls._user_school.get(user_id)}:
+            if sid is not None:
+                cls.invalidate(sid)
+
+    @classmethod
+    def warm_for_users(cls, user_ids):
+        """Load the rosters of all given users' schools with one lookup query."""
+        missing = [uid for uid in user_ids if uid not in cls._user_school]
+        if not missing:
+            return
+
+        school_ids = set(
+            Student.objects.filter(user_id__in=missing).values_list("school_id", flat=True)
+        )
+        for school_id in school_ids:
+            cls.get(school_id)
+
+    # ------------------------------------------------------------
+    # 🔹 Resolution
+    # ------------------------------------------------------------
+    @staticmethod
+    def parse_payload(payload):
+        """
+        Returns ("student", school_id, student_id) for Student QR codes,
+        ("user", user_id) for UserProfile JSON QR codes, or None.
+        """
+        if payload is None:
+            return None
+
+        text = str(payload).strip()
+        match = STUDENT_QR_PATTERN.match(text)
+        if match:
+            return "student", int(match["school_id"]), match["student_id"]
+
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return None
+
+        if isinstance(data, dict) and str(data.get("user_id", "")).isdigit():
+            return "user", int(data["user_id"])
+        return None
+
+    @classmethod
+    def resolve_user(cls, user_id):
+        school_id = cls._user_school.get(user_id)
+        if school_id is None:
+            cls.warm_for_users([user_id])
+            school_id = cls._user_school.get(user_id)
+            if school_id is None:
+                return None
+        entry = cls.get(school_id).by_user_id.get(user_id)
+        if entry is None:
+            # Stale roster (e.g. enrolled through another worker)
+            entry = cls.reload_on_miss(school_id).by_user_id.get(user_id)
+            if entry is None:
+                # Moved to a school this process has no mapping for yet
+                cls._user_school.pop(user_id, None)
+                cls.warm_for_users([user_id])
+                school_id = cls._user_school.get(user_id)
+                entry = cls.get(school_id).by_user_id.get(user_id) if school_id is not None else None
+        return entry
+
+    @classmethod
+    def resolve(cls, payload):
+        """Resolve a raw QR payload to a RosterEntry, or None if it matches nobody."""
+        parsed = cls.parse_payload(payload)
+        if parsed is None:
+            return None
+
+        if parsed[0] == "student":
+            _, school_id, student_id = parsed
+            entry = cls.get(school_id).by_student_id.get(student_id)
+            if entry is None:
+                entry = cls.reload_on_miss(school_id).by_student_id.get(student_id)
+            return entry
+
+        return cls.resolve_user(parsed[1])
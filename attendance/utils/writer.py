@@ -0,0 +1,204 @@
+from django.db import connection
+from django.utils import timezone
+
+from attendance.models import Attendance
+from attendance.utils.calendars import AttendanceCalendar
+from attendance.utils.live_feed import AttendanceFeed
+from attendance.utils.rollup import AttendanceRollup
+
+
+class AttendanceWriter:
+    """
+    Single round-trip time-in / time-out state machine for one scan.
+
+    The whole transition is one ``INSERT ... ON CONFLICT DO UPDATE``:
+
+    - no row for (student, date, class)   → INSERT (time-in)
+    - row exists, no ``time_in``          → UPDATE time_in + status (time-in over
+                                            an auto-absent placeholder)
+    - row exists, ``time_out`` is NULL    → UPDATE time_out + status (time-out)
+    - row exists, ``time_out`` is set     → conditional UPDATE skipped (completed)
+
+    Concurrent scanners hitting the same row are serialized by PostgreSQL
+    on the conflicting row itself: the second one waits for the first to
+    commit and then sees its result, so there is no IntegrityError to
+    retry and no read-modify-write window.
+
+    Relies on the unique keys declared on Attendance.Meta: the
+    (student, date, class_obj) unique_together for class scans and the
+    partial (student, date) WHERE class_obj IS NULL constraint for plain
+    kiosk scans.
+
+    A returned row with no time-out is therefore a time-in: the DO UPDATE
+    branch only leaves ``time_out`` empty when it fills a placeholder's
+    ``time_in``. (``xmax`` can't be read from a partitioned attendance
+    table, see AttendancePartitioner.)
+
+    The same statement reads the row's previous status so the daily
+    rollup can be adjusted with one counter UPDATE afterwards. The rollup
+    write runs in its own autocommit statement to keep its hot counter
+    row locked as briefly as possible.
+    """
+
+    TIME_IN = "time_in"
+    TIME_OUT = "time_out"
+    COMPLETED = "completed"
+
+    BATCH_SIZE = 500
+
+    @staticmethod
+    def _transition_sql():
+        """The time-in / time-out state machine, as the ON CONFLICT branch (target aliased ``att``)."""
+        q = connection.ops.quote_name
+        return f"""
+                DO UPDATE SET
+                    {q('time_in')} = COALESCE(att.{q('time_in')}, EXCLUDED.{q('time_in')}),
+                    {q('time_out')} = CASE WHEN att.{q('time_in')} IS NULL
+                                           THEN NULL ELSE EXCLUDED.{q('time_in')} END,
+                    {q('status')} = EXCLUDED.{q('status')}
+                WHERE att.{q('time_out')} IS NULL
+        """
+
+    @classmethod
+    def _upsert_sql(cls, with_class):
+        table = Attendance._meta.db_table
+        q = connection.ops.quote_name
+
+        if with_class:
+            conflict = f"({q('student_id')}, {q('date')}, {q('class_obj_id')})"
+            match_class = f"{q('class_obj_id')} = %s"
+        else:
+            conflict = f"({q('student_id')}, {q('date')}) WHERE {q('class_obj_id')} IS NULL"
+            match_class = f"{q('class_obj_id')} IS NULL"
+
+        return f"""
+            WITH prev AS (
+                SELECT {q('status')} FROM {q(table)}
+                WHERE {q('student_id')} = %s AND {q('date')} = %s AND {match_class}
+            ), upsert AS (
+                INSERT INTO {q(table)} AS att
+                    ({q('school_id')}, {q('student_id')}, {q('flight_id')}, {q('class_obj_id')},
+                     {q('date')}, {q('time_in')}, {q('status')})
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT {conflict}
+                {cls._transition_sql()}
+                RETURNING att.{q('id')}, att.{q('school_id')}, att.{q('flight_id')},
+                          att.{q('time_in')}, att.{q('time_out')}, att.{q('status')},
+                          (att.{q('time_out')} IS NULL) AS timed_in
+            )
+            SELECT upsert.*, (SELECT {q('status')} FROM prev) FROM upsert
+        """
+
+    @classmethod
+    def _upsert_many_sql(cls, count):
+        table = Attendance._meta.db_table
+        q = connection.ops.quote_name
+        values = ", ".join(["(%s::integer, %s::integer, %s::integer, %s::date, %s::time, %s::varchar)"] * count)
+
+        return f"""
+            WITH scan (school_id, student_id, flight_id, date, time_in, status) AS (
+                VALUES {values}
+            ), prev AS (
+                SELECT a.{q('student_id')} AS student_id, a.{q('date')} AS date, a.{q('status')} AS status
+                FROM {q(table)} a
+                JOIN scan ON a.{q('student_id')} = scan.student_id AND a.{q('date')} = scan.date
+                WHERE a.{q('class_obj_id')} IS NULL
+            ), upsert AS (
+                INSERT INTO {q(table)} AS att
+                    ({q('school_id')}, {q('student_id')}, {q('flight_id')}, {q('class_obj_id')},
+                     {q('date')}, {q('time_in')}, {q('status')})
+                SELECT school_id, student_id, flight_id, NULL, date, time_in, status
+                FROM scan
+                ORDER BY student_id, date
+                ON CONFLICT ({q('student_id')}, {q('date')}) WHERE {q('class_obj_id')} IS NULL
+                {cls._transition_sql()}
+                RETURNING att.{q('student_id')} AS student_id, att.{q('date')} AS date,
+                          att.{q('id')}, att.{q('school_id')}, att.{q('flight_id')},
+                          att.{q('time_in')}, att.{q('time_out')}, att.{q('status')},
+                          (att.{q('time_out')} IS NULL) AS timed_in
+            )
+            SELECT upsert.*, prev.status FROM upsert
+            LEFT JOIN prev ON prev.student_id = upsert.student_id AND prev.date = upsert.date
+        """
+
+    @classmethod
+    def record_scan(cls, school_id, student_id, status, flight_id=None, class_obj_id=None, scanned_at=None):
+        """
+        Apply one scan. Returns ``(transition, attendance)`` where transition is
+        time_in | time_out | completed and attendance is the resulting row.
+        """
+        local = timezone.localtime(scanned_at or timezone.now())
+        date, time = local.date(), local.time()
+
+        with_class = class_obj_id is not None
+        match_params = [student_id, date] + ([class_obj_id] if with_class else [])
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                cls._upsert_sql(with_class=with_class),
+                match_params + [school_id, student_id, flight_id, class_obj_id, date, time, status],
+            )
+            row = cursor.fetchone()
+
+        # Conditional update skipped → the day is already closed
+        if row is None:
+            attendance = Attendance.objects.get(
+                student_id=student_id, date=date, class_obj_id=class_obj_id
+            )
+            return cls.COMPLETED, attendance
+
+        pk, school_id, flight_id, time_in, time_out, status, timed_in, previous_status = row
+        attendance = Attendance(
+            id=pk,
+            school_id=school_id,
+            student_id=student_id,
+            flight_id=flight_id,
+            class_obj_id=class_obj_id,
+            date=date,
+            time_in=time_in,
+            time_out=time_out,
+            status=status,
+        )
+
+        # previous_status is None for a fresh insert, ABSENT over a placeholder
+        if not timed_in and previous_status is None:
+            # Lost a first-scan race: the row was inserted after our snapshot,
+            # so its original status is unknown — leave the counters as they are
+            previous_status = status
+        AttendanceRollup.record(attendance, previous_status)
+        if not with_class:
+            AttendanceCalendar.sync(school_id, date, [student_id])
+
+        transition = cls.TIME_IN if timed_in else cls.TIME_OUT
+        AttendanceFeed.publish_scan(transition, attendance, previous_status)
+
+        return transition, attendance
+
+    @classmethod
+    def upsert_many(cls, scans):
+        """
+        Apply one kiosk scan (no class) per (student, date) with the same
+        ON CONFLICT state machine as ``record_scan``, BATCH_SIZE rows per
+        statement. ``scans`` are (school_id, student_id, flight_id, date,
+        time, status) with at most one per (student, date).
+
+        Rows are written in (student, date) order, so batches that overlap
+        wait on each other's rows in the same order instead of deadlocking.
+        No rollup, calendar or feed work — the caller aggregates it.
+
+        Returns {(student_id, date): (pk, school_id, flight_id, time_in,
+        time_out, status, timed_in, previous_status)}; a key missing from
+        it was already closed (completed).
+        """
+        scans = sorted(scans, key=lambda scan: (scan[1], scan[3]))
+        written = {}
+        with connection.cursor() as cursor:
+            for start in range(0, len(scans), cls.BATCH_SIZE):
+                chunk = scans[start:start + cls.BATCH_SIZE]
+                cursor.execute(
+                    cls._upsert_many_sql(len(chunk)),
+                    [value for scan in chunk for value in scan],
+                )
+                for student_id, date, *row in cursor.fetchall():
+                    written[(student_id, date)] = tuple(row)
+        return written
@@ -1,6 +1,79 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views import View
 from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 
+from attendance.utils.live_feed import AttendanceFeed
+from attendance.utils.rollup import AttendanceRollup
+
 
 class AttendanceView(LoginRequiredMixin, TemplateView):
     template_name = "attendance/attendance_metrics.html"
+
+
+class AttendanceLiveFeedView(View):
+    """
+    GET /attendance/live/?school=3   (text/event-stream)
+
+    Server-sent events for a dashboard: one ``snapshot`` event with today's
+    rollup summary, then a ``time_in`` / ``time_out`` event per scan with
+    the student, status and the counter delta to apply. ``resync`` means
+    the viewer fell behind and should reconnect for a fresh snapshot.
+
+    The view is async: a connected viewer is a coroutine parked on a queue
+    on the ASGI event loop, not a sync worker. Serve it through
+    ``school.asgi:application`` (uvicorn / daphne / gunicorn -k uvicorn).
+    Scans may be handled by any worker, WSGI or ASGI: events reach this
+    stream through PostgreSQL NOTIFY (``ATTENDANCE_FEED_BROKER``). With
+    the "local" broker, the scan endpoints and this view must be served
+    by the same single ASGI process, or viewers see nothing.
+    """
+
+    KEEPALIVE_SECONDS = 15
+    RETRY_MILLISECONDS = 5000
+
+    async def get(self, request):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return JsonResponse({"error": "Authentication required."}, status=401)
+
+        if not isinstance(request, ASGIRequest):
+            # Under WSGI an endless stream would pin a worker thread per viewer
+            return JsonResponse(
+                {"error": "The live feed is only served by the ASGI application (school.asgi)."},
+                status=503,
+            )
+
+        school = request.GET.get("school") or ""
+        school_id = int(school) if school.isdigit() else None
+
+        response = StreamingHttpResponse(self.stream(school_id), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def stream(self, school_id):
+        # Subscribe before reading the snapshot so no scan falls in between
+        subscription = AttendanceFeed.subscribe(school_id)
+        try:
+            today = timezone.localdate()
+            snapshot = await sync_to_async(AttendanceRollup.summary)(today, school_id=school_id)
+            snapshot.update({"date": today, "school": school_id})
+
+            yield f"retry: {self.RETRY_MILLISECONDS}\n\n"
+            yield AttendanceFeed.encode("snapshot", snapshot)
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=self.KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield AttendanceFeed.encode(event["type"], event)
+        finally:
+            AttendanceFeed.unsubscribe(subscription)
@@ -1,22 +1,140 @@
 function initAttendanceChart(present, absent) {
-  const ctx = document.getElementById('attendanceChart');
+  const ctx = document.getElementById("attendanceChart").getContext("2d");
 
-  new Chart(ctx, {
-    type: 'pie',
+  return new Chart(ctx, {
+    type: "doughnut",
     data: {
-      labels: ['Present', 'Absent'],
+      labels: ["Present", "Absent"],
       datasets: [{
-        label: 'Attendance',
         data: [present, absent],
-        backgroundColor: ['#28a745', '#dc3545'],
-        borderWidth: 1
+        backgroundColor: ["#10b981", "#f59e0b"], // green, amber
+        borderColor: ["#fff", "#fff"],
+        borderWidth: 2
       }]
     },
     options: {
       responsive: true,
       plugins: {
-        legend: { position: 'bottom' }
+        legend: {
+          position: "bottom",
+          labels: {
+            color: "#374151",
+            font: { size: 10 }
+          }
+        }
       }
     }
   });
 }
+
+// ------------------------------------------------------------
+// 🔹 Live attendance feed (SSE)
+// ------------------------------------------------------------
+// One EventSource per dashboard replaces polling. The server sends a
+// "snapshot" of today's counts, then one event per scan carrying the
+// counter delta ({present: +1}, {late: -1, present: +1}, ...).
+
+const LIVE_SCAN_LIMIT = 15;
+
+function initLiveAttendanceFeed({ school, chart }) {
+  if (!window.EventSource) return;
+
+  let state = null;
+  let source = null;
+
+  const params = school ? `?school=${encodeURIComponent(school)}` : "";
+
+  function flightKey(flightId) {
+    return flightId == null ? "" : String(flightId);
+  }
+
+  function loadSnapshot(snapshot) {
+    state = {
+      date: snapshot.date,
+      strength: snapshot.total_strength,
+      present: snapshot.present,
+      flights: {},
+    };
+    (snapshot.flights || []).forEach(flight => {
+      state.flights[flightKey(flight.flight_id)] = {
+        strength: flight.total_strength,
+        present: flight.present,
+        excused: flight.excused,
+      };
+    });
+    render();
+  }
+
+  function applyScan(event) {
+    if (!state || event.date !== state.date) return;
+
+    const delta = event.delta || {};
+    const attended = (delta.present || 0) + (delta.late || 0);
+
+    state.present += attended;
+
+    const flight = state.flights[flightKey(event.flight_id)];
+    if (flight) {
+      flight.present += attended;
+      flight.excused += delta.excused || 0;
+    }
+
+    render();
+    prependScan(event);
+  }
+
+  function render() {
+    const absent = Math.max(state.strength - state.present, 0);
+
+    $("#liveStrength").text(state.strength);
+    $("#livePresent").text(state.present);
+    $("#liveAbsent").text(absent);
+
+    if (chart) {
+      chart.data.datasets[0].data = [state.present, absent];
+      chart.update("none");
+    }
+
+    $("#flightCards [data-flight-id]").each(function () {
+      const flight = state.flights[String($(this).data("flight-id"))];
+      if (!flight) return;
+      $(this).find('[data-field="total_strength"]').text(flight.strength);
+      $(this).find('[data-field="present"]').text(flight.present);
+      $(this).find('[data-field="absent"]').text(Math.max(flight.strength - flight.present, 0));
+      $(this).find('[data-field="excused"]').text(flight.excused);
+    });
+  }
+
+  function prependScan(event) {
+    const list = $("#liveScanList");
+    list.find(".text-gray-400").remove();
+
+    const time = (event.type === "time_out" ? event.time_out : event.time_in) || "";
+    const label = event.type === "time_out" ? "Time-out" : "Time-in";
+    const item = $("<li>").text(
+      `${time.slice(0, 5)} · ${label} · ${event.name || event.student_id || "Student"} (${event.status})`
+    );
+
+    list.prepend(item);
+    list.children().slice(LIVE_SCAN_LIMIT).remove();
+  }
+
+  function connect() {
+    source = new EventSource(`/attendance/live/${params}`);
+
+    source.addEventListener("open", () => $("#liveFeedStatus").text("● live"));
+    source.addEventListener("error", () => $("#liveFeedStatus").text("reconnecting…"));
+
+    source.addEventListener("snapshot", e => loadSnapshot(JSON.parse(e.data)));
+    source.addEventListener("time_in", e => applyScan(JSON.parse(e.data)));
+    source.addEventListener("time_out", e => applyScan(JSON.parse(e.data)));
+
+    // Fell behind the server queue → start over from a fresh snapshot
+    source.addEventListener("resync", () => {
+      source.close();
+      connect();
+    });
+  }
+
+  connect();
+}
@@ -1,21 +1,23 @@
 from django.views.generic import TemplateView
+from django.utils import timezone
 
+from attendance.utils.rollup import AttendanceRollup
 
-class IndexView(TemplateView):
-    template_name = "layouts/base.html"
 
-class AttendanceDashboardView(TemplateView):
-    template_name = "dashboard/dashboard.html"
+class AttendanceSummaryMixin:
+    """Today's strength / present / absent and flights summary, read from the daily rollup."""
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        context.update(AttendanceRollup.summary(
+            timezone.localdate(),
+            school_id=self.request.GET.get("school") or None,
+        ))
+        return context
 
-        # Example demo values (replace with actual DB queries later)
-        total_strength = 100
-        present = 78
-        absent = total_strength - present
 
-        context["total_strength"] = total_strength
-        context["present"] = present
-        context["absent"] = absent
-        return context
+class IndexView(AttendanceSummaryMixin, TemplateView):
+    template_name = "layouts/base.html"
+
+class AttendanceDashboardView(AttendanceSummaryMixin, TemplateView):
+    template_name = "dashboard/dashboard.html"
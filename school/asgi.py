@@ -3,6 +3,10 @@ ASGI config for school project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it (e.g. ``uvicorn school.asgi:application``) for the attendance live
+feed at /attendance/live/, which streams server-sent events from an async
+view and would otherwise hold a sync worker per connected dashboard.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,13 @@
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "school.settings")
+
+app = Celery("school")
+
+# CELERY_* settings from Django settings
+app.config_from_object("django.conf:settings", namespace="CELERY")
+
+# tasks.py in every installed app
+app.autodiscover_tasks()
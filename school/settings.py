@@ -45,6 +45,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # APPS
     'authentication',
     'attendance',
@@ -92,6 +93,13 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'school.wsgi.application'
 
+# Long-lived endpoints (attendance live feed) are served through ASGI
+ASGI_APPLICATION = 'school.asgi.application'
+
+# Live feed events: "postgres" (NOTIFY — scans served by any WSGI / ASGI worker reach every viewer)
+# or "local" (in-process only: scans and the feed must then run in the same single ASGI process)
+ATTENDANCE_FEED_BROKER = os.getenv("ATTENDANCE_FEED_BROKER", "postgres")
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -325,3 +333,30 @@ CSRF_COOKIE_HTTPONLY = True
 # Limit cross-site cookie sending
 SESSION_COOKIE_SAMESITE = "Strict"   # or "Lax"
 CSRF_COOKIE_SAMESITE = "Strict"
+
+# ------------------------------------------------------------
+# Celery / Celery Beat
+# ------------------------------------------------------------
+from celery.schedules import crontab
+
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+CELERY_TIMEZONE = TIME_ZONE
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+
+CELERY_BEAT_SCHEDULE = {
+    # 18:00 Asia/Manila (TIME_ZONE is UTC), school days
+    "attendance-mark-absent-students": {
+        "task": "attendance.tasks.mark_absent_students",
+        "schedule": crontab(hour=10, minute=0, day_of_week="mon-fri"),
+    },
+    # Picks up QR renders whose job was lost (see school.utils.qr_render)
+    "student-render-pending-qr-codes": {
+        "task": "student.tasks.render_pending_qr_codes",
+        "schedule": crontab(minute="*/5"),
+    },
+}
+
+# QR rendering: "celery" (falls back to an in-process thread if the broker is down) or "local".
+# Celery only when a broker is configured — publishing to a missing one stalls every save.
+QR_RENDER_BACKEND = os.getenv("QR_RENDER_BACKEND", "celery" if os.getenv("CELERY_BROKER_URL") else "local")
@@ -19,6 +19,7 @@ from django.urls import path, include
 from django.views.generic import RedirectView
 from django.conf import settings
 from django.conf.urls.static import static
+from school.views import QRImageView
 
 urlpatterns = [
     # path("", RedirectView.as_view(url="/dashboard/", permanent=False)),
@@ -29,6 +30,7 @@ urlpatterns = [
     path('', include('schools.urls')),
     path('', include('student.urls')),
     path('', include('attendance.urls')),
+    path('qr/<str:digest>.png', QRImageView.as_view(), name='qr_image'),
 ]
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
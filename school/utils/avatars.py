@@ -0,0 +1,67 @@
+from django.db import transaction
+from django.db.models import Q
+
+
+class DefaultAvatar:
+    """
+    Fallback avatars for students / user profiles without a picture.
+
+    The image is derived from the auth user id, so it is the same on every
+    read (and for a user's profile and student record) without anything
+    being written. ``backfill`` persists the choice into ``default_avatar``
+    for existing rows (``manage.py backfill_avatars``).
+    """
+
+    IMAGES = (
+        "bear.png", "cat.png", "duck.png", "gorilla.png",
+        "koala.png", "panda.png", "sea-lion.png", "jaguar.png", "dog.png",
+    )
+    STATIC_URL = "/static/img/users/avatars/"
+
+    @classmethod
+    def for_user(cls, user_id):
+        return cls.IMAGES[(user_id or 0) % len(cls.IMAGES)]
+
+    @classmethod
+    def url(cls, name):
+        return f"{cls.STATIC_URL}{name}"
+
+    @classmethod
+    def picture_url(cls, obj):
+        """Uploaded picture, stored avatar, else the derived one — never saves."""
+        if obj.profile_picture:
+            return obj.profile_picture.url
+        return cls.url(obj.default_avatar or cls.for_user(obj.user_id))
+
+    @classmethod
+    def backfill(cls, model, chunk_size=1000):
+        """
+        Store the derived avatar on rows with neither picture nor avatar,
+        walking the table by pk, one ``bulk_update`` (and transaction) per
+        chunk. No model ``save()``, so no signals or QR work. Yields the pks
+        updated in each chunk.
+        """
+        last_pk = 0
+        while True:
+            rows = list(
+                cls.missing(model)
+                .filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", "user_id")[:chunk_size]
+            )
+            if not rows:
+                return
+            last_pk = rows[-1][0]
+
+            batch = [model(pk=pk, default_avatar=cls.for_user(user_id)) for pk, user_id in rows]
+            with transaction.atomic():
+                model.objects.bulk_update(batch, ["default_avatar"])
+            yield [pk for pk, _ in rows]
+
+    @staticmethod
+    def missing(model):
+        """Rows that would fall back to a derived avatar."""
+        return model.objects.filter(
+            Q(profile_picture__isnull=True) | Q(profile_picture=""),
+            Q(default_avatar__isnull=True) | Q(default_avatar=""),
+        )
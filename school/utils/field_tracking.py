@@ -0,0 +1,118 @@
+from django.db.models.fields.files import FieldFile
+from django.db.models.signals import post_init
+
+
+class FieldTracker:
+    """
+    Remembers the database values of a few fields on a model instance, so
+    ``save()`` can tell what changed without re-reading the row.
+
+    Snapshots live in the instance ``__dict__`` and only cover fields that
+    were actually loaded: a deferred field that is never touched can't have
+    changed, and one that is loaded later is snapshotted by
+    ``TrackedFieldsMixin.refresh_from_db``.
+    """
+
+    ATTR = "_tracked_values"
+
+    @staticmethod
+    def normalize(value):
+        # File fields hold a str after loading and a FieldFile once accessed
+        return value.name if isinstance(value, FieldFile) else value
+
+    @classmethod
+    def snapshot(cls, instance, fields):
+        """Record the current values of the loaded ``fields`` (attnames)."""
+        values = instance.__dict__.setdefault(cls.ATTR, {})
+        for name in fields:
+            if name in instance.__dict__:
+                values[name] = cls.normalize(instance.__dict__[name])
+        return values
+
+    @classmethod
+    def original(cls, instance):
+        return instance.__dict__.get(cls.ATTR, {})
+
+    @classmethod
+    def watch(cls, model, fields):
+        """
+        Snapshot ``fields`` on every ``model`` instance created with a pk —
+        for models we can't add the mixin to (``auth.User``). ``post_init``
+        runs inside ``from_db`` before anything can modify the instance.
+        """
+        def snapshot_on_init(sender, instance, **kwargs):
+            if instance.pk is not None:
+                cls.snapshot(instance, fields)
+
+        post_init.connect(
+            snapshot_on_init, sender=model, weak=False,
+            dispatch_uid=f"field-tracker-{model._meta.label_lower}",
+        )
+
+
+class TrackedFieldsMixin:
+    """
+    Model mixin: snapshot ``TRACKED_FIELDS`` (attnames) in ``from_db`` and
+    after every save, and answer "what changed since the row was read"
+    with ``previous_values`` / ``changed_fields``. Only an instance that
+    wasn't loaded from the database (or a tracked field assigned while
+    still deferred) falls back to a query.
+    """
+
+    TRACKED_FIELDS = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        FieldTracker.snapshot(instance, cls.TRACKED_FIELDS)
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        if fields is None:
+            FieldTracker.snapshot(self, self.TRACKED_FIELDS)
+        else:
+            # Only what was re-read: other tracked fields may hold unsaved edits
+            refreshed = {self._meta.get_field(name).attname for name in fields}
+            FieldTracker.snapshot(self, [name for name in self.TRACKED_FIELDS if name in refreshed])
+
+    def previous_values(self, fields=None):
+        """{field: database value} for ``fields`` (default: all tracked)."""
+        fields = fields or self.TRACKED_FIELDS
+        original = FieldTracker.original(self)
+        values = {}
+        missing = []
+        for name in fields:
+            if name in original:
+                values[name] = original[name]
+            elif name not in self.__dict__:
+                values[name] = FieldTracker.normalize(getattr(self, name))  # deferred, untouched
+            else:
+                missing.append(name)
+
+        if missing:
+            row = type(self)._base_manager.filter(pk=self.pk).values(*missing).first() or {}
+            values.update({name: row.get(name) for name in missing})
+        return values
+
+    def changed_fields(self, fields=None):
+        """Tracked fields whose value differs from the database (all of them for a new row)."""
+        fields = fields or self.TRACKED_FIELDS
+        if self.pk is None:
+            return set(fields)
+        # Still deferred → never loaded nor assigned → unchanged
+        loaded = [name for name in fields if name in self.__dict__]
+        previous = self.previous_values(loaded) if loaded else {}
+        return {
+            name for name in loaded
+            if FieldTracker.normalize(self.__dict__[name]) != previous[name]
+        }
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            FieldTracker.snapshot(self, self.TRACKED_FIELDS)
+        else:
+            saved = {self._meta.get_field(name).attname for name in update_fields}
+            FieldTracker.snapshot(self, [name for name in self.TRACKED_FIELDS if name in saved])
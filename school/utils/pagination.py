@@ -1,3 +1,18 @@
+import base64
+import datetime
+import decimal
+import json
+import uuid
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
 class FilterSortPaginate:
 
     @staticmethod
@@ -21,12 +36,13 @@ class FilterSortPaginate:
             order_fields) else 0
         order_field = order_fields[order_column_index]
 
-        # Sort the data
-        records = sorted(
-            records,
-            key=lambda x: x[order_field] if isinstance(x, dict) else '',
-            reverse=(order_dir == 'desc')
-        )
+        # Sort the data (unless ?fields= left the column out)
+        if records and order_field in records[0]:
+            records = sorted(
+                records,
+                key=lambda x: x[order_field] if isinstance(x, dict) else '',
+                reverse=(order_dir == 'desc')
+            )
 
         # Pagination: Page and page length
         start = int(request.GET.get('start', 0))
@@ -41,3 +57,237 @@ class FilterSortPaginate:
             paginated_data = records[start:end]
 
         return paginated_data, len(records)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor (keyset) pagination on a stable sort — no OFFSET, no COUNT(*).
+
+    The sort is the queryset's own ``order_by`` (so a ranked search pages
+    in rank order), else ``ordering``, with ``pk`` appended as the unique
+    tie-breaker. The cursor carries the sort values of the edge row and
+    the next page is ``WHERE (sort) > (values)``, so page 1000 costs the
+    same as page 1. NULLs are handled in PostgreSQL order (last when
+    ascending).
+
+    Responses look like DRF's CursorPagination:
+    ``{"next", "previous", "results"}``, plus ``approximate_count`` when
+    the client asks for ``?total=approx`` (planner estimate on PostgreSQL,
+    an exact count elsewhere).
+    """
+
+    ordering = ("pk",)
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 50
+
+    cursor_query_param = "cursor"
+    total_query_param = "total"
+    invalid_cursor_message = "Invalid cursor."
+
+    KEY = "_keyset_{}"
+
+    # ------------------------------------------------------------
+    # 🔹 Cursor encoding
+    # ------------------------------------------------------------
+    @staticmethod
+    def encode_value(value):
+        if isinstance(value, (datetime.date, datetime.time)):
+            return value.isoformat()  # full precision; JSONEncoder drops microseconds
+        if isinstance(value, (decimal.Decimal, uuid.UUID)):
+            return str(value)
+        return value
+
+    @classmethod
+    def encode_cursor(cls, values, reverse=False):
+        payload = {"v": [cls.encode_value(value) for value in values]}
+        if reverse:
+            payload["r"] = 1
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, token, size):
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            payload = json.loads(raw)
+            values = payload["v"]
+            reverse = bool(payload.get("r"))
+        except (TypeError, ValueError, KeyError, AttributeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != size:
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    # ------------------------------------------------------------
+    # 🔹 Sort keys
+    # ------------------------------------------------------------
+    def get_ordering(self, queryset):
+        """[(lookup, descending)] ending with the primary key."""
+        ordering = list(queryset.query.order_by)
+        if not ordering or not all(isinstance(item, str) for item in ordering):
+            ordering = list(self.ordering)
+
+        keys = []
+        for item in ordering:
+            name = item.lstrip("-")
+            if name == "?":
+                continue
+            keys.append((name, item.startswith("-")))
+            if name in ("pk", queryset.model._meta.pk.name):
+                return keys  # unique — anything after it never decides
+        return keys + [("pk", False)]
+
+    @staticmethod
+    def is_nullable(model, lookup):
+        """False only for a model column known to be NOT NULL (joins can still add NULLs)."""
+        parts = lookup.split("__")
+        try:
+            for i, part in enumerate(parts):
+                field = model._meta.pk if part == "pk" else model._meta.get_field(part)
+                if i < len(parts) - 1:
+                    if not field.many_to_one and not field.one_to_one or field.null or field.auto_created:
+                        return True
+                    model = field.related_model
+            return field.null
+        except FieldDoesNotExist:
+            return True  # an annotation
+
+    def after(self, key, value, descending, nullable):
+        """Rows strictly after ``value`` in scan order (NULL sorts as the largest value)."""
+        if value is None:
+            return Q(**{f"{key}__isnull": False}) if descending else Q(pk__in=[])
+        if descending:
+            return Q(**{f"{key}__lt": value})
+        condition = Q(**{f"{key}__gt": value})
+        return condition | Q(**{f"{key}__isnull": True}) if nullable else condition
+
+    @staticmethod
+    def equal(key, value):
+        return Q(**{f"{key}__isnull": True}) if value is None else Q(**{key: value})
+
+    def seek(self, queryset, keys, values):
+        """``queryset`` past the row whose sort values are ``values``."""
+        condition = Q(pk__in=[])
+        prefix = Q()
+        for (key, descending, nullable), value in zip(keys, values):
+            condition |= prefix & self.after(key, value, descending, nullable)
+            prefix &= self.equal(key, value)
+
+        key, descending, nullable = keys[0]
+        if values[0] is not None and not nullable:
+            # Redundant bound on the leading column so an index range scan applies
+            condition &= Q(**{f"{key}__{'lte' if descending else 'gte'}": values[0]})
+        return queryset.filter(condition)
+
+    # ------------------------------------------------------------
+    # 🔹 Paginating
+    # ------------------------------------------------------------
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+                if size > 0:
+                    return min(size, self.max_page_size) if self.max_page_size else size
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def approximate_count(self, queryset):
+        if connections[queryset.db].vendor != "postgresql":
+            return queryset.count()
+        plan = json.loads(queryset.order_by().explain(format="json"))
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        if request.query_params.get(self.total_query_param) == "approx":
+            self.count = self.approximate_count(queryset)
+        else:
+            self.count = None
+
+        ordering = self.get_ordering(queryset)
+        keys = [
+            (self.KEY.format(i), descending, self.is_nullable(queryset.model, name))
+            for i, (name, descending) in enumerate(ordering)
+        ]
+        queryset = queryset.annotate(**{key: F(name) for (key, _, _), (name, _) in zip(keys, ordering)})
+
+        token = request.query_params.get(self.cursor_query_param)
+        reverse = False
+        if token:
+            values, reverse = self.decode_cursor(token, len(keys))
+            # Walking backwards = walking forwards in the flipped order
+            scan = [(key, descending != reverse, nullable) for key, descending, nullable in keys]
+            try:
+                queryset = self.seek(queryset, scan, values)
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+        else:
+            scan = keys
+
+        queryset = queryset.order_by(*[f"-{key}" if descending else key for key, descending, _ in scan])
+        rows = list(queryset[:self.page_size + 1])
+        more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        key_names = [key for key, _, _ in keys]
+        first = self.sort_values(rows[0], key_names) if rows else None
+        last = self.sort_values(rows[-1], key_names) if rows else None
+
+        # A page reached going forwards has one behind it, and vice versa
+        has_next = more if not reverse else bool(token)
+        has_previous = more if reverse else bool(token)
+        self.next_cursor = self.encode_cursor(last) if has_next and rows else None
+        self.previous_cursor = self.encode_cursor(first, reverse=True) if has_previous and rows else None
+
+        # .values() rows would otherwise render the sort keys
+        for row in rows:
+            if isinstance(row, dict):
+                for key in key_names:
+                    row.pop(key, None)
+        return rows
+
+    @staticmethod
+    def sort_values(row, keys):
+        if isinstance(row, dict):
+            return [row[key] for key in keys]
+        return [getattr(row, key) for key in keys]
+
+    def link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, "page")
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        return self.link(self.next_cursor)
+
+    def get_previous_link(self):
+        return self.link(self.previous_cursor)
+
+    def get_paginated_response(self, data):
+        payload = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+        if self.count is not None:
+            payload["approximate_count"] = self.count
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "approximate_count": {"type": "integer"},
+                "results": schema,
+            },
+        }
@@ -0,0 +1,331 @@
+import base64
+import binascii
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import qrcode
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.db.models import Q
+from django.urls import reverse
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+class QRRenderer:
+    """
+    Pure QR → PNG bytes rendering (no DB, no models), so it can run in
+    pool workers. The styles match what Student / UserProfile rendered
+    inline before.
+    """
+
+    LOGO_PATH = os.path.join(settings.BASE_DIR, "authentication", "static", "img", "afrc_brand.png")
+
+    _logo = None
+
+    @classmethod
+    def logo(cls):
+        if cls._logo is None and os.path.exists(cls.LOGO_PATH):
+            cls._logo = Image.open(cls.LOGO_PATH).convert("RGBA")
+        return cls._logo
+
+    @staticmethod
+    def encode(image):
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    @classmethod
+    def student(cls, payload):
+        """Student kiosk QR: high error correction with the AFRC logo in the center."""
+        qr = qrcode.QRCode(
+            version=1,
+            error_correction=qrcode.constants.ERROR_CORRECT_H,  # REQUIRED for logo
+            box_size=8,
+            border=4,
+        )
+        qr.add_data(payload)
+        qr.make(fit=True)
+
+        image = qr.make_image(fill_color="black", back_color="white").convert("RGBA")
+
+        logo = cls.logo()
+        if logo is not None:
+            # 🔹 Logo at most 25% of the QR, centered
+            logo = logo.copy()
+            size = int(image.width * 0.25)
+            logo.thumbnail((size, size), Image.LANCZOS)
+            image.paste(logo, ((image.width - logo.width) // 2, (image.height - logo.height) // 2), logo)
+
+        return cls.encode(image)
+
+    @classmethod
+    def profile(cls, payload):
+        """User profile QR: JSON payload, no logo."""
+        qr = qrcode.QRCode(
+            version=4,
+            error_correction=qrcode.constants.ERROR_CORRECT_H,
+            box_size=10,
+            border=4,
+        )
+        qr.add_data(payload)
+        qr.make(fit=True)
+        return cls.encode(qr.make_image(fill_color="black", back_color="white").convert("RGB"))
+
+    @classmethod
+    def render(cls, job):
+        """Pool entry point: (kind, pk, payload) → (pk, PNG bytes)."""
+        kind, pk, payload = job
+        return pk, getattr(cls, kind)(payload)
+
+
+class QRStore:
+    """
+    Content-addressed QR images: ``qr/<aa>/<sha256>.png`` in the default
+    storage, where the name is the SHA-256 of the PNG. A row only keeps
+    the 64-char hash (``qr_hash``); identical images share one file and a
+    given name never changes content, so the image endpoint can serve it
+    with a strong ETag and ``immutable`` caching.
+    """
+
+    DIRECTORY = "qr"
+
+    @classmethod
+    def name(cls, digest):
+        return f"{cls.DIRECTORY}/{digest[:2]}/{digest}.png"
+
+    @classmethod
+    def save(cls, png):
+        """Store PNG bytes (once) and return their hash."""
+        digest = hashlib.sha256(png).hexdigest()
+        name = cls.name(digest)
+        if not default_storage.exists(name):
+            default_storage.save(name, ContentFile(png))
+        return digest
+
+    @classmethod
+    def exists(cls, digest):
+        return default_storage.exists(cls.name(digest))
+
+    @classmethod
+    def open(cls, digest):
+        return default_storage.open(cls.name(digest), "rb")
+
+    @classmethod
+    def read(cls, digest):
+        with cls.open(digest) as f:
+            return f.read()
+
+    @staticmethod
+    def url(digest):
+        return reverse("qr_image", args=[digest]) if digest else None
+
+    @classmethod
+    def backfill(cls, model, chunk_size=500):
+        """
+        Move legacy base64 ``qr_code`` values into the store, one chunk
+        (and one transaction) at a time, walking the table by pk so no
+        large offset or long-lived cursor is needed. Rows whose base64 is
+        unreadable are cleared and left pending for the render queue.
+        Yields (moved, invalid) per chunk.
+        """
+        last_pk = 0
+        while True:
+            rows = list(
+                model.objects
+                .filter(pk__gt=last_pk, qr_code__gt="")
+                .order_by("pk")
+                .values_list("pk", "qr_code")[:chunk_size]
+            )
+            if not rows:
+                return
+            last_pk = rows[-1][0]
+
+            batch = []
+            invalid = 0
+            for pk, text in rows:
+                try:
+                    png = base64.b64decode(text, validate=True)
+                except (binascii.Error, ValueError):
+                    png = None
+                if not png:
+                    invalid += 1
+                batch.append(model(pk=pk, qr_hash=cls.save(png) if png else None, qr_code=None))
+
+            with transaction.atomic():
+                model.objects.bulk_update(batch, ["qr_hash", "qr_code"])
+            yield len(batch) - invalid, invalid
+
+
+class QRRenderQueue:
+    """
+    Background QR rendering for Student and UserProfile.
+
+    A NULL ``qr_hash`` means "QR pending": saves and request handlers no
+    longer render inline, they clear the hash (when the payload changed)
+    and ``enqueue`` the pk. API responses return straight away with
+    ``qr_pending: true`` and clients pick the image up on a later fetch.
+
+    Jobs go to the kind's Celery task after commit. When Celery is off
+    (``QR_RENDER_BACKEND = "local"``, the default without a
+    ``CELERY_BROKER_URL``) or the broker can't be reached, a
+    single in-process background thread stands in. Either way the job
+    runs ``process``: payloads are built in one query, PNGs are rendered
+    in a process pool (inline for small batches, or inside daemonic
+    Celery workers, which can't fork), stored in QRStore by the parent
+    and the hashes written back with one ``bulk_update`` — only for rows
+    still pending with the payload that was rendered (re-read under a
+    row lock), so an edit made meanwhile is never stamped with the old
+    image. ``sweep``
+    (periodic task, ``render_qr_codes`` command) renders whatever is
+    still pending, so a lost job only delays a QR.
+    """
+
+    KINDS = {
+        "student": ("student.Student", "student.tasks.render_student_qr_codes"),
+        "profile": ("users.UserProfile", "users.tasks.render_profile_qr_codes"),
+    }
+
+    POOL_THRESHOLD = 50
+    BATCH_SIZE = 500
+
+    _local = None
+    _local_lock = threading.Lock()
+
+    # ------------------------------------------------------------
+    # 🔹 Queueing
+    # ------------------------------------------------------------
+    @classmethod
+    def model(cls, kind):
+        return apps.get_model(cls.KINDS[kind][0])
+
+    @classmethod
+    def enqueue(cls, kind, pks):
+        """Render these rows' QR codes once the current transaction commits."""
+        pks = [pk for pk in pks if pk is not None]
+        if pks:
+            transaction.on_commit(lambda: cls.dispatch(kind, pks))
+
+    @classmethod
+    def dispatch(cls, kind, pks):
+        if getattr(settings, "QR_RENDER_BACKEND", "local") == "celery":
+            try:
+                from celery import current_app
+                # No publish retries: a down broker must not hold up the request
+                current_app.send_task(cls.KINDS[kind][1], args=[pks], retry=False)
+                return
+            except Exception as e:  # broker down / not configured
+                logger.warning("QR render: Celery unavailable (%s), rendering in-process.", e)
+        cls.local_executor().submit(cls._run_local, kind, pks)
+
+    @classmethod
+    def local_executor(cls):
+        with cls._local_lock:
+            if cls._local is None:
+                cls._local = ThreadPoolExecutor(max_workers=1, thread_name_prefix="qr-render")
+            return cls._local
+
+    @classmethod
+    def _run_local(cls, kind, pks):
+        try:
+            cls.process(kind, pks)
+        except Exception:
+            logger.exception("QR render: local job failed (%s, %d rows).", kind, len(pks))
+        finally:
+            connections.close_all()
+
+    # ------------------------------------------------------------
+    # 🔹 Rendering
+    # ------------------------------------------------------------
+    @classmethod
+    def pending(cls, kind, pks=None):
+        queryset = cls.model(kind).objects.filter(Q(qr_hash__isnull=True) | Q(qr_hash=""))
+        if pks is not None:
+            queryset = queryset.filter(pk__in=pks)
+        return queryset
+
+    @classmethod
+    def payloads(cls, kind, pks=None, lock=False):
+        """[(pk, payload)] for the pending rows — one query per kind (``lock``: FOR UPDATE, in pk order)."""
+        queryset = cls.pending(kind, pks)
+        if kind == "student":
+            queryset = queryset.only("id", "school_id", "student_id")
+        else:
+            queryset = queryset.select_related("user", "classification")
+        if lock:
+            queryset = queryset.select_for_update(of=("self",))
+        return [(obj.pk, obj.qr_payload()) for obj in queryset.order_by("pk")]
+
+    @staticmethod
+    def can_fork():
+        # Celery prefork workers are daemonic and may not start child processes
+        return not multiprocessing.current_process().daemon
+
+    @classmethod
+    def render(cls, kind, jobs, workers=None):
+        """Yield (pk, PNG bytes) for [(pk, payload)] — pooled when it's worth it."""
+        work = [(kind, pk, payload) for pk, payload in jobs]
+        if len(work) < cls.POOL_THRESHOLD or workers == 1 or not cls.can_fork():
+            yield from map(QRRenderer.render, work)
+            return
+
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=context) as pool:
+            yield from pool.map(QRRenderer.render, work, chunksize=16)
+
+    @classmethod
+    def store(cls, kind, batch, rendered):
+        """
+        Write ``batch``'s hashes for the rows still pending whose payload
+        is still the one in ``rendered`` ({pk: payload}): a QR rendered
+        meanwhile (e.g. inline) is kept, a row edited since waits for its
+        own job.
+        """
+        with transaction.atomic():
+            current = dict(cls.payloads(kind, [obj.pk for obj in batch], lock=True))
+            batch = [obj for obj in batch if current.get(obj.pk) == rendered[obj.pk]]
+            return cls.model(kind).objects.bulk_update(batch, ["qr_hash", "qr_code"])
+
+    @classmethod
+    def process(cls, kind, pks=None, workers=None):
+        """Render and store the pending QR codes among ``pks`` (all pending when None). Returns rows written."""
+        model = cls.model(kind)
+        jobs = cls.payloads(kind, pks)
+        rendered = dict(jobs)
+
+        written = 0
+        batch = []
+        for pk, png in cls.render(kind, jobs, workers=workers):
+            # qr_code is the legacy base64 column; cleared as images move to QRStore
+            batch.append(model(pk=pk, qr_hash=QRStore.save(png), qr_code=None))
+            if len(batch) >= cls.BATCH_SIZE:
+                written += cls.store(kind, batch, rendered)
+                batch = []
+        if batch:
+            written += cls.store(kind, batch, rendered)
+        return written
+
+    @classmethod
+    def sweep(cls, kinds=None, workers=None):
+        """Render every pending QR now. Returns {kind: rows written}."""
+        return {kind: cls.process(kind, workers=workers) for kind in (kinds or cls.KINDS)}
+
+    @classmethod
+    def reset(cls, kind, pks=None):
+        """Mark rows as pending (e.g. after a logo change) and queue them. Returns rows reset."""
+        queryset = cls.model(kind).objects.all()
+        if pks is not None:
+            queryset = queryset.filter(pk__in=pks)
+        ids = list(queryset.values_list("pk", flat=True))
+        cls.model(kind).objects.filter(pk__in=ids).update(qr_hash=None)
+        cls.enqueue(kind, ids)
+        return len(ids)
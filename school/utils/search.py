@@ -0,0 +1,250 @@
+import logging
+
+from django.apps import apps
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import DatabaseError, connections
+from django.db.models import Case, DecimalField, IntegerField, Q, Value, When
+from django.db.models.functions import Cast, Concat, Upper
+from rest_framework import filters
+
+logger = logging.getLogger(__name__)
+
+
+class TrigramSearch:
+    """
+    Ranked name search backed by pg_trgm GIN indexes (PostgreSQL).
+
+    Every searched column gets a ``gin (UPPER(col) gin_trgm_ops)`` index,
+    which serves both the ``LIKE '%TERM%'`` Django emits for ``icontains``
+    and the word-similarity operator ``%>`` used for near matches. Indexes
+    are created by ``ensure_indexes`` (after ``migrate`` and via
+    ``manage.py ensure_search_indexes``) — ``auth_user`` is not ours to
+    add ``Meta.indexes`` to.
+
+    A term is split into words; each word must match one of the fields
+    (substring, or word-similar for words of 3+ characters — shorter
+    words match as prefixes, which the index can still serve). Results
+    are ordered by prefix match, then similarity, then the given
+    tie-breakers.
+    """
+
+    # model label → columns searched (and indexed)
+    INDEXES = {
+        "auth.User": ("first_name", "last_name", "username"),
+        "student.Student": ("first_name", "last_name", "student_id"),
+        "schools.SchoolOrg": ("name",),
+        "schools.SchoolYear": ("name",),
+    }
+
+    MIN_LENGTH = 2
+    DEFAULT_LIMIT = 10
+    MAX_LIMIT = 25
+
+    RANK = "search_rank"
+    PREFIX = "search_prefix"
+    # Decimal places the similarity is ranked (and cursored) by
+    RANK_DIGITS = 6
+
+    # alias → pg_trgm installed (checked once per process)
+    _available = {}
+
+    # ------------------------------------------------------------
+    # 🔹 Indexes
+    # ------------------------------------------------------------
+    @staticmethod
+    def supported(using="default"):
+        return connections[using].vendor == "postgresql"
+
+    @classmethod
+    def available(cls, using="default"):
+        """
+        Whether pg_trgm is installed. Without it, searches still work as
+        plain (unranked by similarity) substring / prefix matches.
+        """
+        if using not in cls._available:
+            enabled = False
+            if cls.supported(using):
+                with connections[using].cursor() as cursor:
+                    cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                    enabled = cursor.fetchone() is not None
+            cls._available[using] = enabled
+        return cls._available[using]
+
+    @staticmethod
+    def index_name(table, column):
+        return f"{table}_{column}_trgm"[:63]
+
+    @classmethod
+    def index_statements(cls, concurrently=True):
+        """(name, CREATE INDEX sql) for every searched column."""
+        keyword = "CONCURRENTLY " if concurrently else ""
+        statements = []
+        for label, columns in cls.INDEXES.items():
+            table = apps.get_model(label)._meta.db_table
+            for column in columns:
+                name = cls.index_name(table, column)
+                statements.append((
+                    name,
+                    f'CREATE INDEX {keyword}IF NOT EXISTS "{name}" '
+                    f'ON "{table}" USING gin (UPPER("{column}") gin_trgm_ops)',
+                ))
+        return statements
+
+    @classmethod
+    def ensure_indexes(cls, using="default", concurrently=True):
+        """
+        Create the pg_trgm extension and any missing index. Returns the
+        names of the indexes that didn't exist before. ``concurrently``
+        needs autocommit (it can't run inside a transaction).
+        """
+        if not cls.supported(using):
+            return []
+
+        connection = connections[using]
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cls._available[using] = True
+            cursor.execute(
+                """
+                SELECT index.relname, pg_index.indisvalid
+                FROM pg_index
+                JOIN pg_class index ON index.oid = pg_index.indexrelid
+                WHERE index.relnamespace = current_schema()::regnamespace
+                """
+            )
+            existing = dict(cursor.fetchall())
+
+            created = []
+            for name, sql in cls.index_statements(concurrently):
+                if existing.get(name):
+                    continue
+                if name in existing:
+                    # Left INVALID by an interrupted concurrent build — IF NOT EXISTS would keep it
+                    cursor.execute(f'DROP INDEX {"CONCURRENTLY " if concurrently else ""}IF EXISTS "{name}"')
+                cursor.execute(sql)
+                created.append(name)
+        return created
+
+    @classmethod
+    def ensure_indexes_after_migrate(cls, sender, using="default", **kwargs):
+        """post_migrate receiver — a missing extension privilege must not break migrate."""
+        if sender.name != "student":
+            return
+        try:
+            created = cls.ensure_indexes(using=using, concurrently=False)
+        except DatabaseError as e:
+            logger.warning("Search indexes not created (%s); run `manage.py ensure_search_indexes`.", e)
+            return
+        if created:
+            logger.info("Created search indexes: %s", ", ".join(created))
+
+    # ------------------------------------------------------------
+    # 🔹 Querying
+    # ------------------------------------------------------------
+    @staticmethod
+    def words(term):
+        return (term or "").upper().split()
+
+    @classmethod
+    def alias(cls, field):
+        return f"_search_{field.replace('__', '_')}"
+
+    @classmethod
+    def filter(cls, queryset, term, fields):
+        """``queryset`` narrowed to rows where every word of ``term`` matches a field."""
+        words = cls.words(term)
+        if not words:
+            return queryset
+
+        similar = cls.available(queryset.db)
+        queryset = queryset.alias(**{cls.alias(field): Upper(field) for field in fields})
+        for word in words:
+            match = Q()
+            for field in fields:
+                alias = cls.alias(field)
+                if len(word) < 3:
+                    # No trigram inside a 1–2 letter word; an anchored prefix still has one
+                    match |= Q(**{f"{alias}__startswith": word})
+                else:
+                    match |= Q(**{f"{alias}__contains": word})
+                    if similar:
+                        match |= Q(**{f"{alias}__trigram_word_similar": word})
+            queryset = queryset.filter(match)
+        return queryset
+
+    @classmethod
+    def rank(cls, queryset, term, fields, order=()):
+        """``filter`` plus ordering: prefix matches, then similarity, then ``order``."""
+        words = cls.words(term)
+        if not words:
+            return queryset.order_by(*order) if order else queryset
+
+        queryset = cls.filter(queryset, term, fields)
+        needle = " ".join(words)
+
+        haystack = [Upper(fields[0])]
+        for field in fields[1:]:
+            haystack += [Value(" "), Upper(field)]
+
+        prefix = Q()
+        for field in fields:
+            prefix |= Q(**{f"{cls.alias(field)}__startswith": words[0]})
+
+        # alias(), not annotate(): sort keys only, never rendered (nor in .values() rows)
+        queryset = queryset.alias(**{
+            cls.PREFIX: Case(When(prefix, then=Value(1)), default=Value(0), output_field=IntegerField()),
+        })
+        if not cls.available(queryset.db):
+            return queryset.order_by(f"-{cls.PREFIX}", *order)
+
+        return queryset.alias(**{
+            cls.RANK: cls.rank_key(
+                TrigramWordSimilarity(needle, Concat(*haystack) if len(haystack) > 1 else haystack[0])
+            ),
+        }).order_by(f"-{cls.PREFIX}", f"-{cls.RANK}", *order)
+
+    @classmethod
+    def rank_key(cls, similarity):
+        """
+        ``similarity`` (a PostgreSQL ``real``) as ``numeric(7, 6)``: the
+        float4 → JSON → float8 round trip of a cursor would never compare
+        equal to the stored rank, skipping or repeating tied rows.
+        """
+        return Cast(similarity, DecimalField(max_digits=cls.RANK_DIGITS + 1, decimal_places=cls.RANK_DIGITS))
+
+    @classmethod
+    def clamp_limit(cls, value):
+        try:
+            limit = int(value)
+        except (TypeError, ValueError):
+            return cls.DEFAULT_LIMIT
+        return max(1, min(limit, cls.MAX_LIMIT))
+
+    @classmethod
+    def typeahead(cls, queryset, term, fields, limit=None, order=()):
+        """The top ``limit`` ranked matches; nothing for terms under MIN_LENGTH."""
+        if len((term or "").strip()) < cls.MIN_LENGTH:
+            return queryset.none()
+        return cls.rank(queryset, term, fields, order)[:cls.clamp_limit(limit)]
+
+
+class TrigramSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` backend for views whose ``search_fields`` are covered by
+    TrigramSearch indexes: same parameter and word splitting as DRF's
+    SearchFilter, but matches are ranked (the view's ordering breaks ties).
+    Fields with a ``^`` / ``=`` / ``@`` / ``$`` prefix, or that need
+    DISTINCT, fall back to the plain SearchFilter.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        fields = list(self.get_search_fields(view, request) or ())
+        terms = self.get_search_terms(request)
+        if not fields or not terms:
+            return queryset
+
+        if any(field[0] in self.lookup_prefixes for field in fields) or self.must_call_distinct(queryset, fields):
+            return super().filter_queryset(request, queryset, view)
+
+        order = (*queryset.query.order_by, "pk")
+        return TrigramSearch.rank(queryset, " ".join(terms), fields, order=order)
@@ -0,0 +1,172 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+class SparseFieldsMixin:
+    """
+    Sparse fieldsets and named profiles for ModelSerializers.
+
+    The rendered fields are picked, in order, from:
+
+    - a profile: ``FIELD_PROFILES[name]`` ("detail", or any unknown name,
+      means every field);
+    - ``fields``: only these (overrides the profile);
+    - ``omit``: minus these.
+
+    Each can be passed to the serializer as a keyword argument (the view's
+    default) or, on GET requests, as ``?profile=`` / ``?fields=`` /
+    ``?omit=`` (comma separated), which win over the keywords. Unknown
+    names are ignored.
+
+    ``narrow_queryset`` then loads only what the remaining fields read:
+    ``.only()`` for columns, ``select_related`` for forward relations that
+    are traversed, ``prefetch_related`` for many-valued ones. Method fields
+    (and anything else without a model ``source``) list the lookups they
+    read in ``FIELD_SOURCES``; nested serializers are followed.
+    """
+
+    FIELD_PROFILES = {}
+    FIELD_SOURCES = {}
+
+    PROFILE_PARAM = "profile"
+    FIELDS_PARAM = "fields"
+    OMIT_PARAM = "omit"
+
+    def __init__(self, *args, fields=None, omit=None, profile=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields, omit, profile = self.field_options(self.context.get("request"), fields, omit, profile)
+
+        selected = set(self.select_fields(list(self.fields), fields, omit, profile))
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+
+    # ------------------------------------------------------------
+    # 🔹 Field selection
+    # ------------------------------------------------------------
+    @staticmethod
+    def split(value):
+        return [name.strip() for name in value.split(",") if name.strip()] if value else None
+
+    @classmethod
+    def field_options(cls, request, fields=None, omit=None, profile=None):
+        """(fields, omit, profile) — query parameters override the view's defaults on reads."""
+        if request is not None and request.method in SAFE_METHODS:
+            params = request.query_params
+            profile = params.get(cls.PROFILE_PARAM) or profile
+            fields = cls.split(params.get(cls.FIELDS_PARAM)) or fields
+            omit = cls.split(params.get(cls.OMIT_PARAM)) or omit
+        return fields, omit, profile
+
+    @classmethod
+    def select_fields(cls, names, fields=None, omit=None, profile=None):
+        if fields:
+            wanted = set(fields)
+            names = [name for name in names if name in wanted]
+        elif profile in cls.FIELD_PROFILES:
+            wanted = set(cls.FIELD_PROFILES[profile])
+            names = [name for name in names if name in wanted]
+
+        if omit:
+            dropped = set(omit)
+            names = [name for name in names if name not in dropped]
+        return names
+
+    # ------------------------------------------------------------
+    # 🔹 Queryset narrowing
+    # ------------------------------------------------------------
+    @classmethod
+    def read_paths(cls, serializer, prefix=""):
+        """Model lookups read by the serializer's readable fields."""
+        sources = getattr(serializer, "FIELD_SOURCES", {})
+        paths = set()
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if name in sources:
+                paths.update(prefix + path for path in sources[name])
+                continue
+            if field.source == "*":
+                continue
+
+            path = prefix + field.source.replace(".", "__")
+            if isinstance(field, serializers.ListSerializer):
+                paths.add(path)  # many-valued → prefetched
+            elif isinstance(field, serializers.BaseSerializer):
+                paths.update(cls.read_paths(field, f"{path}__"))
+            else:
+                paths.add(path)
+        return paths
+
+    @staticmethod
+    def resolve(model, path):
+        """
+        ("only", path, related prefix) for a column, ("prefetch", lookup) for
+        a many-valued relation, None for something that isn't a model field.
+        A forward relation at the end of the path loads its id column only.
+        """
+        parts = path.split("__")
+        for i, part in enumerate(parts):
+            try:
+                field = model._meta.get_field(part)
+            except FieldDoesNotExist:
+                return None
+            if field.many_to_many or field.one_to_many:
+                return "prefetch", "__".join(parts[:i + 1])
+            if not field.is_relation or i == len(parts) - 1:
+                return "only", "__".join(parts[:i + 1]), "__".join(parts[:i])
+            model = field.related_model
+        return None
+
+    def narrow_queryset(self, queryset):
+        """Restrict ``queryset`` to the columns / relations the selected fields read."""
+        only = {"pk"}
+        related = set()
+        prefetch = set()
+
+        for path in self.read_paths(self):
+            resolved = self.resolve(queryset.model, path)
+            if resolved is None:
+                continue
+            if resolved[0] == "prefetch":
+                prefetch.add(resolved[1])
+            else:
+                only.add(resolved[1])
+                if resolved[2]:
+                    related.add(resolved[2])
+
+        # Joins the view asked for but no selected field reads would clash with .only()
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset.only(*only)
+
+
+class SparseFieldsViewMixin:
+    """
+    GenericViewSet side of SparseFieldsMixin: actions in ``LIST_ACTIONS``
+    render the serializer's "list" profile, everything else the full one,
+    and GET querysets are narrowed to the selected fields.
+    """
+
+    LIST_ACTIONS = ("list",)
+
+    def get_field_profile(self):
+        return "list" if self.action in self.LIST_ACTIONS else None
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault("profile", self.get_field_profile())
+        return super().get_serializer(*args, **kwargs)
+
+    def sparse_queryset(self, queryset):
+        return self.get_serializer().narrow_queryset(queryset)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Writes keep full rows: save() on a deferred instance reloads per field
+        if self.request.method in SAFE_METHODS:
+            queryset = self.sparse_queryset(queryset)
+        return queryset
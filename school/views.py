@@ -0,0 +1,40 @@
+import re
+
+from django.http import FileResponse, HttpResponseNotModified
+from rest_framework.exceptions import NotFound
+from rest_framework.views import APIView
+
+from school.utils.qr_render import QRStore
+
+
+class QRImageView(APIView):
+    """
+    GET /qr/<sha256>.png
+
+    Serves a content-addressed QR image from QRStore. The name is the
+    hash of the bytes, so the response never changes: strong ETag,
+    one-year ``immutable`` caching, and 304 for revalidations. Caching is
+    ``private`` because profile QR codes carry personal details; the
+    default API authentication / permissions apply.
+    """
+
+    HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+    CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+    def get(self, request, digest):
+        if not self.HASH_PATTERN.match(digest):
+            raise NotFound("Unknown QR image.")
+
+        etag = f'"{digest}"'
+        if etag in [tag.strip() for tag in request.headers.get("If-None-Match", "").split(",")]:
+            response = HttpResponseNotModified()
+        else:
+            try:
+                response = FileResponse(QRStore.open(digest), content_type="image/png")
+            except FileNotFoundError:
+                raise NotFound("Unknown QR image.")
+            response["Content-Disposition"] = f'inline; filename="qr-{digest[:12]}.png"'
+
+        response["ETag"] = etag
+        response["Cache-Control"] = self.CACHE_CONTROL
+        return response
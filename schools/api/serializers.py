@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from schools.models import SchoolOrg
+from school.utils.sparse_fields import SparseFieldsMixin
 
 
 # serializers.py
@@ -21,8 +22,15 @@ class SchoolYearSerializer(serializers.ModelSerializer):
         ]
 
 
-class SchoolOrgSerializer(serializers.ModelSerializer):
-    """Serializer for SchoolOrg model."""
+class SchoolOrgSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Serializer for SchoolOrg model (``profile="list"`` = school cards)."""
+
+    FIELD_PROFILES = {
+        "list": ["id", "name", "slug", "address", "logo_url"],
+    }
+    FIELD_SOURCES = {
+        "logo_url": ("logo",),
+    }
 
     logo_url = serializers.SerializerMethodField()
 
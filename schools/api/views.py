@@ -2,15 +2,18 @@ from rest_framework import viewsets, status, filters
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
 from schools.models import SchoolOrg, SchoolYear
 from schools.api.serializers import SchoolOrgSerializer, SchoolYearSerializer
 from django.db import models
 from student.models import Student
 from student.api.serializers import StudentSerializer
 from django.shortcuts import get_object_or_404
+from school.utils.sparse_fields import SparseFieldsViewMixin
+from school.utils.search import TrigramSearch, TrigramSearchFilter
+from school.utils.pagination import KeysetPagination
 
-class SchoolYearPagination(PageNumberPagination):
+class SchoolYearPagination(KeysetPagination):
+    ordering = ("-start_date", "pk")
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 50
@@ -20,7 +23,7 @@ class SchoolYearViewSet(viewsets.ModelViewSet):
     serializer_class = SchoolYearSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = SchoolYearPagination
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [TrigramSearchFilter]
     search_fields = ['name', 'school__name']
 
     # ✅ DELETE /api/academic-years/{pk}/remove/
@@ -64,10 +67,10 @@ class SchoolYearViewSet(viewsets.ModelViewSet):
 
         queryset = SchoolYear.objects.filter(school=school).order_by('-start_date')
 
-        # 🔍 Optional search
+        # 🔍 Optional search (ranked)
         search = request.query_params.get('search')
         if search:
-            queryset = queryset.filter(name__icontains=search)
+            queryset = TrigramSearch.rank(queryset, search, ['name'], order=('-start_date', 'pk'))
 
         # 🔢 Paginate
         page = self.paginate_queryset(queryset)
@@ -109,16 +112,18 @@ class SchoolYearViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class SchoolOrgPagination(PageNumberPagination):
+class SchoolOrgPagination(KeysetPagination):
+    ordering = ("-created_at", "pk")
     page_size = 6  # 👈 cards per page
     page_size_query_param = "page_size"
     max_page_size = 50
 
 
-class SchoolOrgViewSet(viewsets.ModelViewSet):
+class SchoolOrgViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing schools/organizations.
     Supports list, retrieve, create, update, delete.
+    List renders the "list" profile; ?fields= / ?omit= trim any GET.
     """
     queryset = SchoolOrg.objects.all().order_by("-created_at")
     serializer_class = SchoolOrgSerializer
@@ -142,7 +147,7 @@ class SchoolOrgViewSet(viewsets.ModelViewSet):
         """
         GET /api/schools/by-slug/{slug}/
         """
-        school = get_object_or_404(SchoolOrg, slug=slug)
+        school = get_object_or_404(self.get_queryset(), slug=slug)
         serializer = self.get_serializer(school)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -1,6 +1,6 @@
-// Load and render schools
-function loadSchools(page = 1, search = "") {
-    fetchWithRefresh(`/api/schools/?page=${page}&search=${encodeURIComponent(search)}`, {
+// Load and render schools (url = a cursor link from the previous response)
+function loadSchools(url = null, search = "") {
+    fetchWithRefresh(url || `/api/schools/?search=${encodeURIComponent(search)}`, {
         type: "GET",
         contentType: "application/json"
     }).done(function(response) {
@@ -71,6 +71,7 @@ function loadSchools(page = 1, search = "") {
                              title="Metrics"
                              data-bs-toggle="modal"
                              data-bs-target="#attendanceDashboardModal"
+                             data-school-id="${school.id}"
                              data-school="${school.name}"
                              data-year="2024–2025">
                             <i class="fas fa-chart-bar"></i>
@@ -108,39 +109,33 @@ function loadSchools(page = 1, search = "") {
         });
 
         // Render pagination
-        renderPagination(response.count, page, search);
+        renderPagination(response);
     }).fail(function(xhr) {
         console.error("Error loading schools:", xhr.responseText);
         error_message("Failed to load schools.");
     });
 }
 
-// Pagination renderer
-function renderPagination(total, currentPage, search) {
-    let pageSize = 6; // same as backend
-    let totalPages = Math.ceil(total / pageSize);
-
+// Pagination renderer (cursor: Prev / Next)
+function renderPagination(response) {
     let $pagination = $("#schoolsPagination");
     $pagination.empty();
 
-    if (totalPages <= 1) return;
+    if (!response.previous && !response.next) return;
 
-    for (let i = 1; i <= totalPages; i++) {
-        let activeClass = i === currentPage ? "active" : "";
-        $pagination.append(`
-            <li class="page-item ${activeClass}">
-                <a class="page-link" href="#" data-page="${i}" data-search="${search}">${i}</a>
-            </li>
-        `);
-    }
+    $pagination.append(`
+        <li class="page-item ${response.previous ? "" : "disabled"}">
+            <a class="page-link" href="#" data-url="${response.previous || ""}">‹ Prev</a>
+        </li>
+        <li class="page-item ${response.next ? "" : "disabled"}">
+            <a class="page-link" href="#" data-url="${response.next || ""}">Next ›</a>
+        </li>
+    `);
 
-    // Pagination click
+    // Pagination click (the cursor links keep the search term)
     $pagination.find("a").on("click", function(e) {
         e.preventDefault();
-        let page = parseInt($(this).data("page"));
-        let search = $(this).data("search");
-        loadSchools(page, search);
+        let url = $(this).data("url");
+        if (url) loadSchools(url);
     });
 }
-
-
@@ -1,6 +1,7 @@
 
 from django.contrib import admin
 from .models import Student, FlightMembership
+from .utils.factory import StudentFactory
 
 
 @admin.register(Student)
@@ -20,6 +21,20 @@ class StudentAdmin(admin.ModelAdmin):
         return obj.user.get_full_name() or obj.user.username
     full_name.short_description = "Student Name"
 
+    def save_model(self, request, obj, form, change):
+        # New students: snapshot the profile before the INSERT (see StudentFactory)
+        if not change:
+            if not obj.student_id:
+                obj.student_id = StudentFactory.new_student_ids(1)[0]
+            StudentFactory.snapshot(obj, obj.user, StudentFactory.profile_of(obj.user))
+        super().save_model(request, obj, form, change)
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Nothing picked in the form → the profile's designations, in one insert
+        if not change and not form.cleaned_data.get("designations"):
+            StudentFactory.link_designations([form.instance])
+
 
 @admin.register(FlightMembership)
 class FlightMembershipAdmin(admin.ModelAdmin):
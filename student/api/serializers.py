@@ -3,9 +3,34 @@ from django.contrib.auth.models import User
 from student.models import Student
 from schools.models import SchoolOrg
 from users.models import Designation, Classification
-
-class StudentSerializer(serializers.ModelSerializer):
-    """Serializer for Student model (Edit + View compatible)."""
+from school.utils.sparse_fields import SparseFieldsMixin
+from student.utils.factory import StudentFactory
+
+class StudentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Serializer for Student model (Edit + View compatible).
+
+    ``profile="list"`` is the roster table; ``?fields=`` / ``?omit=`` trim
+    further (see SparseFieldsMixin).
+    """
+
+    FIELD_PROFILES = {
+        "list": [
+            "id", "student_id", "full_name", "status",
+            "enrollment_status", "is_active", "enrolled_at",
+            "gender", "contact_number",
+            "profile_image", "qr_image", "qr_pending",
+        ],
+    }
+
+    # Columns read by the method / property fields
+    FIELD_SOURCES = {
+        "full_name": ("rank", "first_name", "middle_name", "last_name", "display_name_format"),
+        "profile_image": ("profile_picture", "default_avatar", "user"),
+        "qr_image": ("qr_hash",),
+        "qr_pending": ("qr_hash",),
+        "status": ("is_active", "enrollment_status"),
+    }
 
     # -------------------------------------------------
     # 🔹 Computed / Display fields
@@ -14,6 +39,7 @@ class StudentSerializer(serializers.ModelSerializer):
     school_name = serializers.CharField(source="school.name", read_only=True)
     profile_image = serializers.SerializerMethodField(read_only=True)
     qr_image = serializers.SerializerMethodField(read_only=True)
+    qr_pending = serializers.BooleanField(read_only=True)
     status = serializers.SerializerMethodField(read_only=True)
 
     # -------------------------------------------------
@@ -69,6 +95,7 @@ class StudentSerializer(serializers.ModelSerializer):
             # 🔹 Visual / Display
             "profile_image",
             "qr_image",
+            "qr_pending",
             "full_name",
 
             # 🔹 Audit
@@ -79,6 +106,7 @@ class StudentSerializer(serializers.ModelSerializer):
         read_only_fields = [
             "student_id",
             "qr_image",
+            "qr_pending",
             "joined_date",
             "last_updated",
             "enrolled_at",
@@ -89,6 +117,19 @@ class StudentSerializer(serializers.ModelSerializer):
             "status",
         ]
 
+    # -------------------------------------------------
+    # 🔹 Create (snapshot before the INSERT)
+    # -------------------------------------------------
+
+    def create(self, validated_data):
+        user = validated_data.pop("user", None)  # passed via serializer.save(user=...)
+        if user is None:
+            raise serializers.ValidationError({"user": ["This field is required."]})
+
+        designations = validated_data.pop("designations", None)
+        school = validated_data.pop("school")
+        return StudentFactory.create(user, school, designations=designations, **validated_data)
+
     # -------------------------------------------------
     # 🔹 Derived fields
     # -------------------------------------------------
@@ -100,9 +141,8 @@ class StudentSerializer(serializers.ModelSerializer):
         return obj.get_profile_picture_url()
 
     def get_qr_image(self, obj):
-        if obj.qr_code:
-            return f"data:image/png;base64,{obj.qr_code}"
-        return None
+        """URL of the cacheable QR image (None while the QR is pending)."""
+        return obj.qr_url
 
     def get_status(self, obj):
         if not obj.is_active:
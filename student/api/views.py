@@ -1,30 +1,38 @@
-from rest_framework import viewsets, status, filters
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.contrib.auth.models import User
 from django.db import transaction
-from student.models import Student
+from student.models import Student, FlightMembership
 from student.api.serializers import StudentSerializer
-from schools.models import SchoolOrg
-from rest_framework.pagination import PageNumberPagination
+from student.utils.enrollment import BulkEnrollment, EnrolledUsers
+from users.models import UserProfile
+from schools.models import SchoolOrg, Flight
+from school.utils.export import StreamingExport
+from school.utils.sparse_fields import SparseFieldsViewMixin
+from school.utils.search import TrigramSearch, TrigramSearchFilter
+from school.utils.pagination import KeysetPagination
 from rest_framework.exceptions import NotFound
 from django.shortcuts import get_object_or_404
 from django.db import transaction, models
-import uuid
 
 
-class StudentPagination(PageNumberPagination):
+class StudentPagination(KeysetPagination):
+    ordering = ("user__last_name", "pk")
     page_size = 5
     page_size_query_param = 'page_size'
     max_page_size = 50
 
 
-class StudentViewSet(viewsets.ModelViewSet):
-    queryset = Student.objects.select_related('user', 'school').all()
+class StudentViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
+    # qr_code is the legacy base64 column — images are served from /qr/<hash>.png
+    queryset = Student.objects.select_related('user', 'school').defer('qr_code')
     serializer_class = StudentSerializer
+    LIST_ACTIONS = ("list", "students_by_school")
     pagination_class = StudentPagination
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['user__first_name', 'user__last_name', 'user__username', 'student_id']
+    filter_backends = [TrigramSearchFilter]
+    # Snapshot columns on the student row: trigram-indexed, no join to auth_user
+    search_fields = ['first_name', 'last_name', 'student_id']
 
     @action(
         detail=False,
@@ -44,20 +52,18 @@ class StudentViewSet(viewsets.ModelViewSet):
         except SchoolOrg.DoesNotExist:
             raise NotFound("School not found.")
 
-        queryset = (
+        # Only the columns the roster profile (or ?fields=) renders
+        queryset = self.sparse_queryset(
             Student.objects
             .filter(school=school)
-            .select_related("user")
-            .order_by("user__last_name")
+            .order_by("user__last_name", "pk")
         )
 
-        # 🔍 Search
+        # 🔍 Search (ranked; roster order breaks ties)
         search = request.query_params.get("search")
         if search:
-            queryset = queryset.filter(
-                models.Q(user__first_name__icontains=search)
-                | models.Q(user__last_name__icontains=search)
-                | models.Q(student_id__icontains=search)
+            queryset = TrigramSearch.rank(
+                queryset, search, self.search_fields, order=("user__last_name", "pk")
             )
 
         page = self.paginate_queryset(queryset)
@@ -69,11 +75,58 @@ class StudentViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     # ------------------------------------------------------------
-    # 🔹 Bulk Add Students (unchanged)
+    # 🔹 Typeahead
+    # ------------------------------------------------------------
+    @action(detail=False, methods=["get"], url_path="typeahead")
+    def typeahead(self, request):
+        """
+        GET /api/students/typeahead/?q=<term>&school=<id>&limit=<n>
+        Top ranked students by name / student ID (at most 25, default 10).
+        Terms shorter than 2 characters return no results.
+        """
+        queryset = Student.objects.only(
+            "id", "student_id", "school_id", "rank", "first_name",
+            "middle_name", "last_name", "display_name_format",
+        )
+
+        school_id = request.query_params.get("school")
+        if school_id:
+            if not school_id.isdigit():
+                return Response({"error": "Invalid school ID."}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(school_id=school_id)
+
+        students = TrigramSearch.typeahead(
+            queryset,
+            request.query_params.get("q"),
+            self.search_fields,
+            limit=request.query_params.get("limit"),
+            order=("last_name", "pk"),
+        )
+        return Response({
+            "results": [
+                {
+                    "id": s.id,
+                    "student_id": s.student_id,
+                    "full_name": str(s),
+                    "school_id": s.school_id,
+                }
+                for s in students
+            ]
+        })
+
+    # ------------------------------------------------------------
+    # 🔹 Bulk Add Students
     # ------------------------------------------------------------
     @action(detail=False, methods=['post'], url_path='add-bulk')
-    @transaction.atomic
     def add_bulk(self, request):
+        """
+        POST /api/students/add-bulk/
+        { "school_id": 3, "user_ids": [15, 16, 17] }
+
+        Enrolls the users in a fixed number of queries (see BulkEnrollment).
+        QR codes are rendered in the background, so created students come
+        back with qr_pending true and qr_image null until that finishes.
+        """
         school_id = request.data.get('school_id')
         user_ids = request.data.get('user_ids', [])
 
@@ -85,28 +138,14 @@ class StudentViewSet(viewsets.ModelViewSet):
         except SchoolOrg.DoesNotExist:
             return Response({"detail": "Invalid school_id"}, status=status.HTTP_404_NOT_FOUND)
 
-        created_students = []
-        skipped_users = []
-
-        for user_id in user_ids:
-            try:
-                user = User.objects.get(pk=user_id)
-                if Student.objects.filter(user=user, school=school).exists():
-                    skipped_users.append(user.username)
-                    continue
-
-                student_id = f"STD-{uuid.uuid4().hex[:8].upper()}"
-                student = Student.objects.create(user=user, school=school, student_id=student_id)
-                student.generate_qr_code()
-                student.save()
-                created_students.append(student)
-            except User.DoesNotExist:
-                skipped_users.append(f"UnknownID:{user_id}")
+        enrollment = BulkEnrollment(school, user_ids)
+        created_students = enrollment.run()
+        models.prefetch_related_objects(created_students, "designations")
 
         serializer = self.get_serializer(created_students, many=True)
         return Response({
             "created_count": len(created_students),
-            "skipped": skipped_users,
+            "skipped": enrollment.skipped,
             "created_students": serializer.data
         }, status=status.HTTP_201_CREATED)
 
@@ -173,72 +212,42 @@ class StudentViewSet(viewsets.ModelViewSet):
         """
         GET /api/students/schools/{id}/available/
         Returns users NOT yet enrolled in this school.
-        Uses UserProfile.__str__() for display name.
+
+        Enrolled users are excluded with the cached per-school set or a
+        NOT EXISTS anti-join (see EnrolledUsers), and the display name
+        (UserProfile.__str__) is computed in SQL, so a page is one query
+        over plain values.
         """
 
         if not school_id:
             raise NotFound("School ID is required.")
 
         try:
-            school = SchoolOrg.objects.get(pk=school_id)
-        except SchoolOrg.DoesNotExist:
+            school = SchoolOrg.objects.only("pk").get(pk=school_id)
+        except (SchoolOrg.DoesNotExist, ValueError):
             raise NotFound("School not found.")
 
-        # 🔹 IDs of users already enrolled in this school
-        enrolled_user_ids = Student.objects.filter(
-            school=school
-        ).values_list("user_id", flat=True)
-
         # 🔹 Users NOT yet students of this school
-        queryset = (
-            User.objects
-            .exclude(id__in=enrolled_user_ids)
-            .select_related("userprofile")
-            .order_by("last_name", "first_name")
-        )
+        queryset = EnrolledUsers.exclude(User.objects.all(), school.pk)
 
-        # 🔍 Optional search
+        # 🔍 Optional search (ranked)
+        order = ("last_name", "first_name", "pk")
         search = request.query_params.get("search")
         if search:
-            queryset = queryset.filter(
-                models.Q(first_name__icontains=search)
-                | models.Q(last_name__icontains=search)
-                | models.Q(username__icontains=search)
-            )
+            queryset = TrigramSearch.rank(queryset, search, TrigramSearch.INDEXES["auth.User"], order=order)
+        else:
+            queryset = queryset.order_by(*order)
+
+        queryset = queryset.annotate(
+            full_name=UserProfile.display_name_sql(user="", profile="userprofile__"),
+        ).values("id", "full_name", "username", "email")
 
         # 🔢 Pagination
         page = self.paginate_queryset(queryset)
         if page is not None:
-            data = [
-                {
-                    "id": u.id,
-                    "full_name": (
-                        str(u.userprofile)
-                        if hasattr(u, "userprofile")
-                        else (f"{u.first_name} {u.last_name}".strip() or u.username)
-                    ),
-                    "username": u.username,
-                    "email": u.email,
-                }
-                for u in page
-            ]
-            return self.get_paginated_response(data)
+            return self.get_paginated_response(page)
 
-        data = [
-            {
-                "id": u.id,
-                "full_name": (
-                    str(u.userprofile)
-                    if hasattr(u, "userprofile")
-                    else (f"{u.first_name} {u.last_name}".strip() or u.username)
-                ),
-                "username": u.username,
-                "email": u.email,
-            }
-            for u in queryset
-        ]
-
-        return Response(data)
+        return Response(list(queryset))
 
         # ------------------------------------------------------------
         # 🔹 Get Student Profile by ID
@@ -255,8 +264,7 @@ class StudentViewSet(viewsets.ModelViewSet):
         """
 
         student = get_object_or_404(
-            Student.objects.select_related("user", "school")
-            .prefetch_related("designations"),
+            self.sparse_queryset(Student.objects.all()),
             pk=student_id
         )
 
@@ -300,4 +308,68 @@ class StudentViewSet(viewsets.ModelViewSet):
                 "student": serializer.data
             },
             status=status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
+
+    # ------------------------------------------------------------
+    # 🔹 Roster Export (streamed)
+    # ------------------------------------------------------------
+    ROSTER_EXPORT_COLUMNS = [
+        ("Student ID", "student_id"),
+        ("Rank", "rank"),
+        ("Last Name", "last_name"),
+        ("First Name", "first_name"),
+        ("Middle Name", "middle_name"),
+        ("Ext.", "extension_name"),
+        ("Gender", "gender"),
+        ("Email", "email"),
+        ("Contact Number", "contact_number"),
+        ("Flight", "current_flight"),
+        ("Enrollment Status", "enrollment_status"),
+        ("Active", "is_active"),
+    ]
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export_roster(self, request):
+        """
+        GET /api/students/export/?school=3&format=csv|xlsx
+        GET /api/students/export/?flight=9&format=xlsx
+
+        Streams a school or flight roster. Rows come from a values_list
+        iterator in chunks; the current flight is resolved in SQL.
+        """
+        file_format = request.query_params.get("format", "csv").lower()
+        if file_format not in StreamingExport.FORMATS:
+            return Response({"error": "format must be csv or xlsx."}, status=status.HTTP_400_BAD_REQUEST)
+
+        school_id = request.query_params.get("school")
+        flight_id = request.query_params.get("flight")
+
+        if flight_id:
+            flight = get_object_or_404(Flight, pk=flight_id)
+            queryset = Student.objects.filter(flights__flight=flight)
+            filename = f"flight-{flight.pk}-roster"
+        elif school_id:
+            school = get_object_or_404(SchoolOrg, pk=school_id)
+            queryset = Student.objects.filter(school=school)
+            filename = f"school-{school.pk}-roster"
+        else:
+            return Response({"error": "school or flight is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Latest membership wins → current flight
+        current_flight = (
+            FlightMembership.objects
+            .filter(student=models.OuterRef("pk"))
+            .order_by("-joined_at")
+            .values("flight__name")[:1]
+        )
+
+        rows = (
+            queryset
+            .annotate(current_flight=models.Subquery(current_flight))
+            .order_by("last_name", "first_name", "pk")
+            .values_list(*[field for _, field in self.ROSTER_EXPORT_COLUMNS])
+            .iterator(chunk_size=StreamingExport.CHUNK_SIZE)
+        )
+        header = [title for title, _ in self.ROSTER_EXPORT_COLUMNS]
+
+        return StreamingExport.response(file_format, filename, header, rows, sheet_title="Roster")
@@ -1,116 +1,138 @@
 import os
 import json
-import pandas as pd
-from openpyxl.utils import column_index_from_string
 from django.core.management.base import BaseCommand, CommandError
-from django.contrib.auth.models import User
 from django.conf import settings
 from schools.models import SchoolOrg  # adjust if needed
-from student.models import Student   # adjust if needed
+from student.utils.roster_import import StudentRosterImport
 
 
 class Command(BaseCommand):
-    help = "🎓 Import and link students to schools from Excel using dynamic JSON settings"
+    help = (
+        "🎓 Import and link students to a school from Excel using dynamic JSON settings. "
+        "Non-interactive; names are matched in memory and students written in bulk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--school", required=True, help="School name (matched case-insensitively; created if missing).")
+        parser.add_argument(
+            "--config",
+            default=os.path.join(settings.BASE_DIR, 'student', 'static', 'data', 'student_import_settings.json'),
+            help="JSON settings (filepath, sheetname, mapping).",
+        )
+        parser.add_argument("--file", help="Excel file (overrides 'filepath'; relative paths resolve under users/static/).")
+        parser.add_argument("--sheet", help="Sheet name (overrides 'sheetname').")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing.")
+        parser.add_argument(
+            "--chunk-size", type=int, default=StudentRosterImport.CHUNK_SIZE,
+            help=f"Rows per bulk write / transaction (default: {StudentRosterImport.CHUNK_SIZE}).",
+        )
 
     def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        verbosity = options["verbosity"]
+
         # ============================================================
-        # 1️⃣ Ask for JSON settings file path (or default)
+        # 1️⃣ JSON settings
         # ============================================================
-        default_path = os.path.join(settings.BASE_DIR, 'student', 'static', 'data', 'student_import_settings.json')
-        self.stdout.write(self.style.NOTICE(f"Default settings: {default_path}"))
-        user_input = input("Enter path to JSON settings (or press Enter for default): ").strip()
-        config_path = user_input or default_path
-
+        config_path = options["config"]
         if not os.path.exists(config_path):
             raise CommandError(f"⚠️ JSON settings not found: {config_path}")
 
         with open(config_path, 'r', encoding='utf-8') as f:
             config = json.load(f)
 
-        filepath = config.get('filepath')
-        sheetname = config.get('sheetname', 'Sheet1')
+        filepath = options["file"] or config.get('filepath')
+        sheetname = options["sheet"] or config.get('sheetname', 'Sheet1')
         col_map = config.get('mapping', {})
 
         if not filepath:
             raise CommandError("⚠️ Missing 'filepath' in settings.")
         if not col_map:
             raise CommandError("⚠️ 'mapping' section is empty.")
+        if options["chunk_size"] < 1:
+            raise CommandError("❌ --chunk-size must be at least 1.")
 
         # ============================================================
-        # 2️⃣ Ask for school name (interactive)
+        # 2️⃣ School
         # ============================================================
-        school_name = input("\n🏫 Enter the school name to assign students to: ").strip()
+        school_name = options["school"].strip()
         if not school_name:
             raise CommandError("❌ School name cannot be empty.")
 
-        school, created_school = SchoolOrg.objects.get_or_create(
-            name__iexact=school_name,
-            defaults={'name': school_name}
-        )
-        if created_school:
-            self.stdout.write(self.style.SUCCESS(f"✅ Created new SchoolOrg: {school_name}"))
+        school = SchoolOrg.objects.filter(name__iexact=school_name).first()
+        if school:
+            self.stdout.write(self.style.NOTICE(f"📘 Using existing SchoolOrg: {school.name}"))
+        elif dry_run:
+            # Unsaved: nobody can be linked or moved to it yet, everyone matched is "new"
+            school = SchoolOrg(name=school_name)
+            self.stdout.write(self.style.NOTICE(f"🧪 Would create SchoolOrg: {school_name}"))
         else:
-            self.stdout.write(self.style.NOTICE(f"📘 Using existing SchoolOrg: {school_name}"))
+            school = SchoolOrg.objects.create(name=school_name)
+            self.stdout.write(self.style.SUCCESS(f"✅ Created new SchoolOrg: {school_name}"))
 
         # ============================================================
-        # 3️⃣ Load Excel
+        # 3️⃣ Load Excel (only the two name columns)
         # ============================================================
         excel_path = os.path.join(settings.BASE_DIR, 'users', 'static', filepath)
         if not os.path.exists(excel_path):
             raise CommandError(f"❌ Excel file not found: {excel_path}")
 
-        df = pd.read_excel(excel_path, sheet_name=sheetname, header=None)
-        self.stdout.write(self.style.NOTICE(f"📂 Loaded {len(df)} rows from '{sheetname}'."))
-
-        added, skipped, updated = 0, 0, 0
+        importer = StudentRosterImport(school, chunk_size=options["chunk_size"])
+        names = importer.read_names(
+            excel_path,
+            sheetname,
+            first_name_column=col_map.get('first_name', 'E'),
+            last_name_column=col_map.get('last_name', 'D'),
+        )
+        self.stdout.write(self.style.NOTICE(f"📂 Loaded {len(names)} rows from '{sheetname}'."))
 
         # ============================================================
-        # 4️⃣ Iterate and add students
+        # 4️⃣ Match, then write in bulk
         # ============================================================
-        for idx, row in df.iterrows():
-            try:
-                first_name = str(row.iloc[column_index_from_string(col_map.get('first_name', 'E')) - 1]).strip()
-                last_name = str(row.iloc[column_index_from_string(col_map.get('last_name', 'D')) - 1]).strip()
-
-                if not first_name or not last_name:
-                    continue
-
-                # Match existing user
-                user = User.objects.filter(first_name__iexact=first_name, last_name__iexact=last_name).first()
-
-                if not user:
-                    self.stdout.write(self.style.WARNING(f"⚠️ Row {idx+1}: No matching User for {first_name} {last_name}"))
-                    skipped += 1
-                    continue
-
-                # Add or update Student record
-                student, created = Student.objects.get_or_create(
-                    user=user,
-                    defaults={
-                        "school": school,
-                        "student_id": f"{school.id}-{user.id:05d}",
-                    }
-                )
-
-                if created:
-                    self.stdout.write(self.style.SUCCESS(f"🆕 Added {first_name} {last_name} → {school.name}"))
-                    added += 1
-                elif student.school_id != school.id:
-                    student.school = school
-                    student.save(update_fields=['school'])
-                    self.stdout.write(self.style.SUCCESS(f"🔄 Updated {first_name} {last_name} → {school.name}"))
-                    updated += 1
-                else:
-                    self.stdout.write(self.style.WARNING(f"⏩ Already linked: {first_name} {last_name}"))
-                    skipped += 1
-
-            except Exception as e:
-                self.stdout.write(self.style.WARNING(f"⚠️ Row {idx+1}: Error — {e}"))
-                skipped += 1
+        rows = importer.plan(names)
+        if verbosity >= 2:
+            self.report_rows(rows, school)
+
+        report = importer.summary()
+        ambiguous = report["ambiguous"]
+        if ambiguous:
+            self.stdout.write(self.style.WARNING(
+                f"⚠️ {ambiguous} row(s) match several users with the same name; the oldest user was used "
+                f"(-v 2 lists them)."
+            ))
+
+        if dry_run:
+            self.stdout.write(self.style.SUCCESS(
+                f"🧪 Dry run — would add {report['new']}, update {report['moved']}; "
+                f"{report['linked']} already linked, {report['unmatched']} unmatched, "
+                f"{report['duplicate']} duplicate, {report['blank']} blank."
+            ))
+            return
+
+        added = importer.create_new()
+        updated = importer.move_existing()
 
         # ============================================================
         # ✅ Summary
         # ============================================================
+        skipped = report["linked"] + report["unmatched"] + report["duplicate"]
         self.stdout.write(self.style.SUCCESS(
-            f"🎯 Done — {added} added, {updated} updated, {skipped} skipped."
+            f"🎯 Done — {added} added, {updated} updated, {skipped} skipped "
+            f"({report['linked']} already linked, {report['unmatched']} unmatched, {report['duplicate']} duplicate)."
         ))
+
+    def report_rows(self, rows, school):
+        """One line per row (verbosity 2+)."""
+        for row in rows.itertuples(index=False):
+            name = f"{row.first_name} {row.last_name}"
+            suffix = " (several users share this name)" if row.ambiguous else ""
+            if row.status == "new":
+                self.stdout.write(self.style.SUCCESS(f"🆕 Row {row.row}: {name} → {school.name}{suffix}"))
+            elif row.status == "moved":
+                self.stdout.write(self.style.SUCCESS(f"🔄 Row {row.row}: {name} → {school.name}{suffix}"))
+            elif row.status == "linked":
+                self.stdout.write(self.style.WARNING(f"⏩ Row {row.row}: Already linked: {name}"))
+            elif row.status == "unmatched":
+                self.stdout.write(self.style.WARNING(f"⚠️ Row {row.row}: No matching User for {name}"))
+            elif row.status == "duplicate":
+                self.stdout.write(self.style.WARNING(f"⚠️ Row {row.row}: {name} appears earlier in the sheet"))
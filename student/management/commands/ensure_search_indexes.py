@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from school.utils.search import TrigramSearch
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the pg_trgm extension and the trigram indexes behind search / typeahead "
+        "(also run after every migrate). Builds CONCURRENTLY unless --blocking is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default", help="Database alias (default: default).")
+        parser.add_argument("--blocking", action="store_true",
+                            help="Plain CREATE INDEX (faster, but blocks writes while it builds).")
+        parser.add_argument("--list", action="store_true", help="Only print the index statements.")
+
+    def handle(self, *args, **options):
+        if not TrigramSearch.supported(options["database"]):
+            raise CommandError("Trigram search indexes require PostgreSQL.")
+
+        if options["list"]:
+            for name, sql in TrigramSearch.index_statements(concurrently=not options["blocking"]):
+                self.stdout.write(f"{name}: {sql}")
+            return
+
+        self.stdout.write(self.style.NOTICE("Ensuring pg_trgm search indexes…"))
+        try:
+            created = TrigramSearch.ensure_indexes(using=options["database"], concurrently=not options["blocking"])
+        except DatabaseError as e:
+            raise CommandError(f"Could not create the search indexes: {e}")
+        for name in created:
+            self.stdout.write(f"  created {name}")
+        self.stdout.write(self.style.SUCCESS(f"Done — {len(created)} index(es) created."))
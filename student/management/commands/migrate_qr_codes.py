@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from school.utils.qr_render import QRRenderQueue, QRStore
+
+
+class Command(BaseCommand):
+    help = "Move legacy base64 QR codes (qr_code) into the content-addressed QR store, in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kind",
+            action="append",
+            choices=list(QRRenderQueue.KINDS),
+            help="Which QR codes to migrate (repeatable; default: all kinds).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=500, help="Rows per chunk / transaction (default: 500).")
+
+    def handle(self, *args, **options):
+        kinds = options["kind"] or list(QRRenderQueue.KINDS)
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+
+        for kind in kinds:
+            model = QRRenderQueue.model(kind)
+            remaining = model.objects.filter(qr_code__gt="").count()
+            self.stdout.write(self.style.NOTICE(f"{kind}: {remaining} legacy QR code(s) to migrate…"))
+
+            moved = invalid = 0
+            for chunk_moved, chunk_invalid in QRStore.backfill(model, chunk_size=options["chunk_size"]):
+                moved += chunk_moved
+                invalid += chunk_invalid
+                self.stdout.write(f"  {moved + invalid}/{remaining}")
+
+            self.stdout.write(self.style.SUCCESS(f"{kind}: {moved} QR code(s) moved to the store."))
+            if invalid:
+                # Cleared rows are pending again; the render queue / sweep redraws them
+                self.stdout.write(self.style.WARNING(
+                    f"{kind}: {invalid} unreadable QR code(s) cleared — run render_qr_codes to redraw them."
+                ))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from school.utils.qr_render import QRRenderQueue
+
+
+class Command(BaseCommand):
+    help = "Render pending Student / UserProfile QR codes now, over a process pool (or re-render all of them)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kind",
+            action="append",
+            choices=list(QRRenderQueue.KINDS),
+            help="Which QR codes to render (repeatable; default: all kinds).",
+        )
+        parser.add_argument("--all", action="store_true", help="Re-render every QR, not only pending ones (e.g. after a logo change).")
+        parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count).")
+
+    def handle(self, *args, **options):
+        kinds = options["kind"] or list(QRRenderQueue.KINDS)
+        if options["workers"] is not None and options["workers"] < 1:
+            raise CommandError("--workers must be at least 1.")
+
+        for kind in kinds:
+            model = QRRenderQueue.model(kind)
+
+            if options["all"]:
+                reset = model.objects.update(qr_hash=None)
+                self.stdout.write(self.style.NOTICE(f"{kind}: {reset} QR code(s) marked pending."))
+
+            pending = QRRenderQueue.pending(kind).count()
+            self.stdout.write(self.style.NOTICE(f"{kind}: rendering {pending} pending QR code(s)…"))
+
+            started = time.perf_counter()
+            written = QRRenderQueue.process(kind, workers=options["workers"])
+            elapsed = time.perf_counter() - started
+
+            rate = f" ({written / elapsed:.0f}/s)" if elapsed and written else ""
+            self.stdout.write(self.style.SUCCESS(f"{kind}: {written} QR code(s) rendered in {elapsed:.1f}s{rate}."))
@@ -3,17 +3,15 @@ from django.contrib.auth.models import User
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
-from PIL import Image
-from django.conf import settings
-import qrcode
-import io, base64, random
-import os
 
 from schools.models import SchoolOrg, Flight
+from school.utils.avatars import DefaultAvatar
+from school.utils.field_tracking import TrackedFieldsMixin
+from school.utils.qr_render import QRRenderer, QRRenderQueue, QRStore
 from users.models import Designation, Classification  # ✅ Adjust import paths to your project structure
 
 
-class Student(models.Model):
+class Student(TrackedFieldsMixin, models.Model):
     """A student enrolled under a school organization."""
     GENDER_CHOICES = [
         ('M', 'Male'),
@@ -39,13 +37,20 @@ class Student(models.Model):
         ('dropped', 'Dropped'),
     ]
 
+    # Snapshotted on load so save() can detect status changes without a query
+    # (school_id: a move must invalidate the old school's EnrolledUsers set)
+    TRACKED_FIELDS = ("enrollment_status", "enrolled_at", "school_id")
+
     # 🔹 Core Relations
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="student_profile")
     school = models.ForeignKey(SchoolOrg, on_delete=models.CASCADE, related_name="students")
 
     # 🔹 Identification
     student_id = models.CharField(max_length=50, unique=True)
+    # Legacy base64 PNG; emptied by `manage.py migrate_qr_codes` (images now live in QRStore)
     qr_code = models.TextField(blank=True, null=True)
+    # SHA-256 of the QR PNG in QRStore; NULL = QR pending (see QRRenderQueue)
+    qr_hash = models.CharField(max_length=64, blank=True, null=True, editable=False)
 
     # 🔹 Personal Info
     # 🔹 Legal / Recorded Identity (fixed at enrollment)
@@ -109,103 +114,60 @@ class Student(models.Model):
         help_text="Controls whether the student is active in the system."
     )
 
+    class Meta:
+        indexes = [
+            # Roster lookups by school, and the NOT EXISTS probe of the
+            # "available users" anti-join (index-only on (school, user))
+            models.Index(fields=["school", "user"], name="student_school_user_idx"),
+        ]
+
     # -------------------------------
     # Utility Methods
     # -------------------------------
 
+    def qr_payload(self):
+        return f"SCHOOL-{self.school_id}-STUDENT-{self.student_id}"
+
+    @property
+    def qr_pending(self):
+        """QR is rendered in the background (see QRRenderQueue); no hash until then."""
+        return not self.qr_hash
+
+    @property
+    def qr_url(self):
+        return QRStore.url(self.qr_hash)
+
     def generate_qr_code(self, force=False):
         """Generate or refresh QR code as Base64 PNG string with AFRC logo in center."""
-        if self.qr_code and not force:
+        if self.qr_hash and not force:
             return
-
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_H,  # REQUIRED for logo
-            box_size=8,
-            border=4,
-        )
-
-        qr.add_data(f"SCHOOL-{self.school_id}-STUDENT-{self.student_id}")
-        qr.make(fit=True)
-
-        qr_img = qr.make_image(fill_color="black", back_color="white").convert("RGBA")
-
-        # 🔹 Load AFRC logo
-        logo_path = os.path.join(
-            settings.BASE_DIR,
-            "authentication",
-            "static",
-            "img",
-            "afrc_brand.png"
-        )
-
-        if os.path.exists(logo_path):
-            logo = Image.open(logo_path).convert("RGBA")
-
-            # 🔹 Resize logo (max 25% of QR)
-            qr_width, qr_height = qr_img.size
-            logo_size = int(qr_width * 0.25)
-            logo.thumbnail((logo_size, logo_size), Image.LANCZOS)
-
-            # 🔹 Center logo
-            pos = (
-                (qr_width - logo.width) // 2,
-                (qr_height - logo.height) // 2,
-            )
-
-            qr_img.paste(logo, pos, logo)
-
-        # 🔹 Convert to Base64 PNG
-        buffer = io.BytesIO()
-        qr_img.save(buffer, format="PNG")
-        self.qr_code = base64.b64encode(buffer.getvalue()).decode("utf-8")
-        buffer.close()
+        self.qr_hash = QRStore.save(QRRenderer.student(self.qr_payload()))
+        self.qr_code = None
 
     def get_profile_picture_url(self):
-        """Returns student's profile or default avatar URL."""
-        if self.profile_picture:
-            return self.profile_picture.url
-        if self.default_avatar:
-            return f"/static/img/users/avatars/{self.default_avatar}"
-
-        avatar_images = [
-            'bear.png', 'cat.png', 'duck.png', 'gorilla.png',
-            'koala.png', 'panda.png', 'sea-lion.png', 'jaguar.png', 'dog.png',
-        ]
-        selected_avatar = random.choice(avatar_images)
-        self.default_avatar = selected_avatar
-        self.save(update_fields=["default_avatar"])
-        return f"/static/img/users/avatars/{self.default_avatar}"
+        """Returns student's profile or default avatar URL (read-only, see DefaultAvatar)."""
+        return DefaultAvatar.picture_url(self)
 
     def save(self, *args, **kwargs):
         is_new = self.pk is None
 
-        if not is_new:
-            previous = Student.objects.filter(pk=self.pk).only(
-                "enrollment_status",
-                "enrolled_at"
-            ).first()
-        else:
-            previous = None
-
         # 🔹 Normalize preferred initial
         if self.preferred_initial:
             self.preferred_initial = self.preferred_initial.upper()
 
-        # 🔹 Detect enrollment status change
-        if previous and previous.enrollment_status != self.enrollment_status:
+        # 🔹 Detect enrollment status change (against the values read with the row — no query)
+        if not is_new and "enrollment_status" in self.changed_fields(["enrollment_status"]):
             self.status_changed_at = timezone.now()
 
             # 🔹 First time officially enrolled
-            if self.enrollment_status == "enrolled" and not previous.enrolled_at:
+            if self.enrollment_status == "enrolled" and not self.previous_values(["enrolled_at"])["enrolled_at"]:
                 self.enrolled_at = timezone.now()
 
         super().save(*args, **kwargs)
 
-        # 🔹 QR generation
-        if not self.qr_code:
-            self.generate_qr_code()
-            super().save(update_fields=["qr_code"])
+        # 🔹 QR generation (background; qr_hash stays NULL = pending until then)
+        if not self.qr_hash:
+            QRRenderQueue.enqueue("student", [self.pk])
 
     def __str__(self):
         full_name = " ".join(
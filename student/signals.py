@@ -1,116 +1,51 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_migrate, post_save
 from django.dispatch import receiver
-from django.utils import timezone
-
-from users.models import UserProfile
 from student.models import Student
+from student.utils.factory import StudentFactory
+from student.utils.enrollment import EnrolledUsers
+from school.utils.field_tracking import FieldTracker
+from school.utils.search import TrigramSearch
 
 
 @receiver(post_save, sender=Student)
 def sync_userprofile_to_student(sender, instance, created, **kwargs):
     """
-    On FIRST creation of Student:
-    - Snapshot UserProfile identity & contact fields
-    - Copy visual + academic info
-    - Initialize enrollment timestamps if applicable
+    Fallback for a plain ``Student.objects.create``: on FIRST creation,
+    snapshot the UserProfile onto the student (one extra UPDATE plus the
+    designation rows). Students created through StudentFactory already
+    carry the snapshot and are skipped.
     """
 
-    # 🚫 Only run on creation (snapshot rule)
-    if not created:
+    # 🚫 Only run on creation (snapshot rule), and only if nobody did it before the INSERT
+    if not created or getattr(instance, StudentFactory.SNAPSHOT_FLAG, False):
         return
 
     user = instance.user
-
-    try:
-        profile = user.userprofile
-    except UserProfile.DoesNotExist:
+    profile = StudentFactory.profile_of(user)
+    if profile is None:
         # Hard stop — student must still exist even without profile
         return
 
-    update_fields = []
-
-    # ============================================================
-    # 🔹 SNAPSHOT IDENTITY (IMMUTABLE AFTER ENROLLMENT)
-    # ============================================================
-    instance.rank = profile.rank or ""
-    instance.first_name = user.first_name or ""
-    instance.middle_name = profile.middle_name
-    instance.last_name = user.last_name or ""
-    instance.extension_name = profile.extension_name
-    instance.email = user.email or ""
-
-    update_fields += [
-        "rank",
-        "first_name",
-        "middle_name",
-        "last_name",
-        "extension_name",
-        "email",
-    ]
-
     # ============================================================
-    # 🔹 PERSONAL / CONTACT INFO
+    # 🔹 SNAPSHOT (same rules as StudentFactory — no recursive loop)
     # ============================================================
-    instance.gender = profile.gender
-    instance.birth_date = profile.birth_date
-    instance.contact_number = profile.contact_number
-    instance.email_verified = profile.email_verified
-    instance.preferred_initial = profile.preferred_initial
+    StudentFactory.snapshot(instance, user, profile)
+    instance.save(update_fields=StudentFactory.SNAPSHOT_FIELDS)
 
-    update_fields += [
-        "gender",
-        "birth_date",
-        "contact_number",
-        "email_verified",
-        "preferred_initial",
-    ]
-
-    # ============================================================
-    # 🔹 VISUAL REPRESENTATION
-    # ============================================================
-    if profile.profile_picture:
-        instance.profile_picture = profile.profile_picture
-        update_fields.append("profile_picture")
-
-    if profile.default_avatar:
-        instance.default_avatar = profile.default_avatar
-        update_fields.append("default_avatar")
-
-    instance.display_name_format = profile.display_name_format
-    update_fields.append("display_name_format")
-
-    # ============================================================
-    # 🔹 ACADEMIC / ORGANIZATIONAL
     # ============================================================
-    instance.classification = profile.classification
-    update_fields.append("classification")
-
-    # ============================================================
-    # 🔹 ENROLLMENT TIMESTAMPS (SAFE DEFAULTS)
+    # 🔹 MANY-TO-MANY (AFTER SAVE)
     # ============================================================
-    if instance.enrollment_status == "enrolled" and not instance.enrolled_at:
-        now = timezone.now()
-        instance.enrolled_at = now
-        instance.status_changed_at = now
-        update_fields += ["enrolled_at", "status_changed_at"]
+    StudentFactory.link_designations([instance])
 
-    # ============================================================
-    # 🔹 SAVE SNAPSHOT (NO RECURSIVE LOOP)
-    # ============================================================
-    instance.save(update_fields=update_fields)
+    # 🔹 QR CODE: queued by Student.save (rendered in the background)
 
-    # ============================================================
-    # 🔹 MANY-TO-MANY (AFTER SAVE)
-    # ============================================================
-    if profile.designations.exists():
-        instance.designations.set(profile.designations.all())
 
-    # ============================================================
-    # 🔹 QR CODE (ONE-TIME GENERATION)
-    # ============================================================
-    if not instance.qr_code:
-        instance.generate_qr_code()
-        instance.save(update_fields=["qr_code"])
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_enrolled_users(sender, instance, **kwargs):
+    """Drop the cached enrolled-user set of the student's school (and the one it left)."""
+    previous = FieldTracker.original(instance).get("school_id")
+    EnrolledUsers.invalidate_on_commit(instance.school_id, previous)
 
 
 #
@@ -146,3 +81,7 @@ def sync_userprofile_to_student(sender, instance, created, **kwargs):
 #             "enabled": True,
 #         },
 #     )
+
+
+# 🔍 pg_trgm indexes behind search / typeahead (auth_user can't declare them in Meta)
+post_migrate.connect(TrigramSearch.ensure_indexes_after_migrate, dispatch_uid="trigram-search-indexes")
@@ -20,33 +20,29 @@ function initAvailableStudentsSelect() {
         placeholder: 'Search student...',
         allowClear: true,
         width: '100%',
-        minimumInputLength: 1,
+        minimumInputLength: 2,
 
+        // Ranked matches from the trigram-indexed typeahead (no paging)
         ajax: {
-            url: `/api/students/schools/${schoolId}/available/`,
+            url: '/api/users-list/typeahead/',
             dataType: 'json',
-            delay: 300,
+            delay: 250,
             headers: authHeaders(),
 
             data: function (params) {
                 return {
-                    search: params.term || '',
-                    page: params.page || 1,
-                    page_size: 10
+                    q: params.term || '',
+                    exclude_school: schoolId,
+                    limit: 10
                 };
             },
 
-            processResults: function (data, params) {
-                params.page = params.page || 1;
-
+            processResults: function (data) {
                 return {
                     results: data.results.map(u => ({
                         id: u.id,
                         text: u.full_name || u.username
-                    })),
-                    pagination: {
-                        more: Boolean(data.next)
-                    }
+                    }))
                 };
             },
 
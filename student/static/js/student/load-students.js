@@ -58,7 +58,7 @@ function initStudentsModal(options = {}) {
   const $pagination = $("#paginationContainerStudents");
 
   let currentSchoolId = null;
-  let currentPage = 1;
+  let currentUrl = null; // cursor link of the page on screen (null = first page)
 
   // ===============================
   // MODAL OPEN
@@ -82,14 +82,13 @@ function initStudentsModal(options = {}) {
 
     window.currentSchoolId = schoolId;
     currentSchoolId = schoolId;
-    currentPage = 1;
 
     $("#studentsModalLabel").text(`Students Management — ${schoolName}`);
     $("#btnAddStudent")
       .data("school-id", schoolId)
       .data("school-name", schoolName);
 
-    loadStudents(currentSchoolId, currentPage);
+    loadStudents(currentSchoolId);
   });
 
   // ===============================
@@ -97,7 +96,7 @@ function initStudentsModal(options = {}) {
   // ===============================
   $("#btnRefreshStudents").on("click", () => {
     if (currentSchoolId) {
-      loadStudents(currentSchoolId, currentPage);
+      loadStudents(currentSchoolId, currentUrl);
     }
   });
 
@@ -107,27 +106,27 @@ function initStudentsModal(options = {}) {
   $("#filterSearch, #filterSchoolYear, #filterSemester, #filterFlight")
     .on("change keyup", () => {
       if (currentSchoolId) {
-        currentPage = 1;
-        loadStudents(currentSchoolId, currentPage);
+        loadStudents(currentSchoolId);
       }
     });
 
   // ===============================
   // LOAD STUDENTS
   // ===============================
-  function loadStudents(schoolId, page = 1) {
-    currentPage = page;
+  function loadStudents(schoolId, url = null) {
+    currentUrl = url;
 
     const params = {
-      page,
       search: $("#filterSearch").val() || "",
       school_year: $("#filterSchoolYear").val() || "",
       semester: $("#filterSemester").val() || "",
       flight: $("#filterFlight").val() || "",
+      total: "approx", // planner estimate, no COUNT(*)
     };
 
+    // Cursor links from the API keep the filters of the first request
     const endpoint =
-      `/api/students/schools/${schoolId}/students/?${$.param(params)}`;
+      url || `/api/students/schools/${schoolId}/students/?${$.param(params)}`;
 
     $tableBody.html(
       `<tr><td colspan="8" class="text-center py-3 text-muted">Loading...</td></tr>`
@@ -209,7 +208,7 @@ function initStudentsModal(options = {}) {
       <!-- Actions -->
       <td class="text-center" style="white-space:nowrap;">
         <button class="btn btn-sm btn-outline-primary btnDownloadQR"
-                data-qr-url="${student.qr_image}"
+                data-qr-url="${student.qr_image || ""}"
                 data-student-id="${student.id}"
                 title="Download QR Code">
           <i class="fas fa-qrcode"></i>
@@ -254,63 +253,44 @@ function initStudentsModal(options = {}) {
   }
 
   // ===============================
-  // PAGINATION BUILDER
+  // PAGINATION BUILDER (cursor: Prev / Next)
   // ===============================
   function buildPagination(res) {
     $pagination.empty();
 
-    const count = res.count || 0;
-    const pageSize = res.results?.length || 10;
-    const totalPages = Math.ceil(count / pageSize);
+    const shown = res.results?.length || 0;
+    const total = res.approximate_count;
+    const summary = total != null
+      ? `Showing ${shown} of about ${total} student(s)`
+      : `Showing ${shown} student(s)`;
 
-    if (totalPages <= 1) {
-      $pagination.html(
-        `<small class="text-muted">Showing ${count} record(s)</small>`
-      );
+    if (!res.previous && !res.next) {
+      $pagination.html(`<small class="text-muted">${summary}</small>`);
       return;
     }
 
-    let html = `
+    $pagination.html(`
       <nav aria-label="Students pagination">
         <ul class="pagination pagination-students justify-content-center mb-0">
-          <li class="page-item ${currentPage === 1 ? "disabled" : ""}">
-            <button class="page-link" data-page="${currentPage - 1}">‹ Prev</button>
+          <li class="page-item ${res.previous ? "" : "disabled"}">
+            <button class="page-link" data-url="${res.previous || ""}">‹ Prev</button>
           </li>
-    `;
-
-    const maxVisible = 5;
-    let start = Math.max(1, currentPage - Math.floor(maxVisible / 2));
-    let end = Math.min(totalPages, start + maxVisible - 1);
-
-    for (let i = start; i <= end; i++) {
-      html += `
-        <li class="page-item ${i === currentPage ? "active" : ""}">
-          <button class="page-link" data-page="${i}">${i}</button>
-        </li>
-      `;
-    }
-
-    html += `
-          <li class="page-item ${currentPage === totalPages ? "disabled" : ""}">
-            <button class="page-link" data-page="${currentPage + 1}">Next ›</button>
+          <li class="page-item ${res.next ? "" : "disabled"}">
+            <button class="page-link" data-url="${res.next || ""}">Next ›</button>
           </li>
         </ul>
       </nav>
-      <small class="text-muted d-block mt-2 text-center">
-        Page ${currentPage} of ${totalPages} — Showing ${res.results.length} of ${count} students
-      </small>
-    `;
-
-    $pagination.html(html);
+      <small class="text-muted d-block mt-2 text-center">${summary}</small>
+    `);
   }
 
   // ===============================
   // PAGINATION CLICK HANDLER
   // ===============================
   $(document).on("click", ".pagination-students .page-link", function () {
-    const page = parseInt($(this).data("page"));
-    if (!page || page < 1 || page === currentPage) return;
-    loadStudents(currentSchoolId, page);
+    const url = $(this).data("url");
+    if (!url) return;
+    loadStudents(currentSchoolId, url);
   });
 
   // ===============================
@@ -318,7 +298,6 @@ function initStudentsModal(options = {}) {
   // ===============================
   window.reloadStudentsForSchool = function (schoolId) {
     currentSchoolId = schoolId;
-    currentPage = 1;
-    loadStudents(schoolId, currentPage);
+    loadStudents(schoolId);
   };
 }
@@ -1,3 +1,27 @@
+from celery import shared_task
+
+from school.utils.qr_render import QRRenderQueue
+
+
+@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=30, retry_kwargs={"max_retries": 3})
+def render_student_qr_codes(self, student_ids):
+    """
+    Render pending student QR codes (queued by QRRenderQueue) and store
+    them with bulk UPDATEs. Students that already have a QR are left
+    alone, so retries are safe.
+    """
+    return {"rendered": QRRenderQueue.process("student", student_ids)}
+
+
+@shared_task(bind=True)
+def render_pending_qr_codes(self):
+    """
+    Safety net for lost jobs: render every QR still pending (students and
+    user profiles). Runs every few minutes via Celery Beat.
+    """
+    return QRRenderQueue.sweep()
+
+
 # from celery import shared_task
 # from student.models import Student
 #
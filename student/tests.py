@@ -1,3 +1,85 @@
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
 from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from school.utils.pagination import KeysetPagination
+from school.utils.qr_render import QRRenderer, QRRenderQueue, QRStore
+from school.utils.search import TrigramSearch
+from schools.models import SchoolOrg
+from student.models import Student
+
+
+class TwoPerPage(KeysetPagination):
+    page_size = 2
+
+
+class RankedKeysetTests(TestCase):
+    """Keyset pages across students tied on search rank (PostgreSQL)."""
+
+    def setUp(self):
+        school = SchoolOrg.objects.create(name="WCC")
+        for i in range(7):
+            Student.objects.create(
+                user=User.objects.create(username=f"cadet{i}"),
+                school=school,
+                student_id=f"S-{i}",
+                first_name="Juan",
+                last_name="Cruz",
+            )
+        self.expected = list(Student.objects.order_by("pk").values_list("pk", flat=True))
+
+    def walk(self, queryset):
+        """Every pk, following ``next`` cursors from the first page."""
+        factory, seen, params = APIRequestFactory(), [], {}
+        for _ in range(len(self.expected) + 1):
+            paginator = TwoPerPage()
+            rows = paginator.paginate_queryset(queryset, Request(factory.get("/", params)))
+            seen += [row.pk for row in rows]
+            if not paginator.next_cursor:
+                return seen
+            params = {"cursor": paginator.next_cursor}
+        self.fail(f"Pages loop: {seen}")
+
+    @skipUnless(connection.vendor == "postgresql", "float4 ranks are PostgreSQL's")
+    def test_tied_rank_key_pages_every_row_once(self):
+        # 1/3 as a float4 (0.33333334 in a cursor), like TrigramWordSimilarity
+        similarity = RawSQL("(1.0 / 3)::real", [], output_field=FloatField())
+        queryset = Student.objects.alias(**{TrigramSearch.RANK: TrigramSearch.rank_key(similarity)})
+        self.assertEqual(self.walk(queryset.order_by(f"-{TrigramSearch.RANK}", "pk")), self.expected)
+
+    def test_ranked_search_pages_every_row_once(self):
+        if not TrigramSearch.available():
+            self.skipTest("needs pg_trgm")
+        queryset = TrigramSearch.rank(
+            Student.objects.all(), "cruz jua", ("first_name", "last_name", "student_id"), order=("pk",)
+        )
+        self.assertEqual(self.walk(queryset), self.expected)
+
+
+class QRRenderQueueTests(TestCase):
+    def setUp(self):
+        self.student = Student.objects.create(
+            user=User.objects.create(username="cadet"), school=SchoolOrg.objects.create(name="WCC"), student_id="S-1"
+        )
+
+    def test_edit_during_render_keeps_row_pending(self):
+        rendered = dict(QRRenderQueue.payloads("student", [self.student.pk]))
+
+        # Edited (payload changed, QR pending again) while the old payload rendered
+        self.student.student_id = "S-2"
+        self.student.save()
+
+        stale = [Student(pk=self.student.pk, qr_hash="0" * 64, qr_code=None)]
+        self.assertEqual(QRRenderQueue.store("student", stale, rendered), 0)
+        self.student.refresh_from_db()
+        self.assertTrue(self.student.qr_pending)
 
-# Create your tests here.
+        self.assertEqual(QRRenderQueue.process("student", [self.student.pk]), 1)
+        self.student.refresh_from_db()
+        self.assertEqual(QRStore.read(self.student.qr_hash), QRRenderer.student(self.student.qr_payload()))
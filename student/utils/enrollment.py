@@ -0,0 +1,181 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from school.utils.qr_render import QRRenderQueue
+from student.models import Student
+from student.utils.factory import StudentFactory
+
+
+class EnrolledUsers:
+    """
+    Per-school set of enrolled user ids, kept in the Django cache for the
+    "available users" picker and its typeahead.
+
+    ``exclude`` drops enrolled users from a User queryset: up to
+    INLINE_LIMIT ids the cached set goes into the query as ``NOT IN``
+    (PostgreSQL hashes the list), so student_student isn't touched on
+    each keystroke or page; larger rosters use a ``NOT EXISTS`` anti-join
+    probing the (school, user) index.
+
+    The set is dropped after commit by the Student signals and by
+    BulkEnrollment (``bulk_create`` sends no signals). A per-process
+    cache backend can serve another worker's stale set until
+    CACHE_TIMEOUT; adding an already enrolled user is still skipped by
+    BulkEnrollment.
+    """
+
+    CACHE_PREFIX = "enrolled-users"
+    CACHE_TIMEOUT = 5 * 60
+    INLINE_LIMIT = 5000
+
+    @classmethod
+    def key(cls, school_id):
+        return f"{cls.CACHE_PREFIX}:{school_id}"
+
+    @classmethod
+    def ids(cls, school_id):
+        key = cls.key(school_id)
+        ids = cache.get(key)
+        if ids is None:
+            ids = frozenset(
+                Student.objects.filter(school_id=school_id).values_list("user_id", flat=True)
+            )
+            cache.set(key, ids, cls.CACHE_TIMEOUT)
+        return ids
+
+    @classmethod
+    def invalidate(cls, *school_ids):
+        keys = [cls.key(school_id) for school_id in set(school_ids) if school_id is not None]
+        if keys:
+            cache.delete_many(keys)
+
+    @classmethod
+    def invalidate_on_commit(cls, *school_ids):
+        transaction.on_commit(lambda: cls.invalidate(*school_ids))
+
+    @classmethod
+    def exclude(cls, users, school_id):
+        """``users`` (a User queryset) minus the users enrolled in the school."""
+        enrolled = cls.ids(school_id)
+        if not enrolled:
+            return users
+        if len(enrolled) <= cls.INLINE_LIMIT:
+            return users.exclude(pk__in=sorted(enrolled))
+        return users.filter(~Exists(Student.objects.filter(school_id=school_id, user=OuterRef("pk"))))
+
+
+class BulkEnrollment:
+    """
+    Enroll many users into one school with a fixed number of queries.
+
+    ``Student.objects.create`` per user costs a pre-read in
+    ``Student.save``, the ``sync_userprofile_to_student`` snapshot save,
+    an M2M ``set`` and two more saves for the QR. Here:
+
+    1. one query loads the users with their profile (and whether they are
+       already a student — ``Student.user`` is one-to-one), one more
+       prefetches profile designations;
+    2. snapshots are built in memory by StudentFactory;
+    3. students and their designation through-rows are ``bulk_create``d;
+    4. QR PNGs are not rendered in the request — the new ids go to the
+       background QRRenderQueue (students stay "QR pending" until then).
+
+    ``bulk_create`` sends no model signals, so the work those receivers do
+    on create (attendance roster cache, EnrolledUsers) is done here explicitly.
+    """
+
+    BATCH_SIZE = 500
+
+    def __init__(self, school, user_ids, enrollment_status="pending", student_id_format=None):
+        self.school = school
+        self.user_ids = user_ids
+        self.enrollment_status = enrollment_status
+        # e.g. "{school_id}-{user_id:05d}"; default: random STD- ids
+        self.student_id_format = student_id_format
+
+        self.created = []
+        self.skipped = []
+
+    # ------------------------------------------------------------
+    # 🔹 Steps
+    # ------------------------------------------------------------
+    def normalize_ids(self):
+        ids = []
+        seen = set()
+        for raw in self.user_ids:
+            try:
+                user_id = int(raw)
+            except (TypeError, ValueError):
+                self.skipped.append(f"UnknownID:{raw}")
+                continue
+            if user_id not in seen:
+                seen.add(user_id)
+                ids.append(user_id)
+        return ids
+
+    def load_users(self, ids):
+        """{user_id: user} with profile, designations and an is_student flag — two queries."""
+        users = (
+            User.objects
+            .filter(pk__in=ids)
+            .select_related("userprofile")
+            .prefetch_related(StudentFactory.designations_prefetch())
+            .annotate(is_student=Exists(Student.objects.filter(user=OuterRef("pk"))))
+        )
+        return {user.pk: user for user in users}
+
+    def build(self, ids, users):
+        to_create = []
+        for user_id in ids:
+            user = users.get(user_id)
+            if user is None:
+                self.skipped.append(f"UnknownID:{user_id}")
+                continue
+            if user.is_student:
+                self.skipped.append(user.username)
+                continue
+            to_create.append(user)
+
+        if self.student_id_format:
+            student_ids = [
+                self.student_id_format.format(school_id=self.school.pk, user_id=user.pk)
+                for user in to_create
+            ]
+        else:
+            student_ids = StudentFactory.new_student_ids(len(to_create))
+        return [
+            StudentFactory.build(
+                user,
+                self.school,
+                profile=StudentFactory.profile_of(user),
+                student_id=student_id,
+                enrollment_status=self.enrollment_status,
+            )
+            for user, student_id in zip(to_create, student_ids)
+        ]
+
+    # ------------------------------------------------------------
+    # 🔹 Main entry point
+    # ------------------------------------------------------------
+    def run(self):
+        """Create the students. Returns the created Student instances (QR pending)."""
+        from attendance.utils.roster import RosterIndex
+
+        ids = self.normalize_ids()
+        users = self.load_users(ids)
+        students = self.build(ids, users)
+
+        with transaction.atomic():
+            Student.objects.bulk_create(students, batch_size=self.BATCH_SIZE)
+            StudentFactory.link_designations(students)
+            QRRenderQueue.enqueue("student", [student.pk for student in students])
+
+            if students:
+                school_id = self.school.pk
+                transaction.on_commit(lambda: RosterIndex.invalidate(school_id))
+                EnrolledUsers.invalidate_on_commit(school_id)
+
+        self.created = students
+        return students
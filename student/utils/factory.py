@@ -0,0 +1,161 @@
+import uuid
+
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from student.models import Student
+from users.models import UserProfile
+
+
+class StudentFactory:
+    """
+    Single place that builds new Student rows.
+
+    The profile snapshot (identity, contact, avatar, classification and
+    enrollment timestamps) is filled in *before* the INSERT, so creating a
+    student is one INSERT plus one bulk insert of designation rows:
+
+        student = StudentFactory.create(user, school, enrollment_status="enrolled")
+
+    Used by the API, the admin, BulkEnrollment and the management
+    commands. ``sync_userprofile_to_student`` stays as the fallback for a
+    plain ``Student.objects.create`` and skips instances built here.
+    """
+
+    STUDENT_ID_PREFIX = "STD-"
+    BATCH_SIZE = 500
+
+    # Profile fields copied onto the student as-is
+    PROFILE_FIELDS = (
+        "middle_name",
+        "extension_name",
+        "gender",
+        "birth_date",
+        "contact_number",
+        "email_verified",
+        "preferred_initial",
+        "display_name_format",
+        "classification_id",
+    )
+
+    # Every column ``snapshot`` may write (for the signal's update_fields)
+    SNAPSHOT_FIELDS = (
+        "rank", "first_name", "last_name", "email",
+        *PROFILE_FIELDS,
+        "profile_picture", "default_avatar",
+        "enrolled_at", "status_changed_at",
+    )
+
+    # Set on instances whose snapshot was taken here (the signal skips them)
+    SNAPSHOT_FLAG = "_profile_snapshot"
+
+    # ------------------------------------------------------------
+    # 🔹 Snapshot
+    # ------------------------------------------------------------
+    @classmethod
+    def snapshot(cls, student, user, profile):
+        """Fill a new, unsaved Student from its user / profile. Returns the student."""
+        setattr(student, cls.SNAPSHOT_FLAG, True)
+
+        if profile is None:
+            # A student must still exist without profile — it keeps the defaults
+            return student
+
+        student.rank = profile.rank or ""
+        student.first_name = user.first_name or ""
+        student.last_name = user.last_name or ""
+        student.email = user.email or ""
+
+        for field in cls.PROFILE_FIELDS:
+            setattr(student, field, getattr(profile, field))
+
+        if profile.profile_picture:
+            student.profile_picture = profile.profile_picture
+        if profile.default_avatar:
+            student.default_avatar = profile.default_avatar
+
+        if student.enrollment_status == "enrolled" and not student.enrolled_at:
+            now = timezone.now()
+            student.enrolled_at = now
+            student.status_changed_at = now
+
+        return student
+
+    @staticmethod
+    def profile_of(user):
+        """The user's profile with ``designation_list`` prefetched (None without profile)."""
+        try:
+            profile = user.userprofile
+        except UserProfile.DoesNotExist:
+            return None
+
+        if not hasattr(profile, "designation_list"):
+            profile.designation_list = list(profile.designations.all())
+        return profile
+
+    @staticmethod
+    def designations_prefetch():
+        """Prefetch for ``User`` querysets that fills what ``profile_of`` reads."""
+        return Prefetch(
+            "userprofile__designations",
+            to_attr="designation_list",
+        )
+
+    @classmethod
+    def new_student_ids(cls, count):
+        """``count`` fresh STD-XXXXXXXX ids, checked against the table in one query."""
+        ids = set()
+        while len(ids) < count:
+            candidates = {
+                f"{cls.STUDENT_ID_PREFIX}{uuid.uuid4().hex[:8].upper()}"
+                for _ in range(count - len(ids))
+            } - ids
+            taken = set(
+                Student.objects.filter(student_id__in=candidates).values_list("student_id", flat=True)
+            )
+            ids |= candidates - taken
+        return list(ids)
+
+    # ------------------------------------------------------------
+    # 🔹 Build / create
+    # ------------------------------------------------------------
+    @classmethod
+    def build(cls, user, school, profile=None, **fields):
+        """Unsaved Student with its snapshot taken (and a student_id if none given)."""
+        student = Student(user=user, school=school, **fields)
+        if not student.student_id:
+            student.student_id = cls.new_student_ids(1)[0]
+        return cls.snapshot(student, user, profile if profile is not None else cls.profile_of(user))
+
+    @classmethod
+    def link_designations(cls, students, designations=None):
+        """
+        Bulk-insert designation rows for new students: ``designations``
+        (ids or objects) for all of them, else each profile's own.
+        """
+        through = Student.designations.through
+        rows = []
+        for student in students:
+            if designations is not None:
+                chosen = designations
+            else:
+                profile = cls.profile_of(student.user)
+                chosen = getattr(profile, "designation_list", ())
+            for designation in chosen:
+                rows.append(through(student_id=student.pk, designation_id=getattr(designation, "pk", designation)))
+        through.objects.bulk_create(rows, batch_size=cls.BATCH_SIZE, ignore_conflicts=True)
+        return len(rows)
+
+    @classmethod
+    def create(cls, user, school, designations=None, **fields):
+        """
+        Create one student: one INSERT for the row, one for its designations
+        (the profile's unless ``designations`` is given). The QR is queued
+        by ``Student.save``.
+        """
+        student = cls.build(user, school, **fields)
+        with transaction.atomic():
+            student.save()
+            cls.link_designations([student], designations)
+        return student
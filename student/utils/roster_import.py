@@ -0,0 +1,191 @@
+import pandas as pd
+from django.contrib.auth.models import User
+from django.db import transaction
+from openpyxl.utils import column_index_from_string
+
+from school.utils.qr_render import QRRenderQueue
+from student.models import Student
+from student.utils.enrollment import BulkEnrollment, EnrolledUsers
+
+
+class StudentRosterImport:
+    """
+    Link the people on an Excel roster to one school, without prompts and
+    without per-row queries.
+
+    1. the two name columns are read and normalized as whole pandas
+       columns (trim, collapse whitespace, casefold);
+    2. they're matched against one in-memory index of every user, keyed
+       by the same normalized (first, last) — the ``iexact`` match the
+       old command ran per row;
+    3. one query finds which matched users already are students;
+    4. new students are created by BulkEnrollment and moved ones are
+       ``bulk_update``d, ``chunk_size`` rows (and one transaction) at a
+       time. Moving a student changes its QR payload, so its QR is reset
+       and re-rendered in the background.
+
+    ``plan()`` only classifies rows, so a dry run is ``plan()`` plus
+    ``summary()``. Row statuses:
+
+    - ``new``: user found, not a student yet → created here;
+    - ``moved``: student of another school → moved here;
+    - ``linked``: already a student of this school;
+    - ``unmatched``: no user with that name;
+    - ``duplicate``: same user as an earlier row;
+    - ``blank``: a name cell is empty.
+
+    Two users sharing a normalized name match the one with the lowest id
+    (like the old ``.first()``); such rows are listed in ``ambiguous``.
+    """
+
+    CHUNK_SIZE = 1000
+    STUDENT_ID_FORMAT = "{school_id}-{user_id:05d}"
+
+    STATUSES = ("new", "moved", "linked", "unmatched", "duplicate", "blank")
+
+    def __init__(self, school, chunk_size=CHUNK_SIZE, enrollment_status="pending"):
+        self.school = school
+        self.chunk_size = chunk_size
+        self.enrollment_status = enrollment_status
+
+        self.rows = None
+        self.ambiguous = set()
+
+    # ------------------------------------------------------------
+    # 🔹 Reading / normalizing
+    # ------------------------------------------------------------
+    @staticmethod
+    def normalize(values):
+        """Trimmed, single-spaced, casefolded strings ("" for empty / NaN)."""
+        return (
+            values.fillna("").astype(str)
+            .str.replace(r"\s+", " ", regex=True)
+            .str.strip()
+            .str.casefold()
+        )
+
+    @classmethod
+    def read_names(cls, path, sheet, first_name_column, last_name_column):
+        """DataFrame(row, first_name, last_name) from two column letters of the sheet."""
+        first = column_index_from_string(first_name_column) - 1
+        last = column_index_from_string(last_name_column) - 1
+        frame = pd.read_excel(path, sheet_name=sheet, header=None, usecols=[first, last], dtype=str)
+        return pd.DataFrame({
+            "row": frame.index + 1,
+            "first_name": frame[first].fillna("").str.strip(),
+            "last_name": frame[last].fillna("").str.strip(),
+        })
+
+    def user_index(self):
+        """DataFrame(first_key, last_key, user_id) — one row per normalized name, lowest id wins."""
+        users = pd.DataFrame.from_records(
+            list(User.objects.order_by("pk").values_list("pk", "first_name", "last_name")),
+            columns=["user_id", "first_name", "last_name"],
+        )
+        users["first_key"] = self.normalize(users["first_name"])
+        users["last_key"] = self.normalize(users["last_name"])
+
+        keys = ["first_key", "last_key"]
+        shared = users[users.duplicated(keys, keep=False)]
+        self.ambiguous = set(map(tuple, shared[keys].drop_duplicates().to_numpy()))
+        return users.drop_duplicates(keys, keep="first")[keys + ["user_id"]]
+
+    # ------------------------------------------------------------
+    # 🔹 Planning
+    # ------------------------------------------------------------
+    def plan(self, names):
+        """Classify every roster row; returns (and keeps) the annotated DataFrame."""
+        rows = names.copy()
+        rows["first_key"] = self.normalize(rows["first_name"])
+        rows["last_key"] = self.normalize(rows["last_name"])
+
+        rows = rows.merge(self.user_index(), on=["first_key", "last_key"], how="left")
+        rows["user_id"] = rows["user_id"].astype("Int64")
+
+        matched = rows["user_id"].dropna().astype(int).unique().tolist()
+        students = pd.DataFrame.from_records(
+            list(Student.objects.filter(user_id__in=matched).values_list("user_id", "id", "school_id")),
+            columns=["user_id", "student_pk", "current_school_id"],
+        ).astype({"user_id": "Int64", "student_pk": "Int64", "current_school_id": "Int64"})
+        rows = rows.merge(students, on="user_id", how="left")
+
+        blank = (rows["first_key"] == "") | (rows["last_key"] == "")
+        unmatched = ~blank & rows["user_id"].isna()
+        duplicate = ~blank & ~unmatched & rows.duplicated("user_id", keep="first")
+        found = ~blank & ~unmatched & ~duplicate
+        is_student = rows["student_pk"].notna()
+        here = is_student & (rows["current_school_id"] == self.school.pk).fillna(False)
+
+        rows["status"] = "new"
+        rows.loc[found & is_student & ~here, "status"] = "moved"
+        rows.loc[found & here, "status"] = "linked"
+        rows.loc[duplicate, "status"] = "duplicate"
+        rows.loc[unmatched, "status"] = "unmatched"
+        rows.loc[blank, "status"] = "blank"
+
+        rows["ambiguous"] = [
+            (first, last) in self.ambiguous for first, last in zip(rows["first_key"], rows["last_key"])
+        ] if self.ambiguous else False
+
+        self.rows = rows.drop(columns=["first_key", "last_key"])
+        return self.rows
+
+    def summary(self):
+        counts = self.rows["status"].value_counts()
+        report = {status: int(counts.get(status, 0)) for status in self.STATUSES}
+        report["rows"] = len(self.rows)
+        report["ambiguous"] = int(self.rows["ambiguous"].sum())
+        return report
+
+    def rows_with(self, status):
+        return self.rows[self.rows["status"] == status]
+
+    # ------------------------------------------------------------
+    # 🔹 Writing
+    # ------------------------------------------------------------
+    def chunks(self, values):
+        for start in range(0, len(values), self.chunk_size):
+            yield values[start:start + self.chunk_size]
+
+    def create_new(self):
+        """BulkEnrollment per chunk. Returns the number of students created."""
+        created = 0
+        user_ids = self.rows_with("new")["user_id"].astype(int).tolist()
+        for chunk in self.chunks(user_ids):
+            enrollment = BulkEnrollment(
+                self.school,
+                chunk,
+                enrollment_status=self.enrollment_status,
+                student_id_format=self.STUDENT_ID_FORMAT,
+            )
+            created += len(enrollment.run())
+        return created
+
+    def move_existing(self):
+        """Re-point students of other schools here, chunked. Returns the number moved."""
+        from attendance.utils.roster import RosterIndex
+
+        moved_rows = self.rows_with("moved")
+        pairs = list(zip(
+            moved_rows["student_pk"].astype(int).tolist(),
+            moved_rows["current_school_id"].astype(int).tolist(),
+        ))
+
+        for chunk in self.chunks(pairs):
+            # The QR payload embeds the school id → reset and re-render
+            students = [Student(pk=pk, school=self.school, qr_hash=None) for pk, _ in chunk]
+            schools = {self.school.pk} | {school_id for _, school_id in chunk}
+            with transaction.atomic():
+                Student.objects.bulk_update(students, ["school", "qr_hash"])
+                QRRenderQueue.enqueue("student", [pk for pk, _ in chunk])
+                EnrolledUsers.invalidate_on_commit(*schools)
+                for school_id in schools:
+                    transaction.on_commit(lambda school_id=school_id: RosterIndex.invalidate(school_id))
+        return len(pairs)
+
+    def run(self, names):
+        """Plan and write. Returns ``summary()``."""
+        self.plan(names)
+        self.create_new()
+        self.move_existing()
+        return self.summary()
@@ -2,6 +2,7 @@ from django.contrib import admin
 from .models import UserProfile, Designation, Organization, Classification
 from users.forms import UserProfileAdminForm
 from django.utils.html import format_html
+from school.utils.qr_render import QRRenderQueue
 
 
 @admin.register(Designation)
@@ -74,7 +75,7 @@ class UserProfileAdmin(admin.ModelAdmin):
         }),
 
         ("QR Code", {
-            "fields": ("qr_code_preview", "qr_code")
+            "fields": ("qr_code_preview",)
         }),
     )
 
@@ -82,11 +83,11 @@ class UserProfileAdmin(admin.ModelAdmin):
     # QR Code Preview (show image instead of Base64)
     # -------------------------------------------
     def qr_code_preview(self, obj):
-        if not obj.qr_code:
-            return "No QR Code"
+        if obj.qr_pending:
+            return "QR Code pending"
         return format_html(
-            '<img src="data:image/png;base64,{}" style="width:200px;border:1px solid #ccc;padding:5px;border-radius:8px;" />',
-            obj.qr_code
+            '<img src="{}" style="width:200px;border:1px solid #ccc;padding:5px;border-radius:8px;" />',
+            obj.qr_url
         )
 
     qr_code_preview.short_description = "QR Code Preview"
@@ -97,13 +98,9 @@ class UserProfileAdmin(admin.ModelAdmin):
     actions = ["regenerate_qr"]
 
     def regenerate_qr(self, request, queryset):
-        count = 0
-        for profile in queryset:
-            profile.generate_qr_code(force=True)
-            profile.save(update_fields=["qr_code"])
-            count += 1
+        count = QRRenderQueue.reset("profile", list(queryset.values_list("pk", flat=True)))
 
-        self.message_user(request, f"QR Code regenerated for {count} user(s).")
+        self.message_user(request, f"QR Code regeneration queued for {count} user(s).")
 
     regenerate_qr.short_description = "Regenerate QR Code for selected users"
 
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from users.models import UserProfile, Organization, Designation, Classification
 from datetime import datetime
+from school.utils.sparse_fields import SparseFieldsMixin
 
 class ClassificationSerializer(serializers.ModelSerializer):
     class Meta:
@@ -33,7 +34,28 @@ class OrganizationSerializer(serializers.ModelSerializer):
         model = Organization
         fields = ['id', 'name', 'description']  # keep it light for dropdowns
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    # "list" = the Manage Users table (see SparseFieldsMixin for ?fields= / ?omit=)
+    FIELD_PROFILES = {
+        "list": [
+            "id", "user", "profile_picture", "qr_code", "qr_pending",
+            "fullname", "is_active", "groups", "organization_names", "last_activity",
+        ],
+    }
+
+    # Lookups read by the method / property fields
+    FIELD_SOURCES = {
+        "default_organization_name": ("default_organization__name",),
+        "organization_names": ("organizations",),
+        "organization_ids": ("organizations",),
+        "profile_picture": ("profile_picture", "default_avatar", "user"),
+        "groups": ("user__groups",),
+        "fullname": ("rank", "display_name_format", "user__first_name", "user__last_name"),
+        "is_active": ("user__is_active",),
+        "qr_code": ("qr_hash",),
+        "qr_pending": ("qr_hash",),
+    }
+
     user = AuthUserSerializer(required=False)
     classification = ClassificationSerializer(read_only=True)
     classification_id = serializers.PrimaryKeyRelatedField(
@@ -78,7 +100,8 @@ class UserProfileSerializer(serializers.ModelSerializer):
 
     last_activity = CustomDateTimeField(read_only=True)
     last_password_reset = CustomDateTimeField(read_only=True)
-    qr_code = serializers.SerializerMethodField(read_only=True)   # 👈 expose QR as base64
+    qr_code = serializers.SerializerMethodField(read_only=True)   # 👈 QR image URL
+    qr_pending = serializers.BooleanField(read_only=True)         # 👈 QR still rendering in the background
 
     class Meta:
         model = UserProfile
@@ -93,7 +116,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
             'default_organization_id', 'default_organization_name',
             'organization_ids', 'organization_names',
             'email_verified', 'contact_number', 'last_activity', 'last_password_reset',
-            'fullname', 'groups', 'is_active', 'display_name_format', 'qr_code'
+            'fullname', 'groups', 'is_active', 'display_name_format', 'qr_code', 'qr_pending'
         ]
 
     def update(self, instance, validated_data):
@@ -148,10 +171,8 @@ class UserProfileSerializer(serializers.ModelSerializer):
         return obj.user.is_active
 
     def get_qr_code(self, obj):
-        """Return QR code as a base64 data URI usable in <img src="">."""
-        if obj.qr_code:
-            return f"data:image/png;base64,{obj.qr_code}"
-        return None
+        """Return the QR image URL usable in <img src=""> (None while pending)."""
+        return obj.qr_url
 
 
 class UserWithProfileSerializer(serializers.ModelSerializer):
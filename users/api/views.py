@@ -1,13 +1,15 @@
 from rest_framework import viewsets, permissions
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.response import Response
+from rest_framework.exceptions import NotFound
 from users.models import UserProfile, Organization, Designation, Classification
 from django.contrib.auth.models import User
 from users.api.serializers import ClassificationSerializer, UserWithProfileSerializer, OrganizationSerializer, DesignationSerializer
 
 from authentication.utils.check_role import CheckUserPermission
 from authentication.utils.thread_manager import ThreadManager
-from school.utils.pagination import FilterSortPaginate
+from school.utils.pagination import FilterSortPaginate, KeysetPagination
+from school.utils.qr_render import QRRenderQueue
 from django.shortcuts import redirect, get_object_or_404
 from users.api.serializers import UserProfileSerializer
 from rest_framework.permissions import IsAuthenticated
@@ -17,49 +19,83 @@ from django.conf import settings
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q
+from school.utils.search import TrigramSearch
+from student.utils.enrollment import EnrolledUsers
+
+
+class UserListPagination(KeysetPagination):
+    ordering = ("userprofile__rank", "first_name", "last_name", "pk")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 100
 
 
 class UserListViewSet(viewsets.ViewSet):
     """
-    Returns a paginated list of all users (with UserProfile details).
+    Returns a cursor-paginated list of all users (with UserProfile details):
+    follow ``next`` / ``previous``; ``?total=approx`` adds an estimated total.
     Frontend can use Select2 for client-side search.
     """
 
     @permission_classes([IsAuthenticated])
     def list(self, request):
         try:
-            # Pagination params
-            page = int(request.query_params.get('page', 1))
-            page_size = int(request.query_params.get('page_size', 50))
-            offset = (page - 1) * page_size
-
             # Query all users
             users = User.objects.select_related('userprofile').order_by(
-                'userprofile__rank', 'first_name', 'last_name'
+                'userprofile__rank', 'first_name', 'last_name', 'pk'
             )
 
-            total = users.count()
-            users = users[offset:offset + page_size]
+            paginator = UserListPagination()
+            page = paginator.paginate_queryset(users, request, view=self)
 
             data = []
-            for user in users:
+            for user in page:
                 profile = getattr(user, 'userprofile', None)
                 data.append({
                     "id": user.id,
-                    "full_name": str(user.userprofile),
+                    "full_name": str(profile) if profile else (user.get_full_name() or user.username),
                     "username": user.username,
                     "email": user.email,
                 })
 
-            return Response({
-                "results": data,
-                "page": page,
-                "total": total,
-            }, status=status.HTTP_200_OK)
+            return paginator.get_paginated_response(data)
+
+        except NotFound:
+            raise
 
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=False, methods=["get"], url_path="typeahead", permission_classes=[IsAuthenticated])
+    def typeahead(self, request):
+        """
+        GET /api/users-list/typeahead/?q=<term>&exclude_school=<id>&limit=<n>
+        Top ranked users by first / last name or username (at most 25,
+        default 10). ``exclude_school`` leaves out users already enrolled
+        there (the Add Student picker). Terms shorter than 2 characters
+        return no results.
+        """
+        users = User.objects.all()
+
+        school_id = request.query_params.get("exclude_school")
+        if school_id:
+            if not school_id.isdigit():
+                return Response({"error": "Invalid school ID."}, status=status.HTTP_400_BAD_REQUEST)
+            users = EnrolledUsers.exclude(users, int(school_id))
+
+        # Display names are built in SQL (UserProfile.__str__ without loading profiles)
+        users = users.annotate(
+            full_name=UserProfile.display_name_sql(user="", profile="userprofile__"),
+        ).values("id", "full_name", "username", "email")
+
+        data = list(TrigramSearch.typeahead(
+            users,
+            request.query_params.get("q"),
+            TrigramSearch.INDEXES["auth.User"],
+            limit=request.query_params.get("limit"),
+            order=("last_name", "first_name", "pk"),
+        ))
+        return Response({"results": data}, status=status.HTTP_200_OK)
 
 
 class ClassificationViewSet(viewsets.ReadOnlyModelViewSet):
@@ -104,8 +140,9 @@ class ManageUsers(viewsets.ViewSet):
             )
 
         try:
-            # Fetch all profiles
-            profiles = UserProfile.objects.all().select_related('user')
+            # Fetch all profiles — only what the table profile (or ?fields=) renders
+            fields = UserProfileSerializer(context={'request': request}, profile='list')
+            profiles = fields.narrow_queryset(UserProfile.objects.all())
             print(f'PRE PROFILES: {profiles}')  # Print the original queryset
 
             # If the requester is not a Developer, exclude users with roles in HIDDEN_ROLES
@@ -123,7 +160,7 @@ class ManageUsers(viewsets.ViewSet):
             )
 
         # Serialize the profiles using the UserProfileSerializer
-        serializer = UserProfileSerializer(profiles, many=True)
+        serializer = UserProfileSerializer(profiles, many=True, context={'request': request}, profile='list')
         print(f'SERIALIZED DATA: {serializer.data}')  # Print the serialized data
 
         # Define the order fields for filtering, sorting, and pagination
@@ -165,17 +202,17 @@ class ManageUsers(viewsets.ViewSet):
         except UserProfile.DoesNotExist:
             return Response({"error": "UserProfile not found."}, status=404)
 
-        # Ensure QR exists
-        if not profile.qr_code:
-            profile.generate_qr_code(force=True)
-            profile.save(update_fields=["qr_code"])
+        # QR still rendering → make sure it's queued and let the client poll
+        if profile.qr_pending:
+            QRRenderQueue.enqueue("profile", [profile.pk])
 
         return Response({
             "userprofile_id": profile.id,
             "user_id": profile.user.id,
             "full_name": str(profile),
-            "qr_base64": profile.qr_code,
-        })
+            "qr_url": profile.qr_url,
+            "qr_pending": profile.qr_pending,
+        }, status=status.HTTP_202_ACCEPTED if profile.qr_pending else status.HTTP_200_OK)
 
 
 class UserProfileViewSet(viewsets.ReadOnlyModelViewSet):
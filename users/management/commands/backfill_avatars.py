@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from school.utils.avatars import DefaultAvatar
+from student.models import Student
+from users.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = "Store the derived default avatar on user profiles / students that have no picture or avatar yet."
+
+    MODELS = {
+        "profile": UserProfile,
+        "student": Student,
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kind",
+            action="append",
+            choices=list(self.MODELS),
+            help="Which rows to backfill (repeatable; default: all kinds).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per chunk / transaction (default: 1000).")
+
+    def handle(self, *args, **options):
+        kinds = options["kind"] or list(self.MODELS)
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+
+        for kind in kinds:
+            model = self.MODELS[kind]
+            remaining = DefaultAvatar.missing(model).count()
+            self.stdout.write(self.style.NOTICE(f"{kind}: {remaining} row(s) without an avatar…"))
+
+            updated = 0
+            for pks in DefaultAvatar.backfill(model, chunk_size=options["chunk_size"]):
+                updated += len(pks)
+                self.stdout.write(f"  {updated}/{remaining}")
+
+            self.stdout.write(self.style.SUCCESS(f"{kind}: {updated} avatar(s) stored."))
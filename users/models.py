@@ -1,13 +1,16 @@
 from django.db import models
+from django.db.models import Case, F, Func, Q, Value, When
+from django.db.models.functions import Coalesce, Lower, NullIf, Replace, Upper
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
-import random
-import qrcode
-import io, base64
 import json
 
+from school.utils.avatars import DefaultAvatar
+from school.utils.field_tracking import FieldTracker, TrackedFieldsMixin
+from school.utils.qr_render import QRRenderer, QRRenderQueue, QRStore
+
 class Designation(models.Model):
     """Represents an official designation/role a user can have."""
 
@@ -39,7 +42,7 @@ class Classification(models.Model):
     def __str__(self):
         return self.name
 
-class UserProfile(models.Model):
+class UserProfile(TrackedFieldsMixin, models.Model):
     GENDER_CHOICES = [
         ('M', 'Male'),
         ('F', 'Female'),
@@ -54,6 +57,16 @@ class UserProfile(models.Model):
         ('lower', 'lowercase (john de la cruz)'),
     ]
 
+    # Fields included in the QR payload — a change makes the QR stale.
+    # Snapshotted on load (User names via FieldTracker.watch in signals.py).
+    TRACKED_FIELDS = (
+        "rank", "contact_number", "address",
+        "city", "province", "default_avatar",
+        "profile_picture", "classification_id",
+        "display_name_format",
+    )
+    USER_TRACKED_FIELDS = ("first_name", "last_name")
+
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="userprofile")
     rank = models.CharField(max_length=100, blank=True, null=True)
     sub_svc = models.CharField(max_length=100, blank=True, null=True)
@@ -95,7 +108,10 @@ class UserProfile(models.Model):
         default='title',
         help_text="Controls how the user's display name is formatted"
     )
+    # Legacy base64 PNG; emptied by `manage.py migrate_qr_codes` (images now live in QRStore)
     qr_code = models.TextField(blank=True, null=True)
+    # SHA-256 of the QR PNG in QRStore; NULL = QR pending (see QRRenderQueue)
+    qr_hash = models.CharField(max_length=64, blank=True, null=True, editable=False)
     address = models.TextField(blank=True, null=True, verbose_name="Address")
     city = models.CharField(max_length=100, blank=True, null=True)
     province = models.CharField(max_length=250, blank=True, null=True)
@@ -108,19 +124,10 @@ class UserProfile(models.Model):
                 "default_organization": "The default organization must be one of the assigned organizations."
             })
 
-    def generate_qr_code(self, force=False):
-        """Generate QR with JSON payload using AUTH USER ID but NO ORGANIZATION."""
-        if self.qr_code and not force:
-            return
-
-        # Build profile picture URL
-        if self.profile_picture:
-            profile_pic_url = self.profile_picture.url
-        else:
-            profile_pic_url = (
-                f"/static/img/users/avatars/{self.default_avatar}"
-                if self.default_avatar else ""
-            )
+    def qr_payload(self):
+        """QR JSON payload using AUTH USER ID but NO ORGANIZATION."""
+        # Build profile picture URL (same avatar the API shows)
+        profile_pic_url = self.get_profile_picture_url
 
         # Build QR JSON payload (NO organization)
         qr_payload = {
@@ -137,26 +144,23 @@ class UserProfile(models.Model):
             "profile_picture": profile_pic_url,  # 🔥 picture URL included
         }
 
-        qr_text = json.dumps(qr_payload)
+        return json.dumps(qr_payload)
 
-        # Create QR
-        qr = qrcode.QRCode(
-            version=4,
-            error_correction=qrcode.constants.ERROR_CORRECT_H,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(qr_text)
-        qr.make(fit=True)
-
-        qr_img = qr.make_image(fill_color="black", back_color="white").convert("RGB")
+    @property
+    def qr_pending(self):
+        """QR is rendered in the background (see QRRenderQueue); no hash until then."""
+        return not self.qr_hash
 
-        buffer = io.BytesIO()
-        qr_img.save(buffer, format="PNG")
-        base64_qr = base64.b64encode(buffer.getvalue()).decode("utf-8")
-        buffer.close()
+    @property
+    def qr_url(self):
+        return QRStore.url(self.qr_hash)
 
-        self.qr_code = base64_qr
+    def generate_qr_code(self, force=False):
+        """Generate QR with JSON payload using AUTH USER ID but NO ORGANIZATION."""
+        if self.qr_hash and not force:
+            return
+        self.qr_hash = QRStore.save(QRRenderer.profile(self.qr_payload()))
+        self.qr_code = None
 
     def save(self, *args, **kwargs):
 
@@ -164,60 +168,50 @@ class UserProfile(models.Model):
         if self.preferred_initial:
             self.preferred_initial = self.preferred_initial.upper()
 
-        # Detect if QR should be regenerated
+        # Detect if QR should be regenerated (tracked values — no pre-save query)
         regenerate_qr = False
 
         if self.pk:
-            old = UserProfile.objects.filter(pk=self.pk).first()
-
-            # Check fields included in QR
-            fields_to_watch = [
-                "rank", "contact_number", "address",
-                "city", "province", "default_avatar",
-                "profile_picture", "classification_id",
-                "display_name_format"
-            ]
+            regenerate_qr = bool(self.changed_fields()) or self.user_name_changed()
 
-            for field in fields_to_watch:
-                if getattr(old, field) != getattr(self, field):
-                    regenerate_qr = True
-                    break
-
-            # Check user first/last name
-            if old.user.first_name != self.user.first_name or old.user.last_name != self.user.last_name:
-                regenerate_qr = True
+        # Stale QR → pending until the background render replaces it
+        if regenerate_qr:
+            self.qr_hash = None
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "qr_hash"}
 
         # Save the profile first
         super().save(*args, **kwargs)
 
-        # Regenerate QR if needed
-        if regenerate_qr or not self.qr_code:
-            self.generate_qr_code(force=True)
-            super().save(update_fields=["qr_code"])
+        # The QR now reflects these names
+        if UserProfile.user.is_cached(self):
+            FieldTracker.snapshot(self.user, self.USER_TRACKED_FIELDS)
+
+        # Regenerate QR if needed (background)
+        if not self.qr_hash:
+            QRRenderQueue.enqueue("profile", [self.pk])
+
+    def user_name_changed(self):
+        """
+        Whether the related User's names differ from when it was loaded.
+        A user that isn't cached on the profile hasn't been edited through
+        it; one without a snapshot (not loaded from the database) is
+        compared with its row.
+        """
+        if not UserProfile.user.is_cached(self):
+            return False
+
+        user = self.user
+        original = FieldTracker.original(user)
+        if any(name not in original for name in self.USER_TRACKED_FIELDS):
+            original = User.objects.filter(pk=user.pk).values(*self.USER_TRACKED_FIELDS).first() or {}
+        return any(getattr(user, name) != original.get(name) for name in self.USER_TRACKED_FIELDS)
 
     @property
     def get_profile_picture_url(self):
-        print(f"Fetching profile picture URL for user profile ID: {self.id}")
-
-        if self.profile_picture:
-            print(f"User has uploaded a profile picture: {self.profile_picture.url}")
-            return self.profile_picture.url
-
-        if self.default_avatar:
-            print(f"User already has a default avatar assigned: {self.default_avatar}")
-            return f'/static/img/users/avatars/{self.default_avatar}'
-
-        # Assign random avatar if none exists
-        avatar_images = [
-            'bear.png', 'cat.png', 'duck.png', 'gorilla.png',
-            'koala.png', 'panda.png', 'sea-lion.png', 'jaguar.png', 'dog.png',
-        ]
-        selected_avatar = random.choice(avatar_images)
-        self.default_avatar = selected_avatar
-        self.save()
-        print(f"No profile picture or avatar found. Assigned new random avatar: {selected_avatar}")
-
-        return f'/static/img/users/avatars/{self.default_avatar}'
+        """Uploaded picture or default avatar URL (read-only, see DefaultAvatar)."""
+        return DefaultAvatar.picture_url(self)
 
     def __str__(self):
         # Build the core name parts
@@ -260,3 +254,46 @@ class UserProfile(models.Model):
         # Fallback
         return base_display
 
+    @staticmethod
+    def display_name_sql(user="user__", profile=""):
+        """
+        ``__str__`` as a SQL expression, for listing names without loading
+        profiles: ``user`` / ``profile`` are the lookup prefixes of the auth
+        user and of this profile in the queryset (for a ``User`` queryset:
+        ``user=""``, ``profile="userprofile__"``). Users without a profile
+        fall back to "first last", else the username.
+        """
+        def words(*parts):
+            return Func(Value(" "), *parts, function="CONCAT_WS", output_field=models.CharField())
+
+        full_name = words(
+            NullIf(F(f"{user}first_name"), Value("")),
+            NullIf(F(f"{user}last_name"), Value("")),
+        )
+        rank = NullIf(F(f"{profile}rank"), Value(""))
+
+        display = Case(
+            When(
+                Q(**{f"{profile}display_name_format__iexact": "camel"}),
+                then=words(rank, NullIf(Replace(Func(full_name, function="INITCAP"), Value(" "), Value("")), Value(""))),
+            ),
+            When(
+                Q(**{f"{profile}display_name_format__iexact": "upper"}),
+                then=words(Upper(rank), NullIf(Upper(full_name), Value(""))),
+            ),
+            When(
+                Q(**{f"{profile}display_name_format__iexact": "lower"}),
+                then=words(Lower(rank), NullIf(Lower(full_name), Value(""))),
+            ),
+            default=words(rank, NullIf(Func(full_name, function="INITCAP"), Value(""))),
+            output_field=models.CharField(),
+        )
+
+        if not profile:
+            return display
+        return Case(
+            When(**{f"{profile}pk__isnull": True}, then=Coalesce(NullIf(full_name, Value("")), F(f"{user}username"))),
+            default=display,
+            output_field=models.CharField(),
+        )
+
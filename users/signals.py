@@ -4,12 +4,17 @@ from django.contrib.auth.models import User
 from django.apps import apps
 from .models import UserProfile
 from django.contrib.auth.models import Group
+from school.utils.field_tracking import FieldTracker
 
 GROUPS = [
     'DEVELOPER', 'ADMINISTRATOR', 'CIES',
     'MTI', 'STUDENTS'
 ]
 
+# UserProfile.save compares these with the loaded values to spot stale QR codes
+FieldTracker.watch(User, UserProfile.USER_TRACKED_FIELDS)
+
+
 @receiver(post_migrate)
 def create_groups(sender, **kwargs):
     """Signal handler for post_migrate to create predefined user groups."""
@@ -12,8 +12,8 @@ $('#usersTable').on('click', '.btn-show-qr', function () {
         xhrFields: { withCredentials: true },
 
         success: function (res) {
-            // Insert QR to modal
-            $('#qrModalImage').attr('src', `data:image/png;base64,${res.qr_base64}`);
+            // Insert QR to modal (still rendering → placeholder, try again shortly)
+            $('#qrModalImage').attr('src', res.qr_url || '/static/img/users/img_holder.png');
             $('#qrModalName').text(res.full_name || 'User');
 
             // Bootstrap modal auto opens because of data-bs-toggle + data-bs-target
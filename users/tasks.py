@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from school.utils.qr_render import QRRenderQueue
+
+
+@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=30, retry_kwargs={"max_retries": 3})
+def render_profile_qr_codes(self, profile_ids):
+    """Render pending UserProfile QR codes (queued by QRRenderQueue); safe to retry."""
+    return {"rendered": QRRenderQueue.process("profile", profile_ids)}
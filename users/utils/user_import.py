@@ -0,0 +1,304 @@
+import pandas as pd
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import models, transaction
+from django.utils import timezone
+from openpyxl import load_workbook
+from openpyxl.utils import column_index_from_string
+
+from school.utils.qr_render import QRRenderQueue
+from users.models import UserProfile
+
+
+class UserImport:
+    """
+    Create / update users and their profiles from an Excel sheet in bulk.
+
+    The sheet is streamed (openpyxl ``read_only``) ``chunk_size`` rows at a
+    time, so memory stays bounded whatever its length. Per chunk:
+
+    1. the mapped columns are cleaned as whole pandas columns — emails
+       lowercased, contact numbers normalized, date columns parsed;
+    2. one query loads the users already there (username = email), one
+       their profiles;
+    3. new users (with the default password, hashed once per import) and
+       their profiles are ``bulk_create``d; existing ones are
+       ``bulk_update``d, only with the columns that changed — all in one
+       transaction.
+
+    A blank cell keeps the stored value. Like ``UserProfile.save``, a
+    change to a QR field (or to the user's names) marks the profile's QR
+    pending; the QR codes of every new or stale profile are queued once,
+    after the last chunk. ``bulk_create`` sends no ``post_save``, so
+    profiles are created here rather than by the signal.
+    """
+
+    CHUNK_SIZE = 1000
+
+    USER_FIELDS = ("email", "first_name", "last_name")
+    # Never taken from a sheet
+    PROTECTED_FIELDS = {"id", "user", "qr_code", "qr_hash", "profile_picture", "signature"}
+
+    DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%m/%d/%Y", "%m-%d-%Y", "%m/%d/%y", "%m-%d-%y")
+    # Excel serial dates below this are not dates (e.g. plain numbers)
+    MIN_EXCEL_SERIAL = 40000
+    MIN_YEAR = 1900
+
+    def __init__(self, mapping, default_password, chunk_size=CHUNK_SIZE, render_qr=True):
+        self.columns = self.resolve_columns(mapping)
+        self.chunk_size = chunk_size
+        self.render_qr = render_qr
+        # PBKDF2 once, shared by every new user
+        self.password = make_password(default_password)
+
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.skipped = []
+        self.qr_pending = []
+
+    # ------------------------------------------------------------
+    # 🔹 Columns
+    # ------------------------------------------------------------
+    @classmethod
+    def resolve_columns(cls, mapping):
+        """{field: 0-based column} for the user fields and the profile's plain columns."""
+        profile_fields = {
+            field.name
+            for field in UserProfile._meta.concrete_fields
+            if not field.is_relation and field.name not in cls.PROTECTED_FIELDS
+        }
+        if "email" not in mapping:
+            raise ValueError("'email' must be mapped (it is the username).")
+        return {
+            field: column_index_from_string(letter) - 1
+            for field, letter in mapping.items()
+            if field in cls.USER_FIELDS or field in profile_fields
+        }
+
+    @property
+    def profile_fields(self):
+        return [field for field in self.columns if field not in self.USER_FIELDS]
+
+    # ------------------------------------------------------------
+    # 🔹 Cleaning (vectorized)
+    # ------------------------------------------------------------
+    @staticmethod
+    def text_of(value):
+        """A cell as text: whole-number floats lose their ".0" (phone numbers)."""
+        if value is None or value != value:
+            return None
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+
+    @classmethod
+    def clean_text(cls, values):
+        """Stripped strings; None for blank cells."""
+        values = values.map(cls.text_of).str.strip()
+        return values.where(values.notna() & (values != ""), None)
+
+    @classmethod
+    def clean_contact_numbers(cls, values):
+        """Digits only, +63 / 63 → 0, at most the last 11 digits."""
+        values = cls.clean_text(values)
+        values = (
+            values.str.replace(r"[\s\-()]", "", regex=True)
+            .str.replace(r"^\+?63", "0", regex=True)
+            .str.replace(r"\D", "", regex=True)
+            .str[-11:]
+        )
+        return values.where(values.notna() & (values != ""), None)
+
+    @classmethod
+    def parse_dates(cls, values):
+        """
+        Dates from date cells, Excel serial numbers (> MIN_EXCEL_SERIAL) or
+        strings in DATE_FORMATS / any format pandas recognizes. Blank cells
+        stay None; anything else that isn't a date from MIN_YEAR on becomes
+        NaT (and clears the field, as before).
+        """
+        blank = values.isna() | values.map(lambda v: isinstance(v, str) and not v.strip())
+        parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+
+        is_date = values.map(lambda v: hasattr(v, "year") and not isinstance(v, str))
+        if is_date.any():
+            parsed[is_date] = pd.to_datetime(values[is_date], errors="coerce")
+
+        numbers = pd.to_numeric(values.where(~is_date), errors="coerce")
+        serial = numbers > cls.MIN_EXCEL_SERIAL
+        if serial.any():
+            parsed[serial] = pd.to_datetime(numbers[serial], origin="1899-12-30", unit="D", errors="coerce")
+
+        text = values.map(lambda v: isinstance(v, str)) & ~blank & ~serial
+        if text.any():
+            strings = values[text].str.strip()
+            found = pd.Series(pd.NaT, index=strings.index, dtype="datetime64[ns]")
+            for fmt in cls.DATE_FORMATS:
+                missing = found.isna()
+                if not missing.any():
+                    break
+                found[missing] = pd.to_datetime(strings[missing], format=fmt, errors="coerce")
+            missing = found.isna()
+            if missing.any():
+                found[missing] = pd.to_datetime(strings[missing], format="mixed", errors="coerce")
+            parsed[text] = found
+
+        parsed = parsed.where(parsed.dt.year >= cls.MIN_YEAR)
+        return parsed.astype(object).where(~blank, None)
+
+    def clean(self, frame):
+        """The chunk's raw cells → cleaned values (None = blank cell, NaT = unparseable date)."""
+        cleaned = pd.DataFrame(index=frame.index)
+        for field in self.columns:
+            values = frame[field]
+            model_field = (
+                User._meta.get_field(field) if field in self.USER_FIELDS else UserProfile._meta.get_field(field)
+            )
+            if field == "contact_number":
+                cleaned[field] = self.clean_contact_numbers(values)
+            elif isinstance(model_field, (models.DateField, models.DateTimeField)):
+                cleaned[field] = self.parse_dates(values)
+            else:
+                cleaned[field] = self.clean_text(values)
+        cleaned["email"] = cleaned["email"].str.lower()
+        return cleaned
+
+    @staticmethod
+    def value_for(field, value):
+        """Model value for a cleaned cell."""
+        if value is pd.NaT:
+            return None
+        if isinstance(value, pd.Timestamp):
+            value = value.to_pydatetime()
+            if not isinstance(UserProfile._meta.get_field(field), models.DateTimeField):
+                return value.date()
+            return timezone.make_aware(value) if timezone.is_naive(value) else value
+        return value
+
+    # ------------------------------------------------------------
+    # 🔹 Reading
+    # ------------------------------------------------------------
+    def read_chunks(self, path, sheet):
+        """Yield (first row number, DataFrame of the mapped columns) per chunk."""
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            if sheet not in workbook.sheetnames:
+                raise ValueError(f"Sheet '{sheet}' not found.")
+            rows = workbook[sheet].iter_rows(values_only=True)
+            fields = list(self.columns)
+            positions = [self.columns[field] for field in fields]
+
+            chunk, start = [], 1
+            for number, row in enumerate(rows, start=1):
+                chunk.append([row[i] if i < len(row) else None for i in positions])
+                if len(chunk) == self.chunk_size:
+                    yield start, pd.DataFrame(chunk, columns=fields, dtype=object)
+                    chunk, start = [], number + 1
+            if chunk:
+                yield start, pd.DataFrame(chunk, columns=fields, dtype=object)
+        finally:
+            workbook.close()
+
+    # ------------------------------------------------------------
+    # 🔹 Writing
+    # ------------------------------------------------------------
+    def apply(self, obj, fields, row):
+        """Set the row's non-blank values on ``obj``. Returns the fields that changed."""
+        changed = []
+        for field in fields:
+            value = row[field]
+            if value is None:
+                continue
+            value = self.value_for(field, value)
+            if getattr(obj, field) != value:
+                setattr(obj, field, value)
+                changed.append(field)
+        return changed
+
+    def import_chunk(self, start, frame):
+        cleaned = self.clean(frame)
+        cleaned["row"] = range(start, start + len(cleaned))
+
+        blank = cleaned["email"].isna()
+        self.skipped += cleaned.loc[blank, "row"].tolist()
+        # Same email twice in a chunk: the last row wins (as row-by-row updates did)
+        cleaned = cleaned[~blank].drop_duplicates("email", keep="last")
+        if cleaned.empty:
+            return
+
+        rows = cleaned.to_dict("records")
+        emails = [row["email"] for row in rows]
+        user_fields = [field for field in self.USER_FIELDS if field in self.columns]
+        profile_fields = self.profile_fields
+
+        users = {user.username: user for user in User.objects.filter(username__in=emails)}
+        profiles = {
+            profile.user_id: profile
+            for profile in UserProfile.objects.filter(user__in=users.values())
+        }
+
+        new_users, changed_users, user_changes, renamed = [], [], set(), set()
+        for row in rows:
+            user = users.get(row["email"])
+            if user is None:
+                user = User(username=row["email"], password=self.password)
+                self.apply(user, user_fields, row)
+                users[row["email"]] = user
+                new_users.append(user)
+                continue
+            changed = self.apply(user, user_fields, row)
+            if changed:
+                changed_users.append(user)
+                user_changes.update(changed)
+            if any(field in UserProfile.USER_TRACKED_FIELDS for field in changed):
+                renamed.add(user.pk)
+
+        with transaction.atomic():
+            User.objects.bulk_create(new_users, batch_size=self.chunk_size)
+            if changed_users:
+                User.objects.bulk_update(changed_users, sorted(user_changes), batch_size=self.chunk_size)
+
+            new_profiles, changed_profiles, profile_changes = [], [], set()
+            created = set()
+            touched = {user.pk for user in changed_users}
+            for row in rows:
+                user = users[row["email"]]
+                profile = profiles.get(user.pk)
+                if profile is None:
+                    profile = UserProfile(user=user)
+                    self.apply(profile, profile_fields, row)
+                    new_profiles.append(profile)
+                    created.add(user.pk)
+                    continue
+
+                changed = self.apply(profile, profile_fields, row)
+                stale = user.pk in renamed or any(field in UserProfile.TRACKED_FIELDS for field in changed)
+                if stale and profile.qr_hash:
+                    profile.qr_hash = None
+                    changed.append("qr_hash")
+                if changed:
+                    changed_profiles.append(profile)
+                    profile_changes.update(changed)
+                    touched.add(user.pk)
+                if stale:
+                    self.qr_pending.append(profile.pk)
+
+            UserProfile.objects.bulk_create(new_profiles, batch_size=self.chunk_size)
+            if changed_profiles:
+                UserProfile.objects.bulk_update(changed_profiles, sorted(profile_changes), batch_size=self.chunk_size)
+
+        self.qr_pending += [profile.pk for profile in new_profiles]
+        # A missing profile counts as created, as get_or_create did
+        self.created += len(created)
+        self.updated += len(touched - created)
+        self.unchanged += len(rows) - len(created | touched)
+
+    def run(self, path, sheet):
+        """Import every chunk, then queue the QR codes. Yields each chunk's last row number."""
+        for start, frame in self.read_chunks(path, sheet):
+            self.import_chunk(start, frame)
+            yield start + len(frame) - 1
+
+        if self.render_qr:
+            QRRenderQueue.enqueue("profile", self.qr_pending)
@@ -7,6 +7,7 @@ from django.contrib.auth.models import User
 from rest_framework.decorators import permission_classes
 from rest_framework.permissions import IsAuthenticated
 from users.models import UserProfile, Organization
+from school.utils.qr_render import QRRenderQueue
 from users.forms import (
     UserEditForm, UserProfileForm, ResetPasswordForm, UserGroupForm,
     AddUserForm, OrganizationForm
@@ -114,11 +115,7 @@ def add_user_view(request):
             # Assign orgs
             profile.organizations.set(form.cleaned_data['organizations'])
 
-            # 🔑 Auto-generate QR code (base64)
-            print("📲 Generating QR code for new user...")
-            profile.generate_qr_code(force=True)
-            profile.save(update_fields=["qr_code"])
-            print("✅ QR code generated (base64 length:", len(profile.qr_code), ")")
+            # 🔑 QR code is rendered in the background (queued by UserProfile.save)
 
             print("👤 UserProfile created for user:", user.username)
             return redirect('users:manage_users')
@@ -159,15 +156,8 @@ def edit_user(request, user_id):
             user_edit_form.save()
             user_profile_form.save()
 
-            # 🔑 Always ensure QR exists or refresh it
-            if not user_profile.qr_code:
-                print("📲 No QR found. Generating new QR code...")
-            else:
-                print("♻️ Updating QR code (regenerating base64)...")
-
-            user_profile.generate_qr_code(force=True)
-            user_profile.save(update_fields=["qr_code"])
-            print("✅ QR code updated (base64 length:", len(user_profile.qr_code), ")")
+            # 🔑 Refresh the QR in the background (pending until rendered)
+            QRRenderQueue.reset("profile", [user_profile.pk])
 
             messages.success(request, "User details updated successfully.")
             return redirect('users:manage_users')